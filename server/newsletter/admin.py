@@ -151,6 +151,8 @@ class EmailLogAdmin(admin.ModelAdmin):
         status_colors = {
             'sent': 'blue',
             'delivered': 'green', 
+            'opened': 'teal',
+            'clicked': 'purple',
             'bounced': 'red',
             'complained': 'orange'
         }
@@ -183,7 +185,7 @@ class PopupDismissalAdmin(admin.ModelAdmin):
     def is_valid_display(self, obj):
         return obj.is_valid()
     is_valid_display.boolean = True
-    is_valid_display.short_description = 'Valid (within 3 days)'
+    is_valid_display.short_description = 'Valid'
 
 
 # Optional: Admin site customization (you can remove this if already in main admin.py)
@@ -8,35 +8,23 @@ from .models import NewsletterSubscriber, PopupDismissal
 def newsletter_dashboard(request):
     """Custom admin dashboard for newsletter analytics"""
     
-    # Basic stats
-    total_subscribers = NewsletterSubscriber.objects.count()
-    active_subscribers = NewsletterSubscriber.objects.filter(is_active=True).count()
-    inactive_subscribers = NewsletterSubscriber.objects.filter(is_active=False).count()
-    
-    # Recent activity
-    today = timezone.now().date()
-    week_ago = today - timedelta(days=7)
-    month_ago = today - timedelta(days=30)
-    
-    new_this_week = NewsletterSubscriber.objects.filter(
-        subscribed_at__date__gte=week_ago
-    ).count()
-    
-    new_this_month = NewsletterSubscriber.objects.filter(
-        subscribed_at__date__gte=month_ago
-    ).count()
+    # Basic stats and recent activity (one aggregate query)
+    stats = NewsletterSubscriber.get_stats()
+    active_subscribers = stats['active']
+    new_this_week = stats['new_this_week']
     
     # Popup dismissals
+    start_of_today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
     recent_dismissals = PopupDismissal.objects.filter(
-        dismissed_at__date__gte=week_ago
+        dismissed_at__gte=start_of_today - timedelta(days=7)
     ).count()
     
     context = {
-        'total_subscribers': total_subscribers,
+        'total_subscribers': stats['total'],
         'active_subscribers': active_subscribers,
-        'inactive_subscribers': inactive_subscribers,
+        'inactive_subscribers': stats['inactive'],
         'new_this_week': new_this_week,
-        'new_this_month': new_this_month,
+        'new_this_month': stats['new_this_month'],
         'recent_dismissals': recent_dismissals,
         'subscriber_growth_rate': ((new_this_week / active_subscribers) * 100) if active_subscribers else 0,
     }
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from newsletter import tracking
+
+
+class Command(BaseCommand):
+    help = "Apply buffered email open/click events to EmailLog in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help="Maximum message IDs per UPDATE (defaults to TRACKING_BATCH_SIZE)"
+        )
+
+    def handle(self, *args, **options):
+        updated = tracking.flush_buffer(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{updated} email logs updated"))
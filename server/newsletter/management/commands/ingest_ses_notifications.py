@@ -0,0 +1,32 @@
+import itertools
+
+from django.core.management.base import BaseCommand, CommandError
+
+from newsletter import tracking
+
+
+class Command(BaseCommand):
+    help = "Replay SES delivery/bounce/complaint notifications from local JSON files into EmailLog"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='+',
+            help="JSON or NDJSON files containing SES (or SNS-wrapped SES) notifications"
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help="Maximum message IDs per UPDATE (defaults to TRACKING_BATCH_SIZE)"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            notifications = itertools.chain.from_iterable(
+                tracking.iter_ses_fixture(path) for path in options['paths']
+            )
+            updated = tracking.ingest_ses_notifications(
+                notifications, batch_size=options['batch_size']
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Failed to read SES notifications: {e}")
+
+        self.stdout.write(self.style.SUCCESS(f"{updated} email logs updated"))
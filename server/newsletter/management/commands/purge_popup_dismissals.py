@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from newsletter import popup
+
+
+class Command(BaseCommand):
+    help = "Delete PopupDismissal rows older than POPUP_DISMISSAL_DAYS"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = popup.purge_expired_dismissals(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{deleted} expired popup dismissals deleted"))
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.16 on 2026-10-19 04:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0002_emaillog_tracking_statuses'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newslettersubscriber',
+            index=models.Index(fields=['is_active', 'subscribed_at'], name='newsletter__is_acti_3efa42_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newslettersubscriber',
+            index=models.Index(fields=['subscribed_at'], name='newsletter__subscri_0543d6_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-19 04:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0003_subscriber_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='popupdismissal',
+            name='dismissed_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
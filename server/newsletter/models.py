@@ -1,8 +1,11 @@
 from django.db import models
+from django.db.models import Count, Q
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from django.core.mail import EmailMultiAlternatives, send_mail
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.utils.html import strip_tags
+from datetime import timedelta
 import uuid
 import logging
 
@@ -61,16 +64,43 @@ class NewsletterSubscriber(models.Model):
         db_table = 'newsletter_subscribers'
         verbose_name = 'Newsletter Subscriber'
         verbose_name_plural = 'Newsletter Subscribers'
+        indexes = [
+            models.Index(fields=['is_active', 'subscribed_at']),
+            models.Index(fields=['subscribed_at']),
+        ]
     
     def __str__(self):
         return self.email
     
+    @classmethod
+    def get_stats(cls):
+        """
+        Subscriber counts in a single conditional-aggregate query.
+        
+        Recent windows are plain datetime ranges (no __date cast) so the
+        subscribed_at indexes stay usable.
+        """
+        now = timezone.now()
+        start_of_today = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        stats = cls.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(is_active=True)),
+            new_last_30_days=Count('id', filter=Q(subscribed_at__gte=now - timedelta(days=30))),
+            new_this_week=Count('id', filter=Q(subscribed_at__gte=start_of_today - timedelta(days=7))),
+            new_this_month=Count('id', filter=Q(subscribed_at__gte=start_of_today - timedelta(days=30))),
+        )
+        stats['inactive'] = stats['total'] - stats['active']
+        return stats
+    
     def get_unsubscribe_url(self):
         """Generate unique unsubscribe URL"""
         return f"https://pristineprimier.com/unsubscribe/{self.token}/"
     
     def send_welcome_email(self):
         """Send welcome email using template from database"""
+        from . import tracking
+        
         try:
             template = EmailTemplate.objects.get(template_type='welcome', is_active=True)
             
@@ -92,21 +122,22 @@ class NewsletterSubscriber(models.Model):
                 to=[self.email],
                 reply_to=['info@pristineprimier.com']
             )
-            email.attach_alternative(html_content, "text/html")
-            email.send()
+            tracking.send_tracked(email, self, html_content, template=template)
             
-            logger.info(f"Welcome email sent to {self.email}")
+            logger.info("Welcome email sent to %s", self.email)
             return True
             
         except EmailTemplate.DoesNotExist:
             logger.warning("Welcome email template not found, sending basic email")
             return self.send_basic_welcome_email()
         except Exception as e:
-            logger.error(f"Failed to send welcome email to {self.email}: {e}")
+            logger.error("Failed to send welcome email to %s: %s", self.email, e)
             return False
     
     def send_basic_welcome_email(self):
         """Fallback basic welcome email"""
+        from . import tracking
+        
         subject = "Welcome to PristinePrimier Real Estate Newsletter"
         message = f"""
         Thank you for subscribing to PristinePrimier Real Estate newsletter!
@@ -122,13 +153,13 @@ class NewsletterSubscriber(models.Model):
         The PristinePrimier Team
         """
         
-        send_mail(
+        email = EmailMultiAlternatives(
             subject=subject.strip(),
-            message=message.strip(),
+            body=message.strip(),
             from_email='PristinePrimier Real Estate <newsletter@pristineprimier.com>',
-            recipient_list=[self.email],
-            fail_silently=False,
+            to=[self.email],
         )
+        tracking.send_tracked(email, self)
         return True
     
     def unsubscribe(self):
@@ -136,13 +167,13 @@ class NewsletterSubscriber(models.Model):
         self.is_active = False
         self.unsubscribed_at = timezone.now()
         self.save()
-        logger.info(f"Subscriber {self.email} unsubscribed")
+        logger.info("Subscriber %s unsubscribed", self.email)
 
 
 class PopupDismissal(models.Model):
     session_key = models.CharField(max_length=255, db_index=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
-    dismissed_at = models.DateTimeField(auto_now_add=True)
+    dismissed_at = models.DateTimeField(auto_now_add=True, db_index=True)
     
     class Meta:
         db_table = 'popup_dismissals'
@@ -154,8 +185,9 @@ class PopupDismissal(models.Model):
         return f"Popup dismissal for {self.user or self.session_key}"
     
     def is_valid(self):
-        """Check if dismissal is still valid (within 3 days)"""
-        return (timezone.now() - self.dismissed_at).days < 3
+        """Check if dismissal is still valid (within POPUP_DISMISSAL_DAYS)"""
+        dismissal_days = settings.NEWSLETTER_SETTINGS.get('POPUP_DISMISSAL_DAYS', 3)
+        return (timezone.now() - self.dismissed_at).days < dismissal_days
 
 
 class NewsletterCampaign(models.Model):
@@ -181,28 +213,55 @@ class NewsletterCampaign(models.Model):
         return self.sent_at is not None
     
     def send_campaign(self):
-        """Send campaign to all active subscribers"""
+        """Send campaign to all active subscribers, tracked and logged as EmailLog rows"""
+        from . import tracking
+        
         if self.is_sent:
-            logger.warning(f"Campaign {self.id} already sent")
+            logger.warning("Campaign %s already sent", self.id)
             return False
         
+        newsletter_settings = getattr(settings, 'NEWSLETTER_SETTINGS', {})
+        # An unsaved template renders the campaign's own content the same way
+        template = self.template or EmailTemplate(html_content=self.content)
+        
         try:
             active_subscribers = NewsletterSubscriber.objects.filter(is_active=True)
             sent_count = 0
             
-            for subscriber in active_subscribers:
-                # Implementation for sending campaign emails
-                # This would integrate with SES for bulk sending
-                sent_count += 1
+            # One SES connection for the whole run
+            with get_connection() as connection:
+                for subscriber in active_subscribers.iterator(chunk_size=500):
+                    html_content, plain_text_content = template.render_template({
+                        'subscriber_name': subscriber.name or 'Subscriber',
+                        'subscriber_email': subscriber.email,
+                        'unsubscribe_url': subscriber.get_unsubscribe_url(),
+                        'current_year': timezone.now().year,
+                        'site_url': 'https://pristineprimier.com',
+                        'content': self.content,
+                    })
+                    email = EmailMultiAlternatives(
+                        subject=self.subject,
+                        body=plain_text_content,
+                        from_email=newsletter_settings.get('FROM_EMAIL'),
+                        to=[subscriber.email],
+                        reply_to=[newsletter_settings.get('REPLY_TO_EMAIL', 'info@pristineprimier.com')],
+                        connection=connection,
+                    )
+                    try:
+                        tracking.send_tracked(email, subscriber, html_content, template=self.template, campaign=self)
+                    except Exception as e:
+                        logger.error("Failed to send campaign %s to %s: %s", self.id, subscriber.email, e)
+                        continue
+                    sent_count += 1
             
             self.sent_at = timezone.now()
             self.save()
             
-            logger.info(f"Campaign '{self.title}' sent to {sent_count} subscribers")
+            logger.info("Campaign '%s' sent to %d subscribers", self.title, sent_count)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to send campaign {self.id}: {e}")
+            logger.error("Failed to send campaign %s: %s", self.id, e)
             return False
 
 
@@ -213,10 +272,12 @@ class EmailLog(models.Model):
     campaign = models.ForeignKey(NewsletterCampaign, on_delete=models.SET_NULL, null=True, blank=True)
     subject = models.CharField(max_length=255)
     sent_at = models.DateTimeField(auto_now_add=True)
-    message_id = models.CharField(max_length=255, blank=True)  # SES Message ID
+    message_id = models.CharField(max_length=255, blank=True, db_index=True)  # SES Message ID
     status = models.CharField(max_length=20, default='sent', choices=[
         ('sent', 'Sent'),
         ('delivered', 'Delivered'),
+        ('opened', 'Opened'),
+        ('clicked', 'Clicked'),
         ('bounced', 'Bounced'),
         ('complained', 'Complained'),
     ])
@@ -0,0 +1,67 @@
+# newsletter/outbox.py
+"""
+Welcome emails, sent off the request path.
+
+Rendering the template and talking to SES takes hundreds of milliseconds,
+and a slow SES call used to hold the subscribe request (and, under ASGI, a
+worker thread) until it finished. The email is now handed to a small
+thread pool once the subscriber row has committed.
+
+NEWSLETTER_SETTINGS['ASYNC_EMAIL'] = False sends it inline after commit
+instead, e.g. in tests that inspect the outbox. Queued emails live in
+process memory: a worker that exits before sending drops them.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def _setting(key, default=None):
+    return getattr(settings, 'NEWSLETTER_SETTINGS', {}).get(key, default)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=_setting('EMAIL_WORKERS', 2),
+            thread_name_prefix='newsletter-email'
+        )
+    return _executor
+
+
+def _send_welcome(subscriber_id):
+    from .models import NewsletterSubscriber
+
+    try:
+        subscriber = NewsletterSubscriber.objects.filter(pk=subscriber_id, is_active=True).first()
+        if subscriber is not None:
+            subscriber.send_welcome_email()
+    except Exception:
+        # The subscription itself already succeeded
+        logger.exception("Failed to send welcome email to subscriber %s", subscriber_id)
+    finally:
+        close_old_connections()
+
+
+def queue_welcome_email(subscriber):
+    """Send ``subscriber`` the welcome email once the current transaction commits"""
+    subscriber_id = subscriber.pk
+    if _setting('ASYNC_EMAIL', True):
+        transaction.on_commit(lambda: _get_executor().submit(_send_welcome, subscriber_id))
+    else:
+        transaction.on_commit(lambda: _send_welcome(subscriber_id))
+
+
+def wait_for_queued():
+    """Block until every queued email has been sent, e.g. before a command exits"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
@@ -0,0 +1,152 @@
+# newsletter/popup.py
+"""
+Newsletter popup dismissal store.
+
+Two modes, selected with NEWSLETTER_SETTINGS['POPUP_DISMISSAL_MODE']:
+
+- 'cache' (default): dismissals live in the cache for POPUP_DISMISSAL_DAYS.
+  A cache miss falls back to PopupDismissal once and the answer is cached.
+  "Not dismissed" is only cached when the cache is shared between worker
+  processes: with the per-process LocMemCache, other workers would keep
+  showing the popup after a dismissal until their entry expired.
+- 'cookie': the dismissal is a signed cookie on the client. Status checks
+  only verify the signature; nothing is stored or looked up server-side.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import PopupDismissal
+
+COOKIE_NAME = 'newsletter_popup_dismissed'
+COOKIE_SALT = 'newsletter.popup'
+NOT_DISMISSED = ''
+
+
+def _setting(key, default=None):
+    return getattr(settings, 'NEWSLETTER_SETTINGS', {}).get(key, default)
+
+
+def get_dismissal_days():
+    return _setting('POPUP_DISMISSAL_DAYS', 3)
+
+
+def get_dismissal_ttl():
+    return get_dismissal_days() * 24 * 60 * 60
+
+
+def uses_cookie_mode():
+    return _setting('POPUP_DISMISSAL_MODE', 'cache') == 'cookie'
+
+
+def _cache_key(session_key, user):
+    user_part = user.pk if user is not None else 'anon'
+    digest = hashlib.sha1(session_key.encode('utf-8')).hexdigest()
+    return f"newsletter:popup:{user_part}:{digest}"
+
+
+# === CACHE MODE ===
+
+def get_negative_cache_seconds():
+    seconds = _setting('POPUP_NEGATIVE_CACHE_SECONDS')
+    if seconds is None:
+        return 0 if isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache) else 300
+    return seconds
+
+
+def _load_dismissal(dismissal):
+    """The cache entry for a PopupDismissal row (or None) and how long to keep it (0: don't)"""
+    if dismissal and dismissal.is_valid():
+        remaining = dismissal.dismissed_at + timedelta(days=get_dismissal_days()) - timezone.now()
+        return dismissal.dismissed_at.isoformat(), max(int(remaining.total_seconds()), 1)
+    return NOT_DISMISSED, get_negative_cache_seconds()
+
+
+def _dismissals(session_key, user):
+    return PopupDismissal.objects.filter(session_key=session_key, user=user).only('dismissed_at')
+
+
+def get_cached_dismissal(session_key, user=None):
+    """
+    Return the dismissal time if the popup is currently dismissed, else None.
+    """
+    key = _cache_key(session_key, user)
+    cached = cache.get(key)
+
+    if cached is None:
+        cached, timeout = _load_dismissal(_dismissals(session_key, user).first())
+        if timeout:
+            cache.set(key, cached, timeout)
+
+    return parse_datetime(cached) if cached else None
+
+
+async def aget_cached_dismissal(session_key, user=None):
+    """get_cached_dismissal() for async views"""
+    key = _cache_key(session_key, user)
+    cached = await cache.aget(key)
+
+    if cached is None:
+        cached, timeout = _load_dismissal(await _dismissals(session_key, user).afirst())
+        if timeout:
+            await cache.aset(key, cached, timeout)
+
+    return parse_datetime(cached) if cached else None
+
+
+def cache_dismissal(session_key, user=None):
+    """Record a dismissal in the cache and persist it for cache warm-up"""
+    dismissed_at = timezone.now()
+    cache.set(_cache_key(session_key, user), dismissed_at.isoformat(), get_dismissal_ttl())
+
+    PopupDismissal.objects.update_or_create(
+        session_key=session_key,
+        user=user,
+        defaults={'dismissed_at': dismissed_at}
+    )
+    return dismissed_at
+
+
+# === SIGNED COOKIE MODE ===
+
+def get_cookie_dismissal(request):
+    """Return the dismissal time from the signed cookie, or None"""
+    value = request.get_signed_cookie(
+        COOKIE_NAME, default=None, salt=COOKIE_SALT, max_age=get_dismissal_ttl()
+    )
+    return parse_datetime(value) if value else None
+
+
+def set_dismissal_cookie(response):
+    dismissed_at = timezone.now()
+    response.set_signed_cookie(
+        COOKIE_NAME,
+        dismissed_at.isoformat(),
+        salt=COOKIE_SALT,
+        max_age=get_dismissal_ttl(),
+        secure=settings.SESSION_COOKIE_SECURE,
+        samesite=settings.SESSION_COOKIE_SAMESITE,
+        httponly=True,
+    )
+    return dismissed_at
+
+
+# === MAINTENANCE ===
+
+def purge_expired_dismissals(batch_size=1000):
+    """Delete PopupDismissal rows older than POPUP_DISMISSAL_DAYS in batches"""
+    cutoff = timezone.now() - timedelta(days=get_dismissal_days())
+    expired = PopupDismissal.objects.filter(dismissed_at__lt=cutoff)
+
+    deleted = 0
+    while True:
+        ids = list(expired.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        deleted += PopupDismissal.objects.filter(id__in=ids).delete()[0]
+    return deleted
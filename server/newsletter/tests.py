@@ -1,3 +1,123 @@
-from django.test import TestCase
+import os
+import tempfile
+from unittest import skipIf
 
-# Create your tests here.
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.test import TestCase, override_settings
+
+from . import tracking
+from .models import EmailLog, NewsletterCampaign, NewsletterSubscriber
+
+
+class TrackingTokenTests(TestCase):
+    def test_round_trip(self):
+        self.assertEqual(tracking.read_token(tracking.make_open_token('m1')), {'m': 'm1'})
+        self.assertEqual(
+            tracking.read_token(tracking.make_click_token('m1', 'https://example.com/a?b=1')),
+            {'m': 'm1', 'u': 'https://example.com/a?b=1'},
+        )
+
+    def test_tampered_token_is_rejected(self):
+        token = tracking.make_click_token('m1', 'https://example.com/')
+        self.assertIsNone(tracking.read_token(token[:-1] + ('A' if token[-1] != 'A' else 'B')))
+
+
+class StatusLadderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.subscriber = NewsletterSubscriber.objects.create(email='reader@example.com')
+
+    def log(self, message_id, status='sent'):
+        return EmailLog.objects.create(subscriber=self.subscriber, subject='s', message_id=message_id, status=status)
+
+    def test_reduce_keeps_highest_rank(self):
+        events = [('a', 'opened'), ('a', 'delivered'), ('a', 'clicked'), ('b', 'bounced'), ('b', 'opened'), ('c', 'bogus')]
+        self.assertEqual(tracking.reduce_events(events), {'a': 'clicked', 'b': 'bounced'})
+
+    def test_updates_only_move_up(self):
+        opened, bounced = self.log('a'), self.log('b', status='bounced')
+        self.assertEqual(tracking.apply_status_updates({'a': 'opened', 'b': 'delivered'}), 1)
+        opened.refresh_from_db()
+        bounced.refresh_from_db()
+        self.assertEqual((opened.status, bounced.status), ('opened', 'bounced'))
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    ALLOWED_HOSTS=['testserver', 'api.example.com'],
+)
+class TrackedSendTests(TestCase):
+    """An email sent with tracking is logged, and its pixel hits reach EmailLog through the buffer"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.subscriber = NewsletterSubscriber.objects.create(email='reader@example.com', name='Reader')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.buffer_path = os.path.join(directory.name, 'events.ndjson')
+        newsletter_settings = override_settings(NEWSLETTER_SETTINGS={
+            'TRACK_OPENS': True, 'TRACK_CLICKS': True,
+            'TRACKING_BUFFER_PATH': self.buffer_path,
+            'TRACKING_BASE_URL': 'https://api.example.com',
+        })
+        newsletter_settings.enable()
+        self.addCleanup(newsletter_settings.disable)
+
+    def test_send_track_flush(self):
+        email = EmailMultiAlternatives(subject='Hello', body='text', to=[self.subscriber.email])
+        log = tracking.send_tracked(
+            email, self.subscriber, '<html><body><a href="https://example.com/plots?a=1&amp;b=2">Plots</a></body></html>'
+        )
+
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEqual(message.extra_headers[tracking.MESSAGE_ID_HEADER], log.message_id)
+        html_content = message.alternatives[0][0]
+        self.assertIn('src="https://api.example.com/', html_content)
+        self.assertIn('href="https://api.example.com/', html_content)
+        self.assertNotIn('href="https://example.com', html_content)
+        self.assertLess(html_content.index('<img'), html_content.index('</body>'))
+
+        click = html_content.split('href="https://api.example.com')[1].split('"')[0]
+        response = self.client.get(click, HTTP_HOST='api.example.com')
+        self.assertEqual(response['Location'], 'https://example.com/plots?a=1&b=2')
+        pixel = html_content.split('src="https://api.example.com')[1].split('"')[0]
+        self.assertEqual(self.client.get(pixel, HTTP_HOST='api.example.com').status_code, 200)
+
+        self.assertEqual(tracking.flush_buffer(), 1)
+        log.refresh_from_db()
+        self.assertEqual(log.status, 'clicked')
+        self.assertEqual(os.listdir(os.path.dirname(self.buffer_path)), ['events.ndjson.lock'])
+
+    @skipIf(tracking.fcntl is None, "flock is POSIX-only")
+    def test_concurrent_flush_is_skipped(self):
+        log = EmailLog.objects.create(subscriber=self.subscriber, subject='s', message_id='m1')
+        tracking.record_event('m1', 'opened')
+        with open(f'{self.buffer_path}.lock', 'a') as lock_file:
+            tracking.fcntl.flock(lock_file, tracking.fcntl.LOCK_EX)
+            self.assertEqual(tracking.flush_buffer(), 0)
+        self.assertEqual(tracking.flush_buffer(), 1)
+        log.refresh_from_db()
+        self.assertEqual(log.status, 'opened')
+
+    def test_campaign_logs_each_email(self):
+        campaign = NewsletterCampaign.objects.create(
+            title='T', subject='News', content='<p>Hi {{ subscriber_name }}</p>'
+        )
+        self.assertTrue(campaign.send_campaign())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Hi Reader', mail.outbox[0].alternatives[0][0])
+        self.assertTrue(EmailLog.objects.filter(campaign=campaign, subscriber=self.subscriber).exclude(message_id='').exists())
+
+    def test_ses_notification_matches_header(self):
+        log = EmailLog.objects.create(subscriber=self.subscriber, subject='s', message_id='ours')
+        notification = {
+            'eventType': 'Bounce',
+            'mail': {'messageId': 'ses-id', 'headers': [{'name': tracking.MESSAGE_ID_HEADER, 'value': 'ours'}]},
+        }
+        self.assertEqual(tracking.ingest_ses_notifications([notification]), 1)
+        log.refresh_from_db()
+        self.assertEqual(log.status, 'bounced')
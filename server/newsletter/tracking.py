@@ -0,0 +1,341 @@
+# newsletter/tracking.py
+"""
+Email open/click tracking and SES notification ingestion.
+
+``send_tracked`` sends an email under a fresh message id: the HTML gets an
+open pixel and its links are wrapped in signed click-tracking redirects
+(absolute URLs under TRACKING_BASE_URL, since mail clients can't resolve
+relative ones), the id goes out in the X-Newsletter-Message-Id header, and
+an ``EmailLog`` row records it. SES notifications carry that header when
+the configuration set includes the original headers; otherwise their own
+messageId is used.
+
+Tracking hits are appended to a newline-delimited JSON buffer file instead of
+touching the database on the request path. The buffer (and any replayed SES
+notification payloads) are later reduced to one target status per
+``message_id`` and applied to ``EmailLog`` with a handful of bulk UPDATEs.
+"""
+import html
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from collections import defaultdict
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, flushes must not overlap
+    fcntl = None
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.urls import reverse
+
+from .models import EmailLog
+
+logger = logging.getLogger(__name__)
+
+TOKEN_SALT = 'newsletter.tracking'
+
+MESSAGE_ID_HEADER = 'X-Newsletter-Message-Id'
+
+LINK_RE = re.compile(r'href=(["\'])(https?://[^"\'\s]+)\1', re.IGNORECASE)
+BODY_END_RE = re.compile(r'</body\s*>', re.IGNORECASE)
+
+# Status transitions only ever move "up" this ladder, so replaying the same
+# events twice (or out of order) is harmless.
+STATUS_RANK = {
+    'sent': 0,
+    'delivered': 1,
+    'opened': 2,
+    'clicked': 3,
+    'bounced': 4,
+    'complained': 5,
+}
+
+# SES notificationType (SNS) / eventType (event publishing) -> EmailLog status
+SES_EVENT_STATUS = {
+    'Delivery': 'delivered',
+    'Open': 'opened',
+    'Click': 'clicked',
+    'Bounce': 'bounced',
+    'Complaint': 'complained',
+}
+
+
+def _setting(key, default=None):
+    return getattr(settings, 'NEWSLETTER_SETTINGS', {}).get(key, default)
+
+
+def get_buffer_path():
+    return _setting(
+        'TRACKING_BUFFER_PATH',
+        os.path.join(settings.BASE_DIR, 'logs', 'email_events.ndjson')
+    )
+
+
+# === TRACKING TOKENS ===
+
+def make_open_token(message_id):
+    return signing.dumps({'m': message_id}, salt=TOKEN_SALT)
+
+
+def make_click_token(message_id, url):
+    return signing.dumps({'m': message_id, 'u': url}, salt=TOKEN_SALT)
+
+
+def read_token(token):
+    """Return the decoded token payload, or None if it was tampered with"""
+    try:
+        return signing.loads(token, salt=TOKEN_SALT)
+    except signing.BadSignature:
+        return None
+
+
+def _absolute(path, request=None):
+    if request is not None:
+        return request.build_absolute_uri(path)
+    return _setting('TRACKING_BASE_URL', 'https://api.pristineprimier.com').rstrip('/') + path
+
+
+def open_pixel_url(message_id, request=None):
+    """Absolute URL of the open-tracking pixel to embed in an email"""
+    return _absolute(reverse('newsletter-track-open', args=[make_open_token(message_id)]), request)
+
+
+def click_url(message_id, url, request=None):
+    """Absolute URL that records a click on ``url`` before redirecting to it"""
+    return _absolute(reverse('newsletter-track-click', args=[make_click_token(message_id, url)]), request)
+
+
+# === SENDING ===
+
+def track_html(html_content, message_id, request=None):
+    """``html_content`` with its http(s) links wrapped and the open pixel added (per TRACK_* settings)"""
+    if _setting('TRACK_CLICKS', False):
+        def wrap(match):
+            url = click_url(message_id, html.unescape(match.group(2)), request)
+            return f'href={match.group(1)}{html.escape(url)}{match.group(1)}'
+        html_content = LINK_RE.sub(wrap, html_content)
+
+    if _setting('TRACK_OPENS', False):
+        pixel = (
+            f'<img src="{html.escape(open_pixel_url(message_id, request))}" '
+            'width="1" height="1" alt="" style="display:none">'
+        )
+        body_end = [match.start() for match in BODY_END_RE.finditer(html_content)]
+        if body_end:
+            html_content = html_content[:body_end[-1]] + pixel + html_content[body_end[-1]:]
+        else:
+            html_content += pixel
+    return html_content
+
+
+def send_tracked(email, subscriber, html_content=None, template=None, campaign=None, request=None):
+    """
+    Send ``email`` (an EmailMultiAlternatives) under a new message id and log
+    it as an EmailLog row. ``html_content`` becomes the HTML alternative,
+    with tracking added. Returns the EmailLog.
+    """
+    message_id = uuid.uuid4().hex
+    if html_content is not None:
+        email.attach_alternative(track_html(html_content, message_id, request), 'text/html')
+    email.extra_headers[MESSAGE_ID_HEADER] = message_id
+    email.send()
+    return EmailLog.objects.create(
+        subscriber=subscriber,
+        template=template,
+        campaign=campaign,
+        subject=email.subject[:255],
+        message_id=message_id,
+    )
+
+
+# === APPEND-ONLY EVENT BUFFER ===
+
+def record_event(message_id, status):
+    """Append a single tracking event to the buffer file"""
+    if not message_id or status not in STATUS_RANK:
+        return
+
+    path = get_buffer_path()
+    line = json.dumps({'m': message_id, 's': status, 't': int(time.time())}) + '\n'
+    try:
+        with open(path, 'a', encoding='utf-8') as buffer_file:
+            buffer_file.write(line)
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as buffer_file:
+            buffer_file.write(line)
+    except OSError as e:
+        logger.error("Failed to buffer tracking event for %s: %s", message_id, e)
+
+
+def _iter_buffer_file(path):
+    with open(path, encoding='utf-8') as buffer_file:
+        for line in buffer_file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                logger.warning("Skipping malformed tracking event line in %s", path)
+                continue
+            yield event.get('m'), event.get('s')
+
+
+def flush_buffer(batch_size=None):
+    """
+    Drain the tracking buffer into EmailLog.
+
+    The live buffer is renamed before it is read so that new hits keep
+    appending to a fresh file while the old one is processed. Leftover
+    rotated files from an interrupted run are picked up as well. Flushes
+    take a lock file, so a second one running at the same time (cron
+    overlapping a manual run) returns 0 instead of applying the same files.
+    """
+    path = get_buffer_path()
+    directory, filename = os.path.split(path)
+    if not os.path.isdir(directory):
+        return 0
+
+    with open(f"{path}.lock", 'a') as lock_file:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.info("Tracking buffer flush already running; skipping")
+                return 0
+
+        if os.path.exists(path):
+            os.replace(path, f"{path}.{int(time.time() * 1000)}.processing")
+
+        pending = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.startswith(filename + '.') and name.endswith('.processing')
+        )
+
+        updated = 0
+        for pending_path in pending:
+            updated += apply_events(_iter_buffer_file(pending_path), batch_size=batch_size)
+            os.remove(pending_path)
+        return updated
+
+
+# === SES NOTIFICATIONS ===
+
+def parse_ses_notification(payload):
+    """
+    Extract (message_id, status) from an SES notification.
+
+    Accepts the raw SES event, or the SNS envelope wrapping it (where the SES
+    event is a JSON string under "Message"). Returns None for event types that
+    do not map to an EmailLog status.
+    """
+    if payload.get('Type') == 'Notification' and 'Message' in payload:
+        message = payload['Message']
+        payload = json.loads(message) if isinstance(message, str) else message
+
+    event_type = payload.get('eventType') or payload.get('notificationType')
+    status = SES_EVENT_STATUS.get(event_type)
+    mail = payload.get('mail', {})
+    # Our id from the original headers when SES passes them on, else SES's own
+    message_id = next(
+        (header.get('value') for header in mail.get('headers') or []
+         if header.get('name', '').lower() == MESSAGE_ID_HEADER.lower()),
+        mail.get('messageId')
+    )
+    if not status or not message_id:
+        return None
+    return message_id, status
+
+
+def iter_ses_fixture(path):
+    """
+    Yield SES notifications from a local JSON fixture.
+
+    A fixture may be a single notification, a JSON list of notifications, or
+    newline-delimited JSON with one notification per line.
+    """
+    with open(path, encoding='utf-8') as fixture:
+        content = fixture.read().strip()
+    if not content:
+        return
+
+    try:
+        data = json.loads(content)
+    except ValueError:
+        data = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    if isinstance(data, dict):
+        data = [data]
+    yield from data
+
+
+def ingest_ses_notifications(notifications, batch_size=None):
+    """Apply an iterable of SES notification payloads to EmailLog"""
+    def events():
+        for payload in notifications:
+            try:
+                parsed = parse_ses_notification(payload)
+            except (ValueError, TypeError, AttributeError):
+                logger.warning("Skipping malformed SES notification")
+                continue
+            if parsed:
+                yield parsed
+
+    return apply_events(events(), batch_size=batch_size)
+
+
+# === BATCHED STATUS UPDATES ===
+
+def reduce_events(events):
+    """Collapse (message_id, status) pairs to the highest-ranked status per message"""
+    latest = {}
+    for message_id, status in events:
+        rank = STATUS_RANK.get(status)
+        if not message_id or rank is None:
+            continue
+        current = latest.get(message_id)
+        if current is None or rank > STATUS_RANK[current]:
+            latest[message_id] = status
+    return latest
+
+
+def apply_status_updates(latest, batch_size=None):
+    """
+    Apply {message_id: status} to EmailLog.
+
+    Issues one UPDATE per (status, chunk of message_ids) and only touches rows
+    whose current status ranks below the new one.
+    """
+    batch_size = batch_size or _setting('TRACKING_BATCH_SIZE', 500)
+
+    by_status = defaultdict(list)
+    for message_id, status in latest.items():
+        by_status[status].append(message_id)
+
+    updated = 0
+    with transaction.atomic():
+        for status, message_ids in by_status.items():
+            lower_statuses = [s for s, rank in STATUS_RANK.items() if rank < STATUS_RANK[status]]
+            for start in range(0, len(message_ids), batch_size):
+                updated += EmailLog.objects.filter(
+                    message_id__in=message_ids[start:start + batch_size],
+                    status__in=lower_statuses
+                ).update(status=status)
+    return updated
+
+
+def apply_events(events, batch_size=None):
+    """Reduce an event stream and apply it to EmailLog in batches"""
+    latest = reduce_events(events)
+    if not latest:
+        return 0
+    updated = apply_status_updates(latest, batch_size=batch_size)
+    logger.info("Applied %d email status transitions from %d messages", updated, len(latest))
+    return updated
@@ -1,15 +1,24 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 urlpatterns = [
     # Public subscription endpoints
-    path('subscribe/', views.subscribe_newsletter, name='newsletter-subscribe'),
+    path('subscribe/',
+         views.subscribe_newsletter_async if settings.ASYNC_VIEWS else views.subscribe_newsletter,
+         name='newsletter-subscribe'),
     path('unsubscribe/', views.unsubscribe_newsletter, name='newsletter-unsubscribe'),
     path('unsubscribe/<uuid:token>/', views.unsubscribe_by_token, name='unsubscribe-by-token'),
     
     # Popup management
     path('popup/dismiss/', views.dismiss_popup, name='popup-dismiss'),
-    path('popup/status/', views.check_popup_status, name='popup-status'),
+    path('popup/status/',
+         views.check_popup_status_async if settings.ASYNC_VIEWS else views.check_popup_status,
+         name='popup-status'),
+    
+    # Email tracking
+    path('track/open/<str:token>/', views.track_open, name='newsletter-track-open'),
+    path('track/click/<str:token>/', views.track_click, name='newsletter-track-click'),
     
     # Legacy endpoint
     path('legacy/subscribe/', views.newsletter_subscribe_legacy, name='newsletter-subscribe-legacy'),
@@ -19,6 +28,7 @@ urlpatterns = [
     path('admin/templates/<str:template_type>/', views.email_template_detail, name='email-template-detail'),
     path('admin/send-test-email/', views.send_test_email, name='send-test-email'),
     path('admin/subscribers/', views.subscriber_list, name='subscriber-list'),
+    path('admin/subscribers/export/<str:export_format>/', views.subscriber_export, name='subscriber-export'),
     path('admin/stats/', views.subscriber_stats, name='subscriber-stats'),
     path('admin/email-logs/', views.email_logs, name='email-logs'),
 ]
\ No newline at end of file
@@ -3,9 +3,14 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.pagination import PageNumberPagination
 from django.utils import timezone
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse, HttpResponse, HttpResponseRedirect, HttpResponseBadRequest
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
 from django.views.decorators.csrf import csrf_exempt
+import csv
 import json
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
@@ -13,7 +18,13 @@ from django.utils.html import strip_tags
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.decorators import login_required
 
+from asgiref.sync import sync_to_async
+
+from pristineprimer.async_views import async_api_view, streaming_content
+from pristineprimer.routers import replica_reads
+
 from .models import NewsletterSubscriber, PopupDismissal, EmailTemplate, NewsletterCampaign, EmailLog
+from . import popup, tracking
 from .serializers import (
     NewsletterSubscriptionSerializer, 
     PopupDismissalSerializer,
@@ -26,25 +37,39 @@ from .serializers import (
 )
 
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def subscribe_newsletter(request):
-    """Subscribe to newsletter with SES integration"""
-    serializer = NewsletterSubscriptionSerializer(data=request.data)
+def _subscribe(data):
+    """Validate and save a subscription; returns (response body, status)"""
+    serializer = NewsletterSubscriptionSerializer(data=data)
     
     if serializer.is_valid():
         subscriber = serializer.save()
         
-        return Response({
+        return {
             'success': True,
-            'message': 'Successfully subscribed to our newsletter! Welcome email sent.',
+            'message': 'Successfully subscribed to our newsletter! A welcome email is on its way.',
             'data': NewsletterSubscriberSerializer(subscriber).data
-        }, status=status.HTTP_201_CREATED)
+        }, status.HTTP_201_CREATED
     
-    return Response({
+    return {
         'success': False,
         'errors': serializer.errors
-    }, status=status.HTTP_400_BAD_REQUEST)
+    }, status.HTTP_400_BAD_REQUEST
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def subscribe_newsletter(request):
+    """Subscribe to newsletter with SES integration"""
+    body, status_code = _subscribe(request.data)
+    return Response(body, status=status_code)
+
+
+@async_api_view(['POST'], permission_classes=[AllowAny])
+async def subscribe_newsletter_async(request):
+    """subscribe_newsletter for ASGI; the welcome email is queued either way (see outbox.py)"""
+    # Validation and the get_or_create run in one hop, so they share a connection and transaction state
+    body, status_code = await sync_to_async(_subscribe)(request.data)
+    return Response(body, status=status_code)
 
 
 @api_view(['POST'])
@@ -91,7 +116,17 @@ def unsubscribe_by_token(request, token):
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def dismiss_popup(request):
-    """Dismiss newsletter popup for 3 days"""
+    """Dismiss newsletter popup for POPUP_DISMISSAL_DAYS"""
+    dismissal_days = popup.get_dismissal_days()
+    
+    if popup.uses_cookie_mode():
+        response = Response({
+            'success': True,
+            'message': f'Popup dismissed for {dismissal_days} days'
+        })
+        popup.set_dismissal_cookie(response)
+        return response
+    
     session_key = request.data.get('session_key')
     
     if not session_key:
@@ -100,45 +135,67 @@ def dismiss_popup(request):
             'message': 'Session key is required'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Create or update dismissal record
-    dismissal, created = PopupDismissal.objects.update_or_create(
-        session_key=session_key,
-        user=request.user if request.user.is_authenticated else None,
-        defaults={'dismissed_at': timezone.now()}
+    popup.cache_dismissal(
+        session_key,
+        user=request.user if request.user.is_authenticated else None
     )
     
     return Response({
         'success': True,
-        'message': 'Popup dismissed for 3 days'
+        'message': f'Popup dismissed for {dismissal_days} days'
     })
 
 
+@replica_reads
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def check_popup_status(request):
-    """Check if popup should be shown"""
-    session_key = request.GET.get('session_key')
-    
-    if not session_key:
-        return Response({
-            'show_popup': True,
-            'message': 'No session key provided'
-        })
-    
-    # Check for valid dismissal
-    dismissal = PopupDismissal.objects.filter(
-        session_key=session_key,
-        user=request.user if request.user.is_authenticated else None
-    ).first()
+    """Check if popup should be shown (served from cache or signed cookie)"""
+    if popup.uses_cookie_mode():
+        dismissed_at = popup.get_cookie_dismissal(request)
+    else:
+        session_key = request.GET.get('session_key')
+        
+        if not session_key:
+            return Response({
+                'show_popup': True,
+                'message': 'No session key provided'
+            })
+        
+        dismissed_at = popup.get_cached_dismissal(
+            session_key,
+            user=request.user if request.user.is_authenticated else None
+        )
     
-    if dismissal and dismissal.is_valid():
-        show_popup = False
+    return Response({
+        'show_popup': dismissed_at is None,
+        'dismissed_at': dismissed_at.isoformat() if dismissed_at else None
+    })
+
+
+@replica_reads
+@async_api_view(['GET'], permission_classes=[AllowAny])
+async def check_popup_status_async(request):
+    """check_popup_status for ASGI: the cache (and the rare DB fallback) is awaited"""
+    if popup.uses_cookie_mode():
+        dismissed_at = popup.get_cookie_dismissal(request)
     else:
-        show_popup = True
+        session_key = request.GET.get('session_key')
+        
+        if not session_key:
+            return Response({
+                'show_popup': True,
+                'message': 'No session key provided'
+            })
+        
+        dismissed_at = await popup.aget_cached_dismissal(
+            session_key,
+            user=request.user if request.user.is_authenticated else None
+        )
     
     return Response({
-        'show_popup': show_popup,
-        'dismissed_at': dismissal.dismissed_at.isoformat() if dismissal else None
+        'show_popup': dismissed_at is None,
+        'dismissed_at': dismissed_at.isoformat() if dismissed_at else None
     })
 
 
@@ -216,30 +273,94 @@ def send_test_email(request):
     }, status=400)
 
 
+class SubscriberPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+SUBSCRIBER_EXPORT_FIELDS = ['id', 'email', 'name', 'is_active', 'subscribed_at', 'unsubscribed_at', 'token']
+
+
+def _filter_subscribers(request):
+    """Subscriber queryset with the optional ?is_active= filter applied"""
+    subscribers = NewsletterSubscriber.objects.all()
+    
+    is_active = request.GET.get('is_active')
+    if is_active is not None:
+        subscribers = subscribers.filter(is_active=is_active.lower() == 'true')
+    
+    return subscribers.order_by('-subscribed_at', '-id')
+
+
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def subscriber_list(request):
-    """List all subscribers (admin only)"""
-    subscribers = NewsletterSubscriber.objects.all().order_by('-subscribed_at')
-    serializer = NewsletterSubscriberSerializer(subscribers, many=True)
-    return Response(serializer.data)
+    """List subscribers, paginated (admin only)"""
+    subscribers = _filter_subscribers(request)
+    paginator = SubscriberPagination()
+    page = paginator.paginate_queryset(subscribers, request)
+    serializer = NewsletterSubscriberSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+
+class _EchoBuffer:
+    """File-like object that hands back whatever csv.writer writes to it"""
+    def write(self, value):
+        return value
+
+
+def _export_value(value):
+    """Make a row value JSON/CSV friendly (csv.writer writes None as an empty cell)"""
+    if value is None or isinstance(value, (bool, int)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def subscriber_export(request, export_format):
+    """Stream all subscribers as CSV or NDJSON without loading them into memory"""
+    if export_format not in ('csv', 'ndjson'):
+        return Response({'error': 'Unsupported export format'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    rows = _filter_subscribers(request).values_list(*SUBSCRIBER_EXPORT_FIELDS).iterator(chunk_size=2000)
+    
+    if export_format == 'csv':
+        writer = csv.writer(_EchoBuffer())
+        
+        def stream():
+            yield writer.writerow(SUBSCRIBER_EXPORT_FIELDS)
+            for row in rows:
+                yield writer.writerow([_export_value(value) for value in row])
+        
+        content_type = 'text/csv'
+    else:
+        def stream():
+            for row in rows:
+                record = {field: _export_value(value) for field, value in zip(SUBSCRIBER_EXPORT_FIELDS, row)}
+                yield json.dumps(record) + '\n'
+        
+        content_type = 'application/x-ndjson'
+    
+    response = StreamingHttpResponse(streaming_content(stream()), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="newsletter_subscribers.{export_format}"'
+    return response
 
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def subscriber_stats(request):
     """Get newsletter statistics"""
-    total_subscribers = NewsletterSubscriber.objects.count()
-    active_subscribers = NewsletterSubscriber.objects.filter(is_active=True).count()
-    recent_subscribers = NewsletterSubscriber.objects.filter(
-        subscribed_at__gte=timezone.now() - timezone.timedelta(days=30)
-    ).count()
+    stats = NewsletterSubscriber.get_stats()
     
     return Response({
-        'total_subscribers': total_subscribers,
-        'active_subscribers': active_subscribers,
-        'recent_subscribers': recent_subscribers,
-        'inactive_subscribers': total_subscribers - active_subscribers
+        'total_subscribers': stats['total'],
+        'active_subscribers': stats['active'],
+        'recent_subscribers': stats['new_last_30_days'],
+        'inactive_subscribers': stats['inactive']
     })
 
 
@@ -252,6 +373,44 @@ def email_logs(request):
     return Response(serializer.data)
 
 
+# Email tracking endpoints
+# 1x1 transparent GIF
+TRACKING_PIXEL = (
+    b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00'
+    b'\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+)
+
+
+@never_cache
+@require_GET
+def track_open(request, token):
+    """Record an email open and return a transparent pixel"""
+    if settings.NEWSLETTER_SETTINGS.get('TRACK_OPENS', False):
+        payload = tracking.read_token(token)
+        if payload:
+            tracking.record_event(payload.get('m'), 'opened')
+    
+    return HttpResponse(TRACKING_PIXEL, content_type='image/gif')
+
+
+@never_cache
+@require_GET
+def track_click(request, token):
+    """Record an email link click and redirect to the original URL"""
+    payload = tracking.read_token(token)
+    url = payload.get('u') if payload else None
+    
+    # The URL is covered by the token signature, so only links we generated
+    # can be redirected to (no open redirect)
+    if not url:
+        return HttpResponseBadRequest('Invalid tracking link')
+    
+    if settings.NEWSLETTER_SETTINGS.get('TRACK_CLICKS', False):
+        tracking.record_event(payload.get('m'), 'clicked')
+    
+    return HttpResponseRedirect(url)
+
+
 # Legacy endpoint for backward compatibility
 @csrf_exempt
 def newsletter_subscribe_legacy(request):
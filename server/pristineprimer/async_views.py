@@ -0,0 +1,142 @@
+# pristineprimer/async_views.py
+"""
+Async (ASGI) versions of DRF function views.
+
+Under ASGI a sync view holds one of the server's worker threads for the
+whole request, including the time spent waiting on the cache, SES or the
+database. ``async_api_view`` is @api_view for ``async def`` views: the view
+runs on the event loop and only the parts that need Django's sync machinery
+leave it.
+
+What DRF does before a view (authentication, CSRF for session users,
+permission checks, content negotiation) runs unchanged, in one hop to the
+request's sync thread, because sessions and users are loaded through the
+sync ORM. The view then gets a DRF Request, so ``request.data``,
+``request.query_params`` and an already loaded ``request.user`` work as
+usual. It returns a DRF Response, rendered here with the JSON renderer only
+(no browsable API).
+
+Django 4.2's async ORM calls (``afirst``, ``acreate``, ``aaggregate``,
+``async for``) still run the query in a worker thread; the event loop is
+free while they do. Served by a sync (WSGI) server, async views work but
+pay for an event loop per request, so ``ASYNC_VIEWS`` picks which versions
+the URLconfs route to and is on by default only in pristineprimer/asgi.py.
+
+Sync views that stream (exports, the partner feed) pass their iterator
+through ``streaming_content``: under ASGI, Django 4.2 would otherwise read a
+sync iterator to the end before sending the first byte.
+"""
+from functools import wraps
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import exceptions
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from .renderers import ORJSONRenderer
+
+
+class AsyncAPIView(APIView):
+    """Runs one ``async def`` handler the way APIView.dispatch runs a method handler"""
+    renderer_classes = [ORJSONRenderer]
+
+    @property
+    def allowed_methods(self):
+        # The handler isn't a method of the class, so APIView's hasattr() test can't find it
+        return [method.upper() for method in self.http_method_names]
+
+    async def adispatch(self, handler, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authentication reads the session and the user from the database
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            method = request.method.lower()
+            if method == 'options':
+                response = self.options(request, *args, **kwargs)
+            elif method in self.http_method_names:
+                response = await handler(request, *args, **kwargs)
+            else:
+                raise exceptions.MethodNotAllowed(request.method)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        response = self.finalize_response(request, response, *args, **kwargs)
+        return _rendered(response)
+
+
+def _rendered(response):
+    """
+    A plain HttpResponse with the rendered body. Django renders responses
+    that have a render() method in a sync thread, one more hop per request.
+    """
+    if not isinstance(response, Response):
+        return response
+    content = response.rendered_content
+    rendered = HttpResponse(content, status=response.status_code)
+    for header, value in response.items():
+        rendered[header] = value
+    rendered.cookies = response.cookies
+    return rendered
+
+
+def async_api_view(http_method_names, permission_classes=None):
+    """
+    @api_view for ``async def`` views::
+
+        @async_api_view(['POST'], permission_classes=[IsAuthenticated])
+        async def track(request):
+            await Model.objects.acreate(...)
+            return Response(...)
+
+    Decorators that mark views (``replica_reads``, ``query_budget``) go above it.
+    """
+    def decorator(func):
+        view_class = type(func.__name__, (AsyncAPIView,), {
+            '__doc__': func.__doc__,
+            '__module__': func.__module__,
+            'http_method_names': [method.lower() for method in http_method_names] + ['options'],
+            'permission_classes': (
+                api_settings.DEFAULT_PERMISSION_CLASSES if permission_classes is None else permission_classes
+            ),
+        })
+
+        @wraps(func)
+        async def view(request, *args, **kwargs):
+            return await view_class().adispatch(func, request, *args, **kwargs)
+
+        view.cls = view_class
+        # As with APIView.as_view(): SessionAuthentication enforces CSRF itself
+        view.csrf_exempt = True
+        return view
+    return decorator
+
+
+async def _aiterate(iterator, batch_size):
+    next_batch = sync_to_async(lambda: list(islice(iterator, batch_size)))
+    while True:
+        # The request's sync thread, where the view opened its queryset iterator
+        batch = await next_batch()
+        if not batch:
+            return
+        for item in batch:
+            yield item
+
+
+def streaming_content(iterable, batch_size=200):
+    """
+    StreamingHttpResponse content for ``iterable`` that streams on either
+    server: unchanged under WSGI, an async iterator pulling ``batch_size``
+    items per thread hop under ASGI (``ASYNC_VIEWS``).
+    """
+    if not settings.ASYNC_VIEWS:
+        return iterable
+    return _aiterate(iter(iterable), batch_size)
@@ -0,0 +1,175 @@
+# pristineprimer/compression.py
+"""
+Negotiated gzip/brotli compression for JSON API responses.
+
+CompressionMiddleware compresses a response when all of these hold:
+
+- the request is a GET or HEAD (responses to POSTs can carry tokens next to
+  user input, which is what BREACH-style attacks need)
+- the content type is one of API_COMPRESSION['CONTENT_TYPES']
+- the body is at least MIN_SIZE bytes and isn't streamed (the partner feed
+  compresses itself)
+- the client accepts br or gzip; br is preferred when the Brotli package
+  is installed and the client's q-values don't say otherwise
+
+A strong ETag stays strong: the encoding is appended inside the quotes
+("abc" -> "abc-gzip"), because a compressed body is a different
+representation. Incoming If-None-Match tags have those suffixes stripped, so
+views compare against the tags they produced, and a 304 echoes the client's
+suffixed tag back.
+"""
+import gzip
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'MIN_SIZE': 1024,  # bytes; smaller bodies aren't worth the CPU
+    'CONTENT_TYPES': ['application/json'],
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,  # 0-11; above ~6 costs far more CPU for little gain on JSON
+}
+
+# Server preference, best first
+ENCODINGS = ['br', 'gzip']
+
+_SUFFIXED_ETAG = re.compile(r'\A((?:W/)?"[^"]*)-(br|gzip)"\Z')
+
+
+def get_compression_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'API_COMPRESSION', {})}
+
+
+def available_encodings():
+    return [encoding for encoding in ENCODINGS if encoding != 'br' or brotli is not None]
+
+
+def choose_encoding(accept_encoding):
+    """The best available coding the Accept-Encoding header allows, or None"""
+    weights = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[coding] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = weights.get(encoding, weights.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(content, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(content, mode=brotli.MODE_TEXT, quality=config['BROTLI_QUALITY'])
+    # mtime=0 keeps the output deterministic, so the suffixed ETag stays strong
+    return gzip.compress(content, compresslevel=config['GZIP_LEVEL'], mtime=0)
+
+
+def _strip_etag_suffixes(request):
+    """Rewrite If-None-Match to the uncompressed tags; returns {tag: tag the client sent}"""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return {}
+    sent = {}
+    tags = []
+    for tag in parse_etags(header):
+        match = _SUFFIXED_ETAG.match(tag)
+        if match:
+            sent[match[1] + '"'] = tag
+            tag = match[1] + '"'
+        tags.append(tag)
+    if sent:
+        request.META['HTTP_IF_NONE_MATCH'] = ', '.join(tags)
+    return sent
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        config = get_compression_settings()
+        if not config['ENABLED']:
+            return self.get_response(request)
+
+        sent_etags = _strip_etag_suffixes(request)
+        response = self.get_response(request)
+        encoding = self.negotiate(request, response, config, sent_etags)
+        if encoding is not None:
+            self.encode(response, encoding, config)
+        return response
+
+    async def __acall__(self, request):
+        config = get_compression_settings()
+        if not config['ENABLED']:
+            return await self.get_response(request)
+
+        sent_etags = _strip_etag_suffixes(request)
+        response = await self.get_response(request)
+        encoding = self.negotiate(request, response, config, sent_etags)
+        if encoding is not None:
+            # Compressing a large page takes milliseconds; keep it off the event loop
+            await sync_to_async(self.encode, thread_sensitive=False)(response, encoding, config)
+        return response
+
+    def negotiate(self, request, response, config, sent_etags):
+        """Fix up the headers; returns the encoding to compress the body with, or None"""
+        if response.status_code == 304:
+            etag = response.get('ETag')
+            if etag in sent_etags:
+                response['ETag'] = sent_etags[etag]
+            return None
+
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if (
+            request.method not in ('GET', 'HEAD') or response.streaming
+            or content_type not in config['CONTENT_TYPES'] or response.has_header('Content-Encoding')
+        ):
+            return None
+
+        # Even a body too small to compress varies: the same URL may grow past MIN_SIZE
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < config['MIN_SIZE']:
+            return None
+        return choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+    def encode(self, response, encoding, config):
+        compressed = compress(response.content, encoding, config)
+        if len(compressed) >= len(response.content):
+            return
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.endswith('"'):
+            response['ETag'] = f'{etag[:-1]}-{encoding}"'
@@ -0,0 +1,92 @@
+# pristineprimer/conditional.py
+"""
+Conditional GET for list-style API responses, without serializing.
+
+Hashing a response body to get its ETag means building the body first,
+which is the expensive part. A listing page is instead versioned by
+the queryset it is built from: one aggregate query for the row count and
+the latest ``updated_at``. An edit bumps ``updated_at``, a new row changes
+both values, and a deleted or unpublished row changes the count. The ETag
+hashes that version together with everything else the body depends on: the
+full path and query string (filters, page, ?fields=), the negotiated media
+type, and whatever the view adds (e.g. its serializer's fields).
+
+Every write that changes a listing has to move ``updated_at``: saves that
+pass update_fields list it, queryset.update() calls set it (see the admin
+actions), and rows in other tables that list payloads show (images and
+their renditions, amenities edited in the admin) bump it through
+``Property.touch()``. Counters such as ``views_count`` and seller names do
+not, so a revalidated page may show them stale until the listing itself
+changes. The change feed treats counters the same way.
+
+Views call ``not_modified()`` before touching the page. It returns the 304
+(or 412 for a failed If-Match) to send instead, or None; in that case the
+view builds the response and passes it to ``tag()``.
+
+No Last-Modified is sent: deleting a row leaves the latest ``updated_at``
+unchanged, so If-Modified-Since would wrongly answer 304.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+}
+
+
+def get_conditional_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'API_CONDITIONAL_GET', {})}
+
+
+def _version_query(queryset):
+    # values('pk') keeps a DISTINCT queryset from dragging every loaded column into the subquery
+    return queryset.order_by().values('pk'), {'count': Count('pk'), 'latest': Max('updated_at')}
+
+
+def queryset_version(queryset):
+    """(row count, latest updated_at) of ``queryset``, in one query"""
+    rows, aggregates = _version_query(queryset)
+    version = rows.aggregate(**aggregates)
+    return version['count'], version['latest']
+
+
+async def aqueryset_version(queryset):
+    rows, aggregates = _version_query(queryset)
+    version = await rows.aaggregate(**aggregates)
+    return version['count'], version['latest']
+
+
+def _etag(request, count, latest, parts):
+    key = '|'.join([
+        request.get_full_path(),
+        getattr(request, 'accepted_media_type', '') or '',
+        str(count),
+        latest.isoformat() if latest else '',
+        *map(str, parts),
+    ])
+    return '"%s"' % hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def queryset_etag(request, queryset, *parts):
+    """Strong ETag for a response built from ``queryset``"""
+    return _etag(request, *queryset_version(queryset), parts)
+
+
+async def aqueryset_etag(request, queryset, *parts):
+    return _etag(request, *await aqueryset_version(queryset), parts)
+
+
+def not_modified(request, etag):
+    """The 304/412 response for ``request``'s validators, or None to build the response"""
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        response['ETag'] = etag
+    return response
+
+
+def tag(response, etag):
+    response['ETag'] = etag
+    return response
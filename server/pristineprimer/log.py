@@ -0,0 +1,177 @@
+# pristineprimer/log.py
+"""
+Non-blocking, structured logging.
+
+Request threads never touch a file or a terminal. ``queue_handler`` builds
+a QueueHandler that puts each record on an in-memory queue. A QueueListener
+thread drains that queue into the real handlers:
+
+- a rotating file with one JSON object per line (``JSONFormatter``)
+- optionally the console, in the usual human-readable format
+
+All a request thread does is merge the message with its arguments (so
+later changes to those objects don't leak into the log) and call
+put_nowait(). If the listener falls behind and the queue fills up, new
+records are dropped and counted instead of blocking the request. The
+count is reported once space frees up.
+
+``SamplingFilter`` keeps a fraction of the routine records (INFO and below
+by default) from high-volume loggers such as the per-request query
+profiles, and always keeps everything above that level. It runs before the
+record is queued, so dropped records cost one random() call.
+
+Rotation happens in each process. With several worker processes writing
+one file, set ``max_bytes=0``: the file is then reopened when an external
+tool (logrotate) moves it, rather than being rotated by every worker.
+"""
+import atexit
+import datetime
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import traceback
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+    import json
+
+# Attributes every LogRecord has; anything else came in through ``extra=``
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+JSON_TYPES = (str, int, float, bool, type(None), list, tuple, dict)
+
+
+def _dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data, default=str).decode()
+    return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record: timestamp, level, logger, message, location, extras"""
+
+    def format(self, record):
+        data = {
+            'time': datetime.datetime.fromtimestamp(record.created, tz=datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key in RECORD_ATTRIBUTES or key in data:
+                continue
+            if key == 'request':
+                # django.request passes the request object itself
+                data['method'] = getattr(value, 'method', None)
+                data['path'] = getattr(value, 'path', None)
+            elif isinstance(value, JSON_TYPES):
+                data[key] = value
+        if record.exc_info:
+            data['exception'] = ''.join(traceback.format_exception(*record.exc_info)).rstrip()
+        elif record.exc_text:
+            data['exception'] = record.exc_text
+        if record.stack_info:
+            data['stack'] = record.stack_info
+        return _dumps(data)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep ``rate`` (0-1) of the records at or below ``max_level``, and every record above it"""
+
+    def __init__(self, rate=1.0, max_level='INFO'):
+        super().__init__()
+        self.rate = float(rate)
+        self.max_level = logging.getLevelName(max_level) if isinstance(max_level, str) else max_level
+
+    def filter(self, record):
+        return record.levelno > self.max_level or self.rate >= 1 or random.random() < self.rate
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room: the queue may well be full when the process exits
+        self.queue.put(self._sentinel)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller and follows the process across fork()"""
+
+    def __init__(self, targets, queue_size=10000):
+        self.targets = list(targets)
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._lock_start = threading.Lock()
+        super().__init__(None)
+        self._start()
+
+    def _start(self):
+        # A listener thread doesn't survive fork(), e.g. gunicorn --preload: start a new one in the child
+        with self._lock_start:
+            self.pid = os.getpid()
+            self.queue = queue.Queue(self.queue_size)
+            self.listener = _Listener(self.queue, *self.targets, respect_handler_level=True)
+            self.listener.start()
+        atexit.register(self.stop)
+
+    def prepare(self, record):
+        # Unlike the parent: no formatting here, and the traceback stays for the listener to render
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self.pid != os.getpid():
+            self._start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            self.queue.put_nowait(logging.makeLogRecord({
+                'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                'msg': 'Log queue was full; dropped %d records', 'args': (dropped,),
+            }))
+
+    def stop(self):
+        """Write out what is queued and stop the listener thread"""
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.stop()
+
+    def close(self):
+        self.stop()
+        super().close()
+
+
+def queue_handler(filename, max_bytes=10 * 1024 * 1024, backup_count=5, console=True,
+                  console_format='{levelname} {asctime} {name} {message}', queue_size=10000):
+    """
+    A NonBlockingQueueHandler writing JSON lines to ``filename`` (and plain
+    text to stderr with ``console``). For LOGGING handlers, via ``'()'``.
+    """
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    if max_bytes:
+        file_handler = logging.handlers.RotatingFileHandler(
+            filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+    else:
+        file_handler = logging.handlers.WatchedFileHandler(filename, encoding='utf-8')
+    file_handler.setFormatter(JSONFormatter())
+    targets = [file_handler]
+
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(console_format, style='{'))
+        targets.append(console_handler)
+    return NonBlockingQueueHandler(targets, queue_size=queue_size)
@@ -0,0 +1,41 @@
+# pristineprimer/parsers.py
+"""
+orjson-backed JSON parser for the API.
+
+UTF-8 bodies are decoded with orjson; anything orjson rejects is parsed
+again with DRF's JSONParser logic, so the accepted input and the error
+messages stay the same. Other charsets, or a missing orjson, go straight
+to DRF's parser.
+"""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import json
+
+from .renderers import ORJSONRenderer, orjson
+
+UTF8 = {'utf-8', 'utf8'}
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer if orjson else JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower() not in UTF8:
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            pass
+
+        # e.g. NaN with STRICT_JSON off; also produces DRF's error message
+        try:
+            parse_constant = json.strict_constant if self.strict else None
+            return json.loads(body.decode(encoding), parse_constant=parse_constant)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
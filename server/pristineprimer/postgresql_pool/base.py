@@ -0,0 +1,175 @@
+# pristineprimer/postgresql_pool/base.py
+"""
+PostgreSQL backend that draws connections from an in-process pool.
+
+Django 4.2 has no pooling of its own: a connection either lives for one
+request (CONN_MAX_AGE = 0) or is pinned to one worker thread. With this
+engine a request still "connects" and "closes" as usual, but the physical
+connection comes from, and goes back to, a pool shared by the threads of
+the worker process. One pool per process, database alias and target
+database, created lazily so it is never shared across a fork.
+
+Configured by the ``POOL`` key of the database settings:
+
+- MAX_SIZE: connections per worker process; requests beyond it wait
+  TIMEOUT seconds and then fail with OperationalError. Size it to the
+  worker's threads, keeping workers x MAX_SIZE under the server's
+  max_connections.
+- MAX_IDLE / MAX_LIFETIME: idle connections older than these (seconds) are
+  closed instead of being handed out
+- CHECK_AFTER: a connection idle this long is pinged (SELECT 1) before
+  reuse, and replaced if the server went away
+
+Use it with CONN_MAX_AGE = 0, so Django hands the connection back at the end
+of each request. Connections come back rolled back to an idle state.
+Anything set with a plain SET during a request survives into the next one,
+exactly as with persistent connections.
+"""
+import logging
+import os
+import threading
+import time
+
+import psycopg2
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from django.db.utils import OperationalError
+from psycopg2.extensions import (
+    TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INERROR, TRANSACTION_STATUS_INTRANS,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SETTINGS = {
+    'MAX_SIZE': 4,
+    'TIMEOUT': 10,
+    'MAX_IDLE': 300,
+    'MAX_LIFETIME': 3600,
+    'CHECK_AFTER': 30,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """A bounded LIFO stack of open psycopg connections"""
+
+    def __init__(self, max_size, timeout, max_idle, max_lifetime, check_after):
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle = []  # [(connection, returned_at)], most recently returned last
+        self._created = {}  # id(connection) -> created_at
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def get(self, connect):
+        """An idle connection, or a new one from ``connect()``"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise OperationalError(f"No pooled database connection became free within {self.timeout}s")
+        try:
+            while True:
+                with self._lock:
+                    connection, returned_at = self._idle.pop() if self._idle else (None, None)
+                if connection is None:
+                    connection = connect()
+                    with self._lock:
+                        self._created[id(connection)] = time.monotonic()
+                        self.opened += 1
+                    return connection
+                if self._reusable(connection, returned_at):
+                    return connection
+                self._discard(connection)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def put(self, connection):
+        try:
+            if connection.closed:
+                self._forget(connection)
+                return
+            status = connection.info.transaction_status
+            if status in (TRANSACTION_STATUS_INTRANS, TRANSACTION_STATUS_INERROR):
+                connection.rollback()
+            elif status != TRANSACTION_STATUS_IDLE:
+                # Mid-query or broken
+                self._discard(connection)
+                return
+            with self._lock:
+                self._idle.append((connection, time.monotonic()))
+        except psycopg2.Error:
+            self._discard(connection)
+        finally:
+            self._slots.release()
+
+    def _reusable(self, connection, returned_at):
+        now = time.monotonic()
+        if connection.closed or now - returned_at > self.max_idle:
+            return False
+        if now - self._created.get(id(connection), now) > self.max_lifetime:
+            return False
+        if now - returned_at > self.check_after:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+            except psycopg2.Error:
+                return False
+        return True
+
+    def _forget(self, connection):
+        with self._lock:
+            self._created.pop(id(connection), None)
+
+    def _discard(self, connection):
+        self._forget(connection)
+        try:
+            connection.close()
+        except psycopg2.Error:
+            logger.debug("Error closing a discarded pooled connection", exc_info=True)
+
+    def close_idle(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._discard(connection)
+
+
+def get_pool(wrapper):
+    settings_dict = wrapper.settings_dict
+    key = (
+        os.getpid(), wrapper.alias,
+        settings_dict['NAME'], settings_dict['HOST'], settings_dict['PORT'], settings_dict['USER'],
+    )
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                config = {**DEFAULT_POOL_SETTINGS, **settings_dict.get('POOL', {})}
+                pool = _pools[key] = ConnectionPool(
+                    max_size=config['MAX_SIZE'],
+                    timeout=config['TIMEOUT'],
+                    max_idle=config['MAX_IDLE'],
+                    max_lifetime=config['MAX_LIFETIME'],
+                    check_after=config['CHECK_AFTER'],
+                )
+    return pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        # The parent sets these up on connections it opens; pooled ones keep them
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        self.isolation_level = (
+            IsolationLevel.READ_COMMITTED if isolation_level is None else IsolationLevel(isolation_level)
+        )
+        return get_pool(self).get(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                get_pool(self).put(self.connection)
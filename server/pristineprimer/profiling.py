@@ -0,0 +1,366 @@
+# pristineprimer/profiling.py
+"""
+Per-request SQL profiling for the API.
+
+QueryProfilingMiddleware is always installed but does nothing unless
+QUERY_PROFILING['ENABLED'] is set (or a test has switched recording on, see
+pristineprimer.pytest_query_budget). When active, every request records:
+
+- the number of SQL queries and total SQL time, on every database alias
+- duplicate queries: SQL with literals and IN-lists folded into a signature,
+  so the same statement repeated per row (an N+1) shows up as one signature
+  with a high count
+- time spent in DRF serializers (``serializer.data``) and the queries
+  issued from inside them, which is where N+1s usually hide
+- the endpoint's declared query budget, if any
+
+Each request emits one structured log line on the ``pristineprimer.profiling``
+logger and is folded into per-endpoint aggregates, served to admins by
+``query_profile_stats``. Aggregates are per process.
+
+Budgets are declared with the ``query_budget`` decorator (above @api_view
+on function views, or on a viewset action method), or by view name in
+QUERY_PROFILING['BUDGETS'].
+"""
+import contextvars
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'ENABLED': False,
+    'DUPLICATE_THRESHOLD': 3,  # a signature repeated this often in one request is flagged as N+1
+    'MAX_ENDPOINTS': 500,  # aggregates kept per process
+    'BUDGETS': {},  # {'view-name': max queries per request}
+}
+
+_current = contextvars.ContextVar('query_profile', default=None)
+_force_enabled = False
+_listeners = []
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_profiling_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'QUERY_PROFILING', {})}
+
+
+def is_enabled():
+    return _force_enabled or get_profiling_settings()['ENABLED']
+
+
+def query_budget(max_queries):
+    """Declare the most SQL queries one request to this view may issue"""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+# === SQL SIGNATURES ===
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+
+def sql_signature(sql):
+    """Fold literals and placeholder lists so repeats of one statement compare equal"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+_SELECT_LIST = re.compile(r'^SELECT (?:DISTINCT )?.+? FROM ', re.IGNORECASE)
+
+
+def shorten_signature(signature, length=300):
+    """Signature for display: the column list says little, the FROM/WHERE says which N+1 it is"""
+    return _SELECT_LIST.sub('SELECT ... FROM ', signature)[:length]
+
+
+# === RECORDING ===
+
+class RequestProfile:
+    """What one request did; the middleware fills it in"""
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.endpoint = None
+        self.budget = None
+        self.status = None
+        self.queries = 0
+        self.sql_time = 0.0
+        self.signatures = Counter()
+        self.serializer_time = 0.0
+        self.serializer_queries = 0
+        self.serializer_depth = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper() hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+            self.signatures[sql_signature(sql)] += 1
+            if self.serializer_depth:
+                self.serializer_queries += 1
+
+    def duplicates(self, threshold=None):
+        threshold = threshold or get_profiling_settings()['DUPLICATE_THRESHOLD']
+        return [(signature, count) for signature, count in self.signatures.most_common() if count >= threshold]
+
+    @property
+    def over_budget(self):
+        return self.budget is not None and self.queries > self.budget
+
+    def as_dict(self):
+        return {
+            'endpoint': self.endpoint,
+            'method': self.method,
+            'path': self.path,
+            'status': self.status,
+            'queries': self.queries,
+            'sql_ms': round(self.sql_time * 1000, 2),
+            'serializer_ms': round(self.serializer_time * 1000, 2),
+            'serializer_queries': self.serializer_queries,
+            'duration_ms': round(self.duration * 1000, 2),
+            'duplicates': [
+                {'sql': shorten_signature(signature), 'count': count}
+                for signature, count in self.duplicates()[:5]
+            ],
+            'budget': self.budget,
+            'over_budget': self.over_budget,
+        }
+
+
+def _install_serializer_timing():
+    """Time the outermost ``serializer.data`` of each request (nested serializers don't call .data)"""
+    original = BaseSerializer.data
+    if getattr(original.fget, 'profiled', False):
+        return
+
+    def data(self):
+        profile = _current.get()
+        if profile is None:
+            return original.fget(self)
+        profile.serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return original.fget(self)
+        finally:
+            profile.serializer_depth -= 1
+            if not profile.serializer_depth:
+                profile.serializer_time += time.perf_counter() - start
+
+    data.profiled = True
+    BaseSerializer.data = property(data)
+
+
+def enable_recording(listener=None):
+    """Record every request regardless of settings; ``listener(profile)`` is called per request"""
+    global _force_enabled
+    _force_enabled = True
+    _install_serializer_timing()
+    if listener is not None:
+        _listeners.append(listener)
+
+
+def disable_recording(listener=None):
+    global _force_enabled
+    if listener in _listeners:
+        _listeners.remove(listener)
+    _force_enabled = bool(_listeners)
+
+
+def _declared_budget(view_func, method, view_name):
+    budget = getattr(view_func, 'query_budget', None)
+    view_class = getattr(view_func, 'cls', None)
+    if budget is None and view_class is not None:
+        actions = getattr(view_func, 'actions', None) or {}
+        handler = getattr(view_class, actions.get(method.lower(), method.lower()), None)
+        budget = getattr(handler, 'query_budget', None)
+        if budget is None:
+            budget = getattr(view_class, 'query_budget', None)
+    if budget is None:
+        budget = get_profiling_settings()['BUDGETS'].get(view_name)
+    return budget
+
+
+def _record(profile):
+    key = profile.endpoint
+    with _stats_lock:
+        entry = _stats.get(key)
+        if entry is None:
+            if len(_stats) >= get_profiling_settings()['MAX_ENDPOINTS']:
+                return
+            entry = _stats[key] = {
+                'endpoint': key,
+                'requests': 0,
+                'queries': 0,
+                'max_queries': 0,
+                'sql_ms': 0.0,
+                'serializer_ms': 0.0,
+                'duration_ms': 0.0,
+                'n_plus_one_requests': 0,
+                'over_budget_requests': 0,
+                'budget': profile.budget,
+                'duplicates': Counter(),
+            }
+        entry['requests'] += 1
+        entry['queries'] += profile.queries
+        entry['max_queries'] = max(entry['max_queries'], profile.queries)
+        entry['sql_ms'] += profile.sql_time * 1000
+        entry['serializer_ms'] += profile.serializer_time * 1000
+        entry['duration_ms'] += profile.duration * 1000
+        duplicates = profile.duplicates()
+        if duplicates:
+            entry['n_plus_one_requests'] += 1
+            for signature, count in duplicates:
+                entry['duplicates'][shorten_signature(signature)] += count
+        if profile.over_budget:
+            entry['over_budget_requests'] += 1
+
+
+def get_stats():
+    """Per-endpoint aggregates, most queries first"""
+    with _stats_lock:
+        entries = [{**entry, 'duplicates': Counter(entry['duplicates'])} for entry in _stats.values()]
+
+    results = []
+    for entry in entries:
+        requests = entry['requests']
+        results.append({
+            'endpoint': entry['endpoint'],
+            'requests': requests,
+            'avg_queries': round(entry['queries'] / requests, 2),
+            'max_queries': entry['max_queries'],
+            'budget': entry['budget'],
+            'over_budget_requests': entry['over_budget_requests'],
+            'avg_sql_ms': round(entry['sql_ms'] / requests, 2),
+            'avg_serializer_ms': round(entry['serializer_ms'] / requests, 2),
+            'avg_duration_ms': round(entry['duration_ms'] / requests, 2),
+            'n_plus_one_requests': entry['n_plus_one_requests'],
+            'top_duplicates': [
+                {'sql': signature, 'count': count}
+                for signature, count in entry['duplicates'].most_common(3)
+            ],
+        })
+    results.sort(key=lambda item: item['avg_queries'] * item['requests'], reverse=True)
+    return results
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+# === MIDDLEWARE ===
+
+class QueryProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        if get_profiling_settings()['ENABLED']:
+            _install_serializer_timing()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not is_enabled():
+            return self.get_response(request)
+
+        profile, token, start = self.start(request)
+        try:
+            with self.wrap_connections(profile):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile, start)
+
+    async def __acall__(self, request):
+        if not is_enabled():
+            return await self.get_response(request)
+
+        # Connections are per thread: the wrappers go on the ones of the thread
+        # that runs this request's sync code and ORM calls, a hop each way
+        profile, token, start = self.start(request)
+        stack = await sync_to_async(self.wrap_connections)(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            _current.reset(token)
+        return self.finish(request, response, profile, start)
+
+    @staticmethod
+    def wrap_connections(profile):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(profile))
+        return stack
+
+    def start(self, request):
+        profile = RequestProfile(request.method, request.path)
+        request.query_profile = profile
+        return profile, _current.set(profile), time.perf_counter()
+
+    def finish(self, request, response, profile, start):
+        profile.duration = time.perf_counter() - start
+        profile.status = response.status_code
+
+        # Looked up here rather than in process_view, which Django would run
+        # in a worker thread on every ASGI request
+        match = getattr(request, 'resolver_match', None)
+        profile.endpoint = f"{request.method} {match.view_name if match else request.path}"
+        if match is not None:
+            profile.budget = _declared_budget(match.func, request.method, match.view_name)
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("query_profile %s", json.dumps(profile.as_dict()))
+        _record(profile)
+        for listener in list(_listeners):
+            listener(profile)
+        return response
+
+
+# === ADMIN ENDPOINT ===
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def query_profile_stats(request):
+    """Per-endpoint query aggregates for this process; DELETE resets them"""
+    if request.method == 'DELETE':
+        reset_stats()
+        return Response(status=204)
+    return Response({
+        'enabled': is_enabled(),
+        'endpoints': get_stats(),
+    })
@@ -0,0 +1,67 @@
+# pristineprimer/pytest_query_budget.py
+"""
+pytest plugin that fails a test when a request it makes exceeds the
+endpoint's query budget.
+
+Activate it with ``-p pristineprimer.pytest_query_budget`` or
+``pytest_plugins = ['pristineprimer.pytest_query_budget']`` in a conftest;
+Django must already be configured (e.g. by pytest-django). While a test runs,
+QueryProfilingMiddleware records every request, and after the test any
+request above its budget fails it, listing the duplicate query signatures.
+
+Budgets come from the view (``pristineprimer.profiling.query_budget`` or
+QUERY_PROFILING['BUDGETS']). A test can set or tighten the budget for all of
+its requests with a marker::
+
+    @pytest.mark.query_budget(6)
+    def test_search(client): ...
+
+``@pytest.mark.query_budget(None)`` opts a test out of the view budgets.
+"""
+import pytest
+
+from . import profiling
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'query_budget(max_queries): fail if any request in the test issues more SQL queries '
+        '(None skips the declared endpoint budgets)',
+    )
+
+
+def _budget_for(profile, marker):
+    if marker is None:
+        return profile.budget
+    return marker.args[0] if marker.args else marker.kwargs.get('max_queries')
+
+
+def _describe(profile, budget):
+    lines = [f"{profile.endpoint} ({profile.path}) issued {profile.queries} queries, budget {budget}"]
+    for signature, count in profile.duplicates(threshold=2)[:3]:
+        lines.append(f"    {count}x {profiling.shorten_signature(signature, 200)}")
+    return '\n'.join(lines)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    profiles = []
+    listener = profiles.append
+    profiling.enable_recording(listener)
+    try:
+        # A failing test raises here, and its own error is reported instead
+        result = yield
+    finally:
+        profiling.disable_recording(listener)
+
+    marker = item.get_closest_marker('query_budget')
+    violations = []
+    for profile in profiles:
+        budget = _budget_for(profile, marker)
+        if budget is not None and profile.queries > budget:
+            violations.append(_describe(profile, budget))
+
+    if violations:
+        pytest.fail('Query budget exceeded:\n' + '\n'.join(violations), pytrace=False)
+    return result
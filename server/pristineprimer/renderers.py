@@ -0,0 +1,46 @@
+# pristineprimer/renderers.py
+"""
+orjson-backed JSON renderer for the API.
+
+Output is byte-for-byte what DRF's JSONRenderer produces for the same data
+(compact separators, UTF-8, U+2028/U+2029 escaped), only faster: orjson
+encodes dicts, lists, strings, numbers and UUIDs natively, and everything
+else (Decimal, datetime, lazy translations, querysets...) goes through
+DRF's own JSONEncoder.default, so those keep DRF's formatting too.
+
+The renderer falls back to DRF's JSONRenderer when orjson isn't installed,
+when the client asks for indentation (``Accept: application/json; indent=4``),
+when UNICODE_JSON / COMPACT_JSON are switched off, and for data orjson
+rejects (e.g. integers beyond 64 bits). One difference remains: NaN and
+infinity render as null instead of raising.
+"""
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+_default = encoders.JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same strict-JavaScript-subset escaping as DRF
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
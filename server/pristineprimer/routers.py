@@ -0,0 +1,173 @@
+# pristineprimer/routers.py
+"""
+Read-replica routing for public, read-only API traffic.
+
+Every read goes to the primary unless all of these hold:
+
+- a database alias DATABASE_REPLICA['ALIAS'] is configured
+- the request is a GET/HEAD/OPTIONS to a view marked with ``replica_reads``
+  (a viewset class or an @api_view function, decorated above @api_view)
+- the model belongs to one of DATABASE_REPLICA['APPS'], so sessions and
+  users are always read from the primary
+- nothing has been written yet in this request, and the primary isn't in
+  the middle of a transaction
+
+Read-your-writes: a response to a request that wrote anything sets a short
+cookie (PIN_SECONDS). That client's following requests read from the primary
+until the replica has had time to catch up, e.g. the listing just created
+with create_property_simple or the favorite just toggled.
+
+Writes always go to the primary, including saves of instances that were
+read from the replica. Code outside a request (commands, background
+threads) is unaffected: it has no routing state, so it uses the primary.
+
+To try it locally, list two databases in the settings, e.g. two SQLite
+files where the replica is a copy of the primary::
+
+    DATABASES = {
+        'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'primary.sqlite3'},
+        'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'replica.sqlite3',
+                    'TEST': {'MIRROR': 'default'}},
+    }
+
+In tests the replica mirrors the primary (TEST MIRROR), so it sees the same
+test data.
+"""
+import contextvars
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+DEFAULT_SETTINGS = {
+    'ALIAS': 'replica',
+    'PIN_SECONDS': 15,  # read-your-writes window after a client's write
+    'PIN_COOKIE': 'db_pin',
+    'APPS': ['properties', 'newsletter'],
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_state = contextvars.ContextVar('replica_routing', default=None)
+
+
+def get_replica_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'DATABASE_REPLICA', {})}
+
+
+def replica_alias():
+    """The replica's alias, or None when no replica is configured"""
+    alias = get_replica_settings()['ALIAS']
+    return alias if alias in settings.DATABASES else None
+
+
+def replica_reads(view):
+    """Allow safe requests to this viewset / function view to read from the replica"""
+    view.replica_reads = True
+    return view
+
+
+def _marked(view_func):
+    # @api_view functions carry the mark themselves, viewsets on view_func.cls
+    view_class = getattr(view_func, 'cls', None)
+    return getattr(view_func, 'replica_reads', False) or getattr(view_class, 'replica_reads', False)
+
+
+class RoutingState:
+    __slots__ = ('request', 'use_replica', 'wrote')
+
+    def __init__(self, request):
+        self.request = request
+        self.use_replica = None  # decided on the first read after URL resolution
+        self.wrote = False
+
+    def replica_allowed(self):
+        if self.use_replica is None:
+            match = getattr(self.request, 'resolver_match', None)
+            if match is None:
+                # Middleware reading before the view is known (sessions, auth)
+                return False
+            self.use_replica = (
+                self.request.method in SAFE_METHODS and _marked(match.func)
+                and get_replica_settings()['PIN_COOKIE'] not in self.request.COOKIES
+            )
+        return self.use_replica
+
+
+class ReplicaRoutingMiddleware:
+    # No process_view: under ASGI Django would run it in a worker thread on
+    # every request, so the view is looked up from resolver_match on first read
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if replica_alias() is None:
+            return self.get_response(request)
+
+        state = RoutingState(request)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(request, response, state)
+
+    async def __acall__(self, request):
+        if replica_alias() is None:
+            return await self.get_response(request)
+
+        # sync_to_async copies the context, so ORM calls in worker threads see this state
+        state = RoutingState(request)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(request, response, state)
+
+    def pin(self, request, response, state):
+        if state.wrote:
+            config = get_replica_settings()
+            response.set_cookie(
+                config['PIN_COOKIE'], '1', max_age=config['PIN_SECONDS'],
+                secure=request.is_secure(), httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (
+            state is not None and not state.wrote and state.replica_allowed()
+            and model._meta.app_label in get_replica_settings()['APPS']
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return replica_alias()
+        # Explicit, or Django would follow an instance read from the replica
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == replica_alias():
+            return False
+        return None
@@ -5,6 +5,8 @@ Django settings for pristineprimer project.
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # ---------------------------
 # BASE DIRECTORY
 # ---------------------------
@@ -61,7 +63,10 @@ INSTALLED_APPS = [
 # ---------------------------
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'pristineprimer.compression.CompressionMiddleware',  # gzip/brotli for large JSON responses
+    'pristineprimer.profiling.QueryProfilingMiddleware',  # no-op unless QUERY_PROFILING['ENABLED']
     'corsheaders.middleware.CorsMiddleware',  # Should be before CommonMiddleware
+    'pristineprimer.routers.ReplicaRoutingMiddleware',  # no-op without a 'replica' database
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',  # CSRF middleware
@@ -75,6 +80,9 @@ MIDDLEWARE = [
 # ---------------------------
 ROOT_URLCONF = 'pristineprimer.urls'
 WSGI_APPLICATION = 'pristineprimer.wsgi.application'
+ASGI_APPLICATION = 'pristineprimer.asgi.application'
+# Route the I/O-bound endpoints to their async views; asgi.py turns it on (see pristineprimer/async_views.py)
+ASYNC_VIEWS = os.getenv('DJANGO_ASYNC_VIEWS', 'false').lower() == 'true'
 
 # ---------------------------
 # TEMPLATES
@@ -120,6 +128,45 @@ DATABASES = {
     }
 }
 
+# Optional read replica for public GETs (see pristineprimer/routers.py)
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['pristineprimer.routers.ReplicaRouter']
+
+DATABASE_REPLICA = {
+    'ALIAS': 'replica',
+    'PIN_SECONDS': 15,  # clients read from the primary this long after their own writes
+    'APPS': ['properties', 'newsletter'],  # sessions and users always come from the primary
+}
+
+# Connection management, chosen with DB_CONNECTION_MODE:
+#   persistent  each worker thread keeps its connection open for DB_CONN_MAX_AGE seconds
+#   pool        a worker's threads share up to DB_POOL_MAX_SIZE connections
+#               (see pristineprimer/postgresql_pool/base.py)
+#   pgbouncer   HOST/PORT point at PgBouncer in transaction pooling mode, which
+#               can't keep server-side cursors open between transactions
+DB_CONNECTION_MODE = os.getenv('DB_CONNECTION_MODE', 'persistent')
+if DB_CONNECTION_MODE not in ('persistent', 'pool', 'pgbouncer'):
+    raise ImproperlyConfigured(f"Unknown DB_CONNECTION_MODE {DB_CONNECTION_MODE!r}")
+
+for _database in DATABASES.values():
+    _database['CONN_HEALTH_CHECKS'] = True  # ping a reused connection once per request
+    if DB_CONNECTION_MODE == 'pool':
+        _database['ENGINE'] = 'pristineprimer.postgresql_pool'
+        _database['CONN_MAX_AGE'] = 0  # hand the connection back to the pool after each request
+        _database['POOL'] = {
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', 4)),  # per worker process: match its threads
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        }
+    else:
+        _database['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', 60))
+        _database['DISABLE_SERVER_SIDE_CURSORS'] = DB_CONNECTION_MODE == 'pgbouncer'
+
 
 # ---------------------------
 # PASSWORD VALIDATION
@@ -172,7 +219,17 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 20
+    'PAGE_SIZE': 20,
+    # orjson-backed JSON; both fall back to DRF's stdlib implementation (see pristineprimer/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'pristineprimer.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'pristineprimer.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # ---------------------------
@@ -260,14 +317,23 @@ if DEBUG:
 # ---------------------------
 NEWSLETTER_SETTINGS = {
     'POPUP_DISMISSAL_DAYS': 3,
+    'POPUP_DISMISSAL_MODE': 'cache',  # 'cache' or 'cookie' (signed cookie, no server-side storage)
+    # How long "not dismissed" answers are cached; None: 300 with a shared cache, 0 with per-process LocMemCache
+    'POPUP_NEGATIVE_CACHE_SECONDS': None,
     'WELCOME_EMAIL_SUBJECT': 'Welcome to PristinePrimier Real Estate Newsletter!',
     'FROM_EMAIL': 'PristinePrimier Real Estate <newsletter@pristineprimier.com>',
     'REPLY_TO_EMAIL': 'info@pristineprimier.com',
     'ADMIN_EMAIL': 'admin@pristineprimier.com',
     'CONFIRMATION_REQUIRED': False,
     'MAX_EMAILS_PER_HOUR': 100,  # SES limit awareness
+    'ASYNC_EMAIL': True,  # send welcome emails from a thread pool after commit (see newsletter/outbox.py)
+    'EMAIL_WORKERS': 2,
     'TRACK_OPENS': True,
     'TRACK_CLICKS': True,
+    'TRACKING_BUFFER_PATH': os.path.join(BASE_DIR, 'logs', 'email_events.ndjson'),
+    'TRACKING_BATCH_SIZE': 500,  # message IDs per bulk status UPDATE
+    # Tracking pixels and click redirects in emails point here (this API's public origin)
+    'TRACKING_BASE_URL': os.getenv('NEWSLETTER_TRACKING_BASE_URL', 'https://api.pristineprimier.com'),
 }
 
 # ---------------------------
@@ -293,54 +359,191 @@ if not DEBUG:
 # ---------------------------
 # LOGGING CONFIGURATION
 # ---------------------------
+# Records are queued and written by a background thread: JSON lines to a
+# rotating file, plain text to the console (see pristineprimer/log.py)
+LOG_FILE = os.getenv('DJANGO_LOG_FILE', os.path.join(BASE_DIR, 'logs', 'django.log'))
+LOG_MAX_BYTES = int(os.getenv('DJANGO_LOG_MAX_BYTES', 10 * 1024 * 1024))  # 0: reopen after external rotation
+LOG_SAMPLE_RATE = float(os.getenv('DJANGO_LOG_SAMPLE_RATE', '0.1'))  # share of routine high-volume records kept
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
-    'formatters': {
-        'verbose': {
-            'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
-            'style': '{',
+    'filters': {
+        # Per-request query profiles: keep a sample, every over-budget warning
+        'sample_routine': {
+            '()': 'pristineprimer.log.SamplingFilter',
+            'rate': LOG_SAMPLE_RATE,
+            'max_level': 'INFO',
         },
-        'simple': {
-            'format': '{levelname} {message}',
-            'style': '{',
+        # 4xx responses (404 scans, bad input) log warnings on django.request; 5xx are errors and always kept
+        'sample_client_errors': {
+            '()': 'pristineprimer.log.SamplingFilter',
+            'rate': LOG_SAMPLE_RATE,
+            'max_level': 'WARNING',
         },
     },
     'handlers': {
-        'file': {
-            'level': 'DEBUG',
-            'class': 'logging.FileHandler',
-            'filename': os.path.join(BASE_DIR, 'logs', 'django.log'),
-        },
-        'console': {
-            'class': 'logging.StreamHandler',
+        'queue': {
+            '()': 'pristineprimer.log.queue_handler',
+            'filename': LOG_FILE,
+            'max_bytes': LOG_MAX_BYTES,
+            'backup_count': 5,
+            'console': True,
         },
     },
+    # Everything else: warnings and errors (properties.renditions, users...)
+    'root': {
+        'handlers': ['queue'],
+        'level': 'WARNING',
+    },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'django.request': {
+            'handlers': ['queue'],
             'level': 'INFO',
-            'propagate': True,
+            'filters': ['sample_client_errors'],
+            'propagate': False,
+        },
+        'django.server': {
+            'handlers': ['queue'],
+            'level': 'INFO',
+            'filters': ['sample_routine'],
+            'propagate': False,
         },
         'newsletter': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
         'django_ses': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'pristineprimer': {
+            'handlers': ['queue'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'pristineprimer.profiling': {
+            'handlers': ['queue'],
             'level': 'INFO',
+            'filters': ['sample_routine'],
             'propagate': False,
         },
     },
 }
 
+# gzip/brotli for JSON API responses (see pristineprimer/compression.py)
+API_COMPRESSION = {
+    'ENABLED': True,
+    'MIN_SIZE': 1024,  # bytes
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,  # used when the Brotli package is installed
+}
+
+# ETags / 304s for list pages and map data (see pristineprimer/conditional.py)
+API_CONDITIONAL_GET = {
+    'ENABLED': True,
+}
+
+# Per-request SQL profiling (see pristineprimer/profiling.py)
+QUERY_PROFILING = {
+    'ENABLED': False,
+    'DUPLICATE_THRESHOLD': 3,  # same statement this often in one request = N+1
+    'BUDGETS': {},  # {'view-name': max queries}, for views without @query_budget
+}
+
 # ---------------------------
 # FILE UPLOAD SETTINGS
 # ---------------------------
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 
+# Resumable chunked uploads for large media (see properties/uploads.py)
+CHUNKED_UPLOADS = {
+    'TEMP_DIR': os.path.join(BASE_DIR, 'tmp', 'uploads'),
+    'MAX_UPLOAD_SIZE': 2 * 1024 * 1024 * 1024,  # 2GB
+    'MAX_CHUNK_SIZE': 8 * 1024 * 1024,  # 8MB per PUT
+    'EXPIRY_HOURS': 24,  # unattached uploads older than this are purged
+}
+
+# Bulk CSV/NDJSON import (see properties/imports.py)
+PROPERTY_IMPORT = {
+    'BATCH_SIZE': 1000,  # rows validated and bulk-inserted together
+    'MAX_REPORTED_ERRORS': 1000,  # row errors returned by the import endpoint
+}
+
+# Partner listing feed (see properties/feed.py)
+PROPERTY_FEED = {
+    'BATCH_SIZE': 500,  # properties enriched per round of lookup queries
+    'GZIP_LEVEL': 6,
+}
+
+# Incremental change feed, /api/properties/changes/ (see properties/changes.py)
+PROPERTY_CHANGE_FEED = {
+    'SETTLE_SECONDS': 2,  # entries newer than this are held back until concurrent commits land
+    'PAGE_SIZE': 500,
+    'MAX_PAGE_SIZE': 5000,
+    'COMPACT_AFTER_DAYS': 30,  # compact_property_changes drops superseded entries older than this
+}
+
+# Search sidebar facets, /api/properties/search/facets/ (see properties/facets.py)
+PROPERTY_FACETS = {
+    'PRICE_BANDS': [0, 1000000, 5000000, 10000000, 50000000],  # band lower bounds (KES)
+    'CACHE_SECONDS': 300,
+}
+
+# Optional in-process bitmap index for search/facets (see properties/search_index.py)
+PROPERTY_SEARCH_INDEX = {
+    'ENABLED': False,
+    'RANGE_BUCKETS': 64,  # quantile bins for price/size range filters
+    'REBUILD_RATIO': 0.2,  # rebuild instead of patching when this share of listings changed
+}
+
+# Precomputed "similar properties" (see properties/similarity.py)
+PROPERTY_SIMILARITY = {
+    'NEIGHBORS': 8,
+    'WEIGHTS': {'land_type': 1.0, 'price': 2.0, 'size': 1.0, 'location': 1.0, 'utilities': 1.0},
+    'LOCATION_KM': 25,  # distance that counts as much as a full land_type mismatch
+    'ASYNC': True,  # refresh in a background thread once a listing change commits
+}
+
+# Property detail sub-resources: similar, documents, inquiry-stats (see properties/detail.py)
+PROPERTY_DETAIL = {
+    'CACHE_SECONDS': 300,
+    'MAX_AGE': 60,  # Cache-Control max-age for clients and proxies
+}
+
+# values()-based serializers for list pages, map data and favorites (see properties/fast_serializers.py)
+PROPERTY_FAST_SERIALIZERS = {
+    'ENABLED': True,
+}
+
+# Property images/media are stored once per unique content under
+# MEDIA_ROOT/<PREFIX>/ab/cd/<sha256>.<ext>; see properties.storage
+MEDIA_BLOB_STORAGE = {
+    'ENABLED': True,
+    'PREFIX': 'blobs',
+    'GC_GRACE_HOURS': 24,  # collect_media_blobs keeps younger orphans
+}
+
+# ---------------------------
+# PROPERTY IMAGE RENDITIONS
+# ---------------------------
+# Resized WebP/JPEG copies generated after upload (see properties/renditions.py)
+PROPERTY_IMAGE_RENDITIONS = {
+    'WIDTHS': [320, 640, 1280],
+    'FORMATS': ['webp', 'jpeg'],
+    'QUALITY': 80,
+    'ASYNC': True,  # generate in a background thread once the upload commits
+    'WORKERS': 2,
+}
+
 # ---------------------------
 # CACHE CONFIGURATION (Optional)
 # ---------------------------
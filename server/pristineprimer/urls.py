@@ -5,6 +5,8 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.http import HttpResponse
 
+from .profiling import query_profile_stats
+
 def favicon(request):
     return HttpResponse(status=204)
 
@@ -19,6 +21,7 @@ urlpatterns = [
     path('api/auth/', include('users.urls')),
     path('api/', include('properties.urls')),
     path('api/newsletter/', include('newsletter.urls')),
+    path('api/admin/query-profile/', query_profile_stats, name='query-profile-stats'),
     
     # Health checks
     path('health/', include('health_check.urls')),
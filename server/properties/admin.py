@@ -2,12 +2,14 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.safestring import mark_safe
 from .models import (
     Property, PropertyImage, Favorite, Inquiry,
     PropertyMedia, Amenity, PropertyAmenity, 
     LegalDocument, PropertyContact
 )
+from . import changes, similarity
 
 # ===== INLINE ADMIN CLASSES =====
 
@@ -71,7 +73,8 @@ class PropertyAdmin(admin.ModelAdmin):
         'property_type', 'land_type', 'status', 'featured', 
         'city', 'state', 'title_deed_status', 'is_negotiable',
         'has_subdivision_approval', 'has_beacons', 'is_fenced',
-        'electricity_availability', 'created_at', 'updated_at'
+        'electricity_availability', 'road_access_type', 'topography', 'soil_type',
+        'created_at', 'updated_at'
     ]
     search_fields = [
         'title', 'short_description', 'description', 'address', 
@@ -192,29 +195,46 @@ class PropertyAdmin(admin.ModelAdmin):
         return ", ".join(obj.get_water_supply_types()) if obj.water_supply_types else "None"
     water_supply_types_list.short_description = 'Water Sources'
     
+    def save_formset(self, request, form, formset, change):
+        super().save_formset(request, form, formset, change)
+        # A new listing's 'created' entry covers its amenities
+        if change and formset.model is PropertyAmenity and formset.has_changed():
+            changes.record_amenities_changed([form.instance.pk])
+    
     # Admin actions
+    def _bulk_update(self, queryset, **values):
+        """queryset.update() that bumps updated_at and logs the change like save(); returns the ids"""
+        property_ids = list(queryset.values_list('id', flat=True))
+        Property.objects.filter(pk__in=property_ids).update(updated_at=timezone.now(), **values)
+        changes.record_bulk_updated(property_ids, list(values), values.get('status', ''))
+        return property_ids
+    
     def make_published(self, request, queryset):
-        updated = queryset.update(status='published')
-        self.message_user(request, f'{updated} properties marked as published.')
+        property_ids = self._bulk_update(queryset, status='published')
+        # After the update: outside a transaction the refresh runs straight away
+        similarity.schedule_refresh(property_ids)
+        self.message_user(request, f'{len(property_ids)} properties marked as published.')
     make_published.short_description = "Mark selected properties as published"
     
     def make_featured(self, request, queryset):
-        updated = queryset.update(featured=True)
+        updated = len(self._bulk_update(queryset, featured=True))
         self.message_user(request, f'{updated} properties marked as featured.')
     make_featured.short_description = "Mark selected properties as featured"
     
     def make_draft(self, request, queryset):
-        updated = queryset.update(status='draft')
-        self.message_user(request, f'{updated} properties marked as draft.')
+        property_ids = self._bulk_update(queryset, status='draft')
+        # After the update: outside a transaction the refresh runs straight away
+        similarity.schedule_refresh(property_ids)
+        self.message_user(request, f'{len(property_ids)} properties marked as draft.')
     make_draft.short_description = "Mark selected properties as draft"
     
     def approve_subdivision(self, request, queryset):
-        updated = queryset.update(has_subdivision_approval=True)
+        updated = len(self._bulk_update(queryset, has_subdivision_approval=True))
         self.message_user(request, f'{updated} properties marked with subdivision approval.')
     approve_subdivision.short_description = "Approve subdivision for selected properties"
     
     def mark_has_title_deed(self, request, queryset):
-        updated = queryset.filter(title_deed_status__isnull=True).update(title_deed_status='freehold')
+        updated = len(self._bulk_update(queryset.filter(title_deed_status__isnull=True), title_deed_status='freehold'))
         self.message_user(request, f'{updated} properties marked with title deed.')
     mark_has_title_deed.short_description = "Add title deed to selected properties"
 
@@ -283,6 +303,28 @@ class PropertyAmenityAdmin(admin.ModelAdmin):
     list_filter = ['availability', 'amenity__category']
     search_fields = ['property__title', 'amenity__name', 'details']
     autocomplete_fields = ['property', 'amenity']
+    
+    # Amenity rows send no Property signals: bump the listings' updated_at
+    # (list ETags) and log the change (search index, facets)
+    def _amenities_changed(self, property_ids):
+        Property.touch(property_ids)
+        changes.record_amenities_changed(property_ids)
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        property_ids = [obj.property_id]
+        if change and 'property' in form.changed_data:
+            property_ids.append(form.initial['property'])
+        self._amenities_changed(property_ids)
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self._amenities_changed([obj.property_id])
+    
+    def delete_queryset(self, request, queryset):
+        property_ids = list(queryset.values_list('property_id', flat=True))
+        super().delete_queryset(request, queryset)
+        self._amenities_changed(property_ids)
 
 @admin.register(LegalDocument)
 class LegalDocumentAdmin(admin.ModelAdmin):
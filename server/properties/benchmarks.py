@@ -0,0 +1,262 @@
+# properties/benchmarks.py
+"""
+Benchmark harness for the core API endpoints.
+
+Each scenario builds a request from a seeded RNG and sends it through
+Django's test client, so the full middleware, DRF and serializer stack is
+measured without a network hop. Per scenario the harness records:
+
+- latency percentiles (p50 / p95 / p99) and mean, in milliseconds
+- SQL queries per request, via pristineprimer.profiling
+- peak Python memory allocated during a request (tracemalloc), measured on
+  a separate pass because tracing skews latency
+
+Results are plain dicts; the ``benchmark_api`` command writes them to JSON
+and can compare two runs.
+"""
+import logging
+import math
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+import uuid
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from pristineprimer import profiling
+
+from .models import Amenity, Property
+from .synthetic import SYNTHETIC_PREFIX
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (already sorted)"""
+    if not values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+class Context:
+    """Ids the scenarios draw from, loaded once per run"""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.property_ids = list(
+            Property.objects.filter(status='published').values_list('id', flat=True)
+        )
+        self.page_count = max(1, math.ceil(len(self.property_ids) / 20))
+        self.amenity_ids = list(Amenity.objects.filter(is_active=True).values_list('id', flat=True))
+        self.buyers = list(
+            get_user_model().objects.filter(username__startswith=SYNTHETIC_PREFIX, user_type='buyer')[:200]
+        )
+        self.anonymous = Client()
+        self.clients = {}
+
+    def client_for(self, user):
+        """One logged-in client per user, so login cost isn't measured"""
+        client = self.clients.get(user.pk)
+        if client is None:
+            client = self.clients[user.pk] = Client()
+            client.force_login(user)
+        return client
+
+    def random_buyer_client(self):
+        return self.client_for(self.rng.choice(self.buyers))
+
+
+# === SCENARIOS ===
+# Each returns a zero-argument callable that performs one request.
+
+def property_list(ctx):
+    page = ctx.rng.randint(1, min(ctx.page_count, 50))
+    return lambda: ctx.anonymous.get('/api/properties/', {'page': page})
+
+
+def property_search(ctx):
+    params = {}
+    if ctx.rng.random() < 0.6:
+        params['property_type'] = ctx.rng.choice(['land', 'apartment', 'sale', 'rental', 'commercial'])
+    if ctx.rng.random() < 0.4:
+        params['land_type'] = ctx.rng.choice(['residential', 'agricultural'])
+    if ctx.rng.random() < 0.5:
+        low = ctx.rng.choice([0, 500000, 1000000, 5000000])
+        params['min_price'], params['max_price'] = low, low * 4 + 1000000
+    if ctx.amenity_ids and ctx.rng.random() < 0.3:
+        params['amenities'] = ctx.rng.choice(ctx.amenity_ids)
+    if ctx.rng.random() < 0.2:
+        params['location'] = ctx.rng.choice(['Nairobi', 'Kiambu', 'Nakuru', 'Mombasa'])
+    return lambda: ctx.anonymous.get('/api/properties/search/', params)
+
+
+def property_retrieve(ctx):
+    property_id = ctx.rng.choice(ctx.property_ids)
+    return lambda: ctx.anonymous.get(f'/api/properties/{property_id}/')
+
+
+def map_data(ctx):
+    return lambda: ctx.anonymous.get('/api/properties/map_data/')
+
+
+def dashboard_overview(ctx):
+    client = ctx.random_buyer_client()
+    return lambda: client.get('/api/auth/dashboard/overview/')
+
+
+def subscribe_newsletter(ctx):
+    email = f'bench-{uuid.uuid4().hex}@example.com'
+    return lambda: ctx.anonymous.post(
+        '/api/newsletter/subscribe/', {'email': email, 'name': 'Bench'}, content_type='application/json'
+    )
+
+
+def track_user_activity(ctx):
+    client = ctx.random_buyer_client()
+    payload = {'type': 'property_view', 'property_id': ctx.rng.choice(ctx.property_ids)}
+    return lambda: client.post('/api/auth/dashboard/track-activity/', payload, content_type='application/json')
+
+
+SCENARIOS = {
+    'property_list': property_list,
+    'property_search': property_search,
+    'property_retrieve': property_retrieve,
+    'map_data': map_data,
+    'dashboard_overview': dashboard_overview,
+    'subscribe_newsletter': subscribe_newsletter,
+    'track_user_activity': track_user_activity,
+}
+
+
+# === RUNNER ===
+
+def _run_scenario(ctx, build, iterations, warmup, memory_samples):
+    for _ in range(warmup):
+        build(ctx)()
+
+    latencies, queries, statuses = [], [], {}
+    profiles = []
+    profiling.enable_recording(profiles.append)
+    try:
+        for _ in range(iterations):
+            request = build(ctx)
+            start = time.perf_counter()
+            response = request()
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if profiles:
+                queries.append(profiles.pop().queries)
+    finally:
+        profiling.disable_recording(profiles.append)
+
+    peaks = []
+    for _ in range(memory_samples):
+        request = build(ctx)
+        tracemalloc.start()
+        try:
+            request()
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        finally:
+            tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'mean': round(statistics.fmean(latencies), 3),
+            'min': round(latencies[0], 3),
+            'max': round(latencies[-1], 3),
+        },
+        'queries': {
+            'mean': round(statistics.fmean(queries), 2) if queries else None,
+            'max': max(queries) if queries else None,
+        },
+        'peak_memory_kib': {
+            'median': round(statistics.median(peaks), 1) if peaks else None,
+            'max': round(max(peaks), 1) if peaks else None,
+        },
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=settings.BASE_DIR, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(scenarios=None, iterations=200, warmup=20, memory_samples=10, seed=1):
+    """Run the named scenarios (default: all); returns a JSON-serializable dict"""
+    scenarios = scenarios or list(SCENARIOS)
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    ctx = Context(seed)
+    if not ctx.property_ids or not ctx.buyers:
+        raise ValueError("No synthetic data found; run generate_synthetic_data first")
+
+    results = {}
+    # Per-request profiling log lines would be measured too
+    profiling_logger = logging.getLogger(profiling.__name__)
+    previous_level = profiling_logger.level
+    profiling_logger.setLevel(logging.WARNING)
+    try:
+        # The test client's host must be allowed, no real email may go out, and
+        # DEBUG's query log would skew both latency and memory
+        with override_settings(
+            DEBUG=False,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+        ):
+            for name in scenarios:
+                results[name] = _run_scenario(ctx, SCENARIOS[name], iterations, warmup, memory_samples)
+    finally:
+        profiling_logger.setLevel(previous_level)
+
+    return {
+        'meta': {
+            'revision': _git_revision(),
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'seed': seed,
+            'published_properties': len(ctx.property_ids),
+            'warmup': warmup,
+            'memory_samples': memory_samples,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current):
+    """[(scenario, metric, before, after, change_pct)] for the headline metrics"""
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            continue
+        for group, metric in (('latency_ms', 'p50'), ('latency_ms', 'p95'), ('latency_ms', 'p99'),
+                              ('queries', 'mean'), ('peak_memory_kib', 'median')):
+            old, new = before[group][metric], result[group][metric]
+            if old is None or new is None:
+                continue
+            change = ((new - old) / old * 100) if old else 0.0
+            rows.append((name, f'{group}.{metric}', old, new, round(change, 1)))
+    return rows
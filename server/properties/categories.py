@@ -0,0 +1,92 @@
+# properties/categories.py
+"""
+Canonical values for the categorical land fields.
+
+road_access_type, topography and soil_type used to be free text, so the
+same thing was written as 'Tarmac', 'tarmac road' or 'Bitumen'. They are
+now choice columns (see Property.ROAD_ACCESS_TYPES etc.) and
+water_supply_types is a list of Property.WATER_SOURCES values. The rules
+here map free text onto those values; they are used by the write
+serializers. Migration 0008 normalized existing rows with a frozen copy.
+
+Rules are (keyword, value) pairs checked in order against the lower-cased
+text, first match wins, so more specific keywords come first.
+"""
+import re
+
+RULES = {
+    'road_access_type': [
+        ('no road', 'none'), ('none', 'none'), ('no access', 'none'),
+        ('cabro', 'cabro'), ('cobble', 'cabro'), ('paver', 'cabro'),
+        ('tarmac', 'tarmac'), ('tarmack', 'tarmac'), ('asphalt', 'tarmac'),
+        ('bitumen', 'tarmac'), ('paved', 'tarmac'), ('highway', 'tarmac'),
+        ('murram', 'murram'), ('marram', 'murram'),
+        ('gravel', 'gravel'),
+        ('earth', 'earth'), ('dirt', 'earth'), ('soil', 'earth'), ('footpath', 'earth'),
+    ],
+    'topography': [
+        ('gentle', 'gentle_slope'), ('gently', 'gentle_slope'),
+        ('flat', 'flat'), ('level', 'flat'), ('plain', 'flat'),
+        ('valley', 'valley'),
+        ('hill', 'hilly'), ('steep', 'hilly'), ('mountain', 'hilly'), ('ridge', 'hilly'),
+        ('slop', 'sloping'), ('incline', 'sloping'), ('undulating', 'sloping'),
+    ],
+    'soil_type': [
+        ('black cotton', 'black_cotton'), ('cotton', 'black_cotton'),
+        ('red', 'red_soil'),
+        ('loam', 'loam'),
+        ('sand', 'sandy'),
+        ('clay', 'clay'),
+        ('volcanic', 'volcanic'),
+        ('rock', 'rocky'), ('stone', 'rocky'), ('murram', 'rocky'),
+    ],
+    'water_supply_types': [
+        ('borehole', 'borehole'), ('bore hole', 'borehole'),
+        ('pipe', 'piped'), ('tap', 'piped'), ('mains', 'piped'), ('county', 'piped'),
+        ('well', 'well'),
+        ('river', 'river'), ('stream', 'river'),
+        ('rain', 'rainwater'), ('harvest', 'rainwater'),
+        ('dam', 'dam'), ('pan', 'dam'),
+    ],
+}
+
+_SEPARATORS = re.compile(r'[\s_\-/,.]+')
+
+
+def _clean(text):
+    return _SEPARATORS.sub(' ', str(text).strip().lower()).strip()
+
+
+def normalize(field, text, choices=None):
+    """
+    Canonical value for free ``text`` in ``field``: '' for blank input,
+    None if no rule matches. Text that already is a canonical value (as
+    listed in ``choices``, if given) is returned unchanged.
+    """
+    if text is None or not str(text).strip():
+        return ''
+    if choices is not None and text in {value for value, _ in choices}:
+        return text
+
+    cleaned = _clean(text)
+    for keyword, value in RULES[field]:
+        if re.search(r'\b' + re.escape(keyword), cleaned):
+            return value
+    return None
+
+
+def normalize_list(field, values, default=None):
+    """
+    Canonical, de-duplicated values for a list (or delimited string);
+    unmatched entries become ``default``, or are dropped if it is None
+    """
+    if isinstance(values, str):
+        values = re.split(r'[|,;/]', values)
+    normalized = []
+    for value in values or []:
+        value = normalize(field, value)
+        if value is None:
+            value = default
+        if value and value not in normalized:
+            normalized.append(value)
+    return normalized
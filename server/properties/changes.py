@@ -0,0 +1,238 @@
+# properties/changes.py
+"""
+Property change log for incremental sync.
+
+Every Property create, update, status change (including admin approve /
+reject) and delete appends a PropertyChange row once the transaction
+commits, and so does every change to a listing's amenities. Its
+auto-increment id is the monotonic sequence number clients pass back as
+``?since=``. Bulk inserts (properties.imports) and the admin's bulk
+actions record their changes explicitly, since bulk_create and update()
+send no signals.
+
+The changes endpoint collapses a page of entries to one delta per property:
+public listings come back as compact upserts (all feed fields plus
+amenities for listings that became visible, only the changed fields
+otherwise, with ``amenities`` carrying the full current list), and listings
+that were deleted or left 'published' come back as tombstones.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .feed import PROPERTY_FIELDS, amenities_by_property
+from .models import Property, PropertyChange
+
+DEFAULT_SETTINGS = {
+    'SETTLE_SECONDS': 2,
+    'PAGE_SIZE': 500,
+    'MAX_PAGE_SIZE': 5000,
+    'COMPACT_AFTER_DAYS': 30,
+}
+
+# Counters and timestamps that change without the listing itself changing
+IGNORED_FIELDS = {'id', 'views_count', 'inquiry_count', 'updated_at'}
+
+
+def get_change_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'PROPERTY_CHANGE_FEED', {})}
+
+
+def _tracked_fields():
+    return {
+        field.attname: field.name
+        for field in Property._meta.concrete_fields
+        if field.name not in IGNORED_FIELDS
+    }
+
+
+# === RECORDING ===
+
+def _record(entries):
+    """Insert entries after commit so sequence order follows commit order"""
+    if entries:
+        transaction.on_commit(lambda: PropertyChange.objects.bulk_create(entries))
+
+
+def capture_previous(instance, update_fields=None):
+    """pre_save: remember the stored values of the fields about to be written"""
+    if instance._state.adding or instance.pk is None:
+        return
+
+    tracked = _tracked_fields()
+    if update_fields is not None:
+        names = set(update_fields)
+        attnames = [attname for attname, name in tracked.items() if name in names or attname in names]
+    else:
+        attnames = list(tracked)
+
+    instance._change_previous = (
+        Property.objects.filter(pk=instance.pk).values(*attnames).first() or {}
+    ) if attnames else {}
+
+
+def record_save(instance, created):
+    if created:
+        _record([PropertyChange(property_id=instance.pk, action='created', status=instance.status)])
+        return
+
+    previous = getattr(instance, '_change_previous', None)
+    if previous is None:
+        return
+    del instance._change_previous
+
+    tracked = _tracked_fields()
+    changed = [
+        tracked[attname] for attname, value in previous.items()
+        if getattr(instance, attname) != value
+    ]
+    if not changed:
+        return
+
+    _record([PropertyChange(
+        property_id=instance.pk,
+        action='status_changed' if 'status' in changed else 'updated',
+        status=instance.status,
+        changed_fields=changed,
+    )])
+
+
+def record_delete(instance):
+    _record([PropertyChange(property_id=instance.pk, action='deleted', status=instance.status)])
+
+
+def record_amenities_changed(property_ids):
+    """
+    Amenities live in their own table and are written in bulk, so no
+    Property signal sees them. Log an 'updated' entry so readers keyed on
+    the sequence (search index, facet cache, list ETags) notice.
+    """
+    _record([
+        PropertyChange(property_id=property_id, action='updated', changed_fields=['amenities'])
+        for property_id in set(property_ids)
+    ])
+
+
+def record_bulk_updated(property_ids, changed_fields, status=''):
+    """For queryset.update() calls, which send no signals"""
+    action = 'status_changed' if 'status' in changed_fields else 'updated'
+    _record([
+        PropertyChange(property_id=property_id, action=action, status=status, changed_fields=list(changed_fields))
+        for property_id in property_ids
+    ])
+
+
+def record_bulk_created(properties):
+    _record([
+        PropertyChange(property_id=property_obj.pk, action='created', status=property_obj.status)
+        for property_obj in properties
+    ])
+
+
+# === READING ===
+
+def get_changes(since=0, limit=None):
+    """
+    Return the changes after sequence ``since``:
+    {'since', 'next_since', 'has_more', 'changes': [...], 'tombstones': [...]}
+    """
+    config = get_change_settings()
+    limit = min(limit or config['PAGE_SIZE'], config['MAX_PAGE_SIZE'])
+
+    # Entries younger than SETTLE_SECONDS may still be overtaken by a
+    # concurrent commit with a lower sequence number; leave them for next time
+    settled = timezone.now() - timedelta(seconds=config['SETTLE_SECONDS'])
+    entries = list(
+        PropertyChange.objects.filter(id__gt=since, created_at__lte=settled)
+        .order_by('id')
+        .values_list('id', 'property_id', 'action', 'changed_fields')[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    collapsed = {}
+    for seq, property_id, action, changed_fields in entries:
+        delta = collapsed.setdefault(property_id, {'seq': seq, 'full': False, 'deleted': False, 'fields': set()})
+        delta['seq'] = seq
+        delta['deleted'] = action == 'deleted'
+        if action in ('created', 'status_changed'):
+            delta['full'] = True
+        delta['fields'].update(changed_fields or [])
+
+    current = {
+        row['id']: row
+        for row in Property.objects.filter(
+            id__in=list(collapsed), status='published'
+        ).values(*PROPERTY_FIELDS)
+    }
+
+    amenities = amenities_by_property([
+        property_id for property_id, delta in collapsed.items()
+        if property_id in current and (delta['full'] or 'amenities' in delta['fields'])
+    ])
+
+    changes, tombstones = [], []
+    for property_id, delta in sorted(collapsed.items(), key=lambda item: item[1]['seq']):
+        row = current.get(property_id)
+        if row is None:
+            tombstones.append({
+                'seq': delta['seq'],
+                'id': property_id,
+                'reason': 'deleted' if delta['deleted'] else 'unpublished',
+            })
+            continue
+
+        if delta['full']:
+            row['amenities'] = amenities.get(property_id, [])
+            changes.append({'seq': delta['seq'], 'id': property_id, 'action': 'upsert', 'data': row})
+            continue
+
+        data = {field: row[field] for field in PROPERTY_FIELDS if field in delta['fields']}
+        if 'amenities' in delta['fields']:
+            data['amenities'] = amenities.get(property_id, [])
+        if data:
+            data['updated_at'] = row['updated_at']
+            changes.append({'seq': delta['seq'], 'id': property_id, 'action': 'update', 'data': data})
+
+    return {
+        'since': since,
+        'next_since': entries[-1][0] if entries else since,
+        'has_more': has_more,
+        'changes': changes,
+        'tombstones': tombstones,
+    }
+
+
+# === COMPACTION ===
+
+def compact_changes(older_than_days=None, batch_size=5000):
+    """
+    Drop entries older than COMPACT_AFTER_DAYS that are superseded by a newer
+    entry for the same property. The latest entry per property (including
+    tombstones) is always kept, so any ``since`` still converges to the
+    current state. A kept 'updated' entry whose predecessors were dropped
+    becomes 'created', so a client syncing from before it gets the full
+    listing rather than a few fields. Returns the number of rows deleted.
+    """
+    if older_than_days is None:
+        older_than_days = get_change_settings()['COMPACT_AFTER_DAYS']
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+
+    latest = PropertyChange.objects.values('property_id').annotate(latest=Max('id')).values('latest')
+    superseded = PropertyChange.objects.filter(created_at__lt=cutoff).exclude(id__in=latest)
+
+    deleted = 0
+    while True:
+        rows = list(superseded.values_list('id', 'property_id')[:batch_size])
+        if not rows:
+            break
+        property_ids = {property_id for _, property_id in rows}
+        with transaction.atomic():
+            deleted += PropertyChange.objects.filter(id__in=[seq for seq, _ in rows]).delete()[0]
+            PropertyChange.objects.filter(
+                id__in=latest.filter(property_id__in=property_ids), action='updated'
+            ).update(action='created')
+    return deleted
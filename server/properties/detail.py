@@ -0,0 +1,106 @@
+# properties/detail.py
+"""
+Sparse property detail responses and their cacheable sub-resources.
+
+``GET /properties/<pk>/`` without parameters returns every section, as
+before. With ``?include=`` it returns the lean core (the property's own
+columns plus seller/agent names, one query) and only the heavy sections
+named, e.g. ``?include=media,amenities``; ``?include=`` alone is the
+first-paint payload. Sub-resource names are accepted too, so
+``?include=similar`` means ``similar_properties``.
+
+The sections that cost the most are also served on their own, cached here
+and marked publicly cacheable, so clients can fetch them after first paint:
+
+- ``/properties/<pk>/similar/``
+- ``/properties/<pk>/documents/``
+- ``/properties/<pk>/inquiry-stats/``
+
+Cached entries are dropped when their data changes (document and inquiry
+signals, similar-property refreshes) and expire after CACHE_SECONDS anyway.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from rest_framework.exceptions import ValidationError
+
+DEFAULT_SETTINGS = {
+    'CACHE_SECONDS': 300,  # server-side cache for sub-resources
+    'MAX_AGE': 60,  # Cache-Control max-age sent with sub-resources
+}
+
+# Optional sections of PropertyDetailSerializer, with what each needs prefetched
+SECTIONS = {
+    'images': ['images'],
+    'media': ['media'],
+    'amenities': ['amenities__amenity'],
+    'documents': ['documents'],
+    'contact_info': [],
+    'similar_properties': [],
+    'inquiry_stats': [],
+    'is_favorited': [],
+}
+
+SUB_RESOURCES = ['similar', 'documents', 'inquiry_stats']
+
+# Sub-resource (and URL path) names accepted in ?include= for their section
+ALIASES = {
+    'similar': 'similar_properties',
+    'inquiry-stats': 'inquiry_stats',
+}
+
+# The similar sub-resource lists this many; the detail section shows the first DETAIL_SIMILAR
+SIMILAR_LIMIT = 6
+DETAIL_SIMILAR = 4
+
+
+def get_detail_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'PROPERTY_DETAIL', {})}
+
+
+def parse_include(query_params):
+    """Sections requested with ?include=, or None for the full response"""
+    if 'include' not in query_params:
+        return None
+    include = {name.strip() for name in query_params['include'].split(',') if name.strip()}
+    include = {ALIASES.get(name, name) for name in include}
+    unknown = include - set(SECTIONS)
+    if unknown:
+        aliases = ', '.join(f"{alias} (= {name})" for alias, name in ALIASES.items())
+        raise ValidationError({
+            'include': f"Unknown section(s): {', '.join(sorted(unknown))}. "
+                       f"Choose from: {', '.join(SECTIONS)}; aliases: {aliases}"
+        })
+    return include
+
+
+def prefetches(include):
+    """prefetch_related lookups for the requested sections (None = all)"""
+    names = SECTIONS if include is None else include
+    return [lookup for name in names for lookup in SECTIONS[name]]
+
+
+# === SUB-RESOURCE CACHE ===
+
+def _key(kind, property_id):
+    return f"properties:detail:{kind}:{property_id}"
+
+
+def cached(kind, property_id, build):
+    """Return the cached ``kind`` sub-resource of a property, building it on a miss"""
+    key = _key(kind, property_id)
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, get_detail_settings()['CACHE_SECONDS'])
+    return data
+
+
+def invalidate(kind, property_ids):
+    cache.delete_many([_key(kind, property_id) for property_id in property_ids])
+
+
+def cacheable(response):
+    """Mark a sub-resource response as cacheable by browsers and proxies"""
+    patch_cache_control(response, public=True, max_age=get_detail_settings()['MAX_AGE'])
+    return response
@@ -0,0 +1,128 @@
+# properties/facets.py
+"""
+Facet counts for the property search sidebar.
+
+All facets (property type, land type, title deed status, electricity, road
+access, topography, soil, price band and amenity) are computed with a single
+conditional-aggregate query, ``COUNT(DISTINCT id) FILTER (WHERE ...)`` per
+facet value, over the current search results. Results are cached per
+normalized filter signature; the key includes the latest change-log sequence
+number, so any property write, amenity edits included (see
+properties/changes.py), makes the old entries unreachable instead of serving
+stale counts.
+"""
+import hashlib
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import Amenity, Property, PropertyChange
+
+DEFAULT_SETTINGS = {
+    'PRICE_BANDS': [0, 1000000, 5000000, 10000000, 50000000],
+    'CACHE_SECONDS': 300,
+}
+
+CHOICE_FACETS = {
+    'property_type': Property.PROPERTY_TYPES,
+    'land_type': Property.LAND_TYPES,
+    'title_deed_status': Property.TITLE_DEED_TYPES,
+    'electricity_availability': Property._meta.get_field('electricity_availability').choices,
+    'road_access_type': Property.ROAD_ACCESS_TYPES,
+    'topography': Property.TOPOGRAPHY_TYPES,
+    'soil_type': Property.SOIL_TYPES,
+}
+
+
+def get_facet_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'PROPERTY_FACETS', {})}
+
+
+def price_bands():
+    """[(key, lower, upper)] with ``upper`` None for the open-ended top band"""
+    edges = sorted(get_facet_settings()['PRICE_BANDS'])
+    bands = []
+    for index, lower in enumerate(edges):
+        upper = edges[index + 1] if index + 1 < len(edges) else None
+        key = f"{lower}-{upper}" if upper is not None else f"{lower}+"
+        bands.append((key, lower, upper))
+    return bands
+
+
+def filter_signature(filters):
+    """Stable hash of validated search parameters (order-insensitive)"""
+    normalized = {}
+    for key, value in filters.items():
+        if value in (None, '', []):
+            continue
+        if isinstance(value, (list, tuple)):
+            value = sorted(str(item) for item in value)
+        elif isinstance(value, Decimal):
+            value = str(value.normalize())
+        elif isinstance(value, str):
+            value = value.strip().lower()
+        normalized[key] = value
+    payload = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _amenities():
+    return list(Amenity.objects.filter(is_active=True).order_by('name').values_list('id', 'name'))
+
+
+def compute_facets(queryset, amenities=None):
+    """Count every facet value over ``queryset`` in one query"""
+    amenities = _amenities() if amenities is None else amenities
+
+    aggregates = {}
+    for field, choices in CHOICE_FACETS.items():
+        for value, _ in choices:
+            aggregates[f'{field}:{value}'] = Count('pk', filter=Q(**{field: value}), distinct=True)
+
+    for key, lower, upper in price_bands():
+        condition = Q(price__gte=lower)
+        if upper is not None:
+            condition &= Q(price__lt=upper)
+        aggregates[f'price_band:{key}'] = Count('pk', filter=condition, distinct=True)
+
+    for amenity_id, _ in amenities:
+        aggregates[f'amenity:{amenity_id}'] = Count(
+            'pk', filter=Q(amenities__amenity_id=amenity_id), distinct=True
+        )
+    aggregates['total'] = Count('pk', distinct=True)
+
+    # Re-select by pk so filters that joined amenities don't narrow the amenity counts
+    counts = Property.objects.filter(pk__in=queryset.values('pk')).aggregate(**aggregates)
+
+    facets = {
+        field: [
+            {'value': value, 'label': str(label), 'count': counts[f'{field}:{value}']}
+            for value, label in choices
+        ]
+        for field, choices in CHOICE_FACETS.items()
+    }
+    facets['price_band'] = [
+        {'value': key, 'min': lower, 'max': upper, 'count': counts[f'price_band:{key}']}
+        for key, lower, upper in price_bands()
+    ]
+    facets['amenity'] = [
+        {'value': amenity_id, 'label': name, 'count': counts[f'amenity:{amenity_id}']}
+        for amenity_id, name in amenities
+    ]
+    facets['total'] = counts['total']
+    return facets
+
+
+def get_facets(queryset, filters):
+    """Cached compute_facets() for the search described by ``filters``"""
+    latest_change = PropertyChange.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    key = f"properties:facets:{latest_change}:{filter_signature(filters)}"
+
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(queryset)
+        cache.set(key, facets, get_facet_settings()['CACHE_SECONDS'])
+    return facets
@@ -0,0 +1,259 @@
+# properties/fast_serializers.py
+"""
+Read-only fast path for the list serializers.
+
+DRF serializes a page object by object and field by field: attribute
+lookups through model instances, a to_representation() call per field, and
+the per-row queries behind SerializerMethodFields (primary image, amenity
+preview). For read-only list endpoints the classes here build the same
+output from ``.values()`` rows instead:
+
+- the plan (output name, values() key, converter) is worked out once per
+  serializer class and field set from the DRF serializer's own fields, so
+  decimals, datetimes and choices are formatted exactly as before
+- nested serializers (the amenity in an amenity preview) become prefixed
+  values() keys instead of a second serializer
+- computed fields are rendered for the whole page at once, with one query
+  per relation instead of one per row
+
+Rendered to JSON, the output is byte-identical to the DRF serializer's;
+``benchmark_serializers`` checks that and times both paths.
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+
+from .models import Property, PropertyAmenity, PropertyImage, PropertyMedia
+from .renditions import build_srcset
+from .serializers import FavoriteSerializer, PropertyAmenitySerializer, PropertyListSerializer, PropertyMapSerializer
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+}
+
+# Field types whose to_representation() is a plain cast
+CASTS = {
+    serializers.CharField: str,
+    serializers.IntegerField: int,
+    serializers.BooleanField: bool,
+}
+
+AMENITY_PREVIEW_SIZE = 3
+
+_plans = {}
+
+
+def get_fast_serializer_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'PROPERTY_FAST_SERIALIZERS', {})}
+
+
+def is_enabled():
+    return get_fast_serializer_settings()['ENABLED']
+
+
+def _converter(field):
+    cast = CASTS.get(type(field))
+    if cast is not None:
+        return cast
+    if isinstance(field, serializers.RelatedField):
+        # values() already returns the primary key
+        return None
+    return field.to_representation
+
+
+def _build(steps, row, computed, index):
+    item = {}
+    for name, key, convert, nested in steps:
+        if key is None:
+            item[name] = computed[name][index]
+        elif nested is not None:
+            item[name] = None if row[key] is None else _build(nested, row, computed, index)
+        else:
+            value = row[key]
+            item[name] = value if value is None or convert is None else convert(value)
+    return item
+
+
+class FastSerializer:
+    """
+    values()-based, many=True equivalent of ``serializer_class``.
+
+    Fields named in COMPUTED (with the values() keys they read) are rendered
+    by ``render_<name>(rows)``, which returns one value per row.
+    """
+    serializer_class = None
+    COMPUTED = {}
+
+    def __init__(self, fields=None):
+        self.fields = None if fields is None else frozenset(fields)
+        self.steps, self.columns = self._plan()
+
+    def _plan(self):
+        key = (type(self), self.fields)
+        if key not in _plans:
+            context = {} if self.fields is None else {'fields': set(self.fields)}
+            steps, columns = self._plan_serializer(self.serializer_class(context=context))
+            columns = list(dict.fromkeys(['id', *columns]))
+            _plans[key] = (steps, columns)
+        return _plans[key]
+
+    def _plan_serializer(self, serializer, prefix=''):
+        steps, columns = [], []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if not prefix and name in self.COMPUTED:
+                steps.append((name, None, None, None))
+                columns.extend(self.COMPUTED[name])
+            elif isinstance(field, serializers.ListSerializer) or isinstance(field, serializers.SerializerMethodField):
+                raise ImproperlyConfigured(f"{type(self).__name__} needs a render_{name}() for {name!r}")
+            elif isinstance(field, serializers.BaseSerializer):
+                nested_prefix = f"{prefix}{field.source.replace('.', '__')}__"
+                nested_steps, nested_columns = self._plan_serializer(field, nested_prefix)
+                pk_key = f"{nested_prefix}{field.Meta.model._meta.pk.name}"
+                steps.append((name, pk_key, None, nested_steps))
+                columns.extend([pk_key, *nested_columns])
+            else:
+                column = prefix + field.source.replace('.', '__')
+                steps.append((name, column, _converter(field), None))
+                columns.append(column)
+        return steps, columns
+
+    def values(self, queryset):
+        """The rows this serializer reads, as a values() queryset"""
+        return queryset.select_related(None).prefetch_related(None).values(*self.columns)
+
+    def serialize(self, rows):
+        rows = list(rows)
+        computed = {
+            name: getattr(self, f'render_{name}')(rows)
+            for name, key, _, _ in self.steps if key is None
+        }
+        return [_build(self.steps, row, computed, index) for index, row in enumerate(rows)]
+
+
+# === BULK LOOKUPS ===
+
+def primary_files(property_ids):
+    """
+    {property_id: (storage, name, renditions)} for each property's card
+    image: its primary PropertyMedia image, else its primary PropertyImage
+    (the same precedence as PropertyListSerializer._get_primary_file)
+    """
+    files = {}
+    media_storage = PropertyMedia._meta.get_field('file').storage
+    for property_id, name, renditions in PropertyMedia.objects.filter(
+        property_id__in=property_ids, is_primary=True, media_type='image'
+    ).values_list('property_id', 'file', 'renditions'):
+        files.setdefault(property_id, (media_storage, name, renditions))
+
+    missing = [property_id for property_id in property_ids if property_id not in files]
+    if missing:
+        image_storage = PropertyImage._meta.get_field('image').storage
+        for property_id, name, renditions in PropertyImage.objects.filter(
+            property_id__in=missing, is_primary=True
+        ).values_list('property_id', 'image', 'renditions'):
+            files.setdefault(property_id, (image_storage, name, renditions))
+    return files
+
+
+class FastPropertyAmenitySerializer(FastSerializer):
+    serializer_class = PropertyAmenitySerializer
+
+
+def amenity_previews(property_ids):
+    """{property_id: first AMENITY_PREVIEW_SIZE serialized PropertyAmenity rows}"""
+    fast = FastPropertyAmenitySerializer()
+    rows = PropertyAmenity.objects.filter(property_id__in=property_ids).order_by('property_id', 'id')
+    rows = list(rows.values('property_id', *fast.columns))
+    previews = {}
+    for row, item in zip(rows, fast.serialize(rows)):
+        preview = previews.setdefault(row['property_id'], [])
+        if len(preview) < AMENITY_PREVIEW_SIZE:
+            preview.append(item)
+    return previews
+
+
+# === SERIALIZERS ===
+
+class FastPropertyListSerializer(FastSerializer):
+    serializer_class = PropertyListSerializer
+    COMPUTED = {
+        'price_display': ['price', 'price_per_unit'],
+        'location_display': ['city', 'state'],
+        'seller_name': ['seller', 'seller__first_name', 'seller__last_name'],
+        'primary_image': [],
+        'primary_image_srcset': [],
+        'amenities_preview': [],
+    }
+
+    def serialize(self, rows):
+        self._files = None
+        return super().serialize(rows)
+
+    def _primary_files(self, rows):
+        # Shared by primary_image and primary_image_srcset
+        if self._files is None:
+            self._files = primary_files([row['id'] for row in rows])
+        return self._files
+
+    def render_price_display(self, rows):
+        return [Property.format_price(row['price'], row['price_per_unit']) for row in rows]
+
+    def render_location_display(self, rows):
+        return [f"{row['city']}, {row['state']}" for row in rows]
+
+    def render_seller_name(self, rows):
+        # User.get_full_name()
+        return [
+            None if row['seller'] is None else f"{row['seller__first_name']} {row['seller__last_name']}".strip()
+            for row in rows
+        ]
+
+    def render_primary_image(self, rows):
+        files = self._primary_files(rows)
+        urls = []
+        for row in rows:
+            storage, name, _ = files.get(row['id'], (None, None, None))
+            urls.append(storage.url(name) if name else None)
+        return urls
+
+    def render_primary_image_srcset(self, rows):
+        files = self._primary_files(rows)
+        srcsets = []
+        for row in rows:
+            storage, name, renditions = files.get(row['id'], (None, None, None))
+            srcsets.append(build_srcset(renditions, storage) if name else None)
+        return srcsets
+
+    def render_amenities_preview(self, rows):
+        previews = amenity_previews([row['id'] for row in rows])
+        return [previews.get(row['id'], []) for row in rows]
+
+
+class FastPropertyMapSerializer(FastSerializer):
+    serializer_class = PropertyMapSerializer
+    COMPUTED = {
+        'price_display': ['price', 'price_per_unit'],
+    }
+
+    render_price_display = FastPropertyListSerializer.render_price_display
+
+
+class FastFavoriteSerializer(FastSerializer):
+    serializer_class = FavoriteSerializer
+    COMPUTED = {
+        'price_display': ['property__price', 'property__price_per_unit'],
+        'property_image': ['property'],
+    }
+
+    def render_price_display(self, rows):
+        return [Property.format_price(row['property__price'], row['property__price_per_unit']) for row in rows]
+
+    def render_property_image(self, rows):
+        files = primary_files([row['property'] for row in rows])
+        urls = []
+        for row in rows:
+            storage, name, _ = files.get(row['property'], (None, None, None))
+            urls.append(storage.url(name) if name else None)
+        return urls
@@ -0,0 +1,202 @@
+# properties/feed.py
+"""
+Streaming listing feed for partner portals.
+
+Published properties are read with one ``.iterator()`` query and handled in
+fixed-size batches. Each batch loads its primary images, amenities and
+contacts with one set-based query each, so a feed of any size uses a
+constant number of queries per batch and constant memory. Output is NDJSON
+or CSV, optionally gzip-compressed on the fly.
+"""
+import csv
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Property, PropertyAmenity, PropertyContact, PropertyImage, PropertyMedia
+
+DEFAULT_SETTINGS = {
+    'BATCH_SIZE': 500,
+    'GZIP_LEVEL': 6,
+}
+
+FORMATS = ('ndjson', 'csv')
+
+PROPERTY_FIELDS = [
+    'id', 'title', 'short_description', 'description', 'property_type', 'land_type',
+    'address', 'city', 'state', 'zip_code', 'latitude', 'longitude', 'landmarks',
+    'price', 'price_unit', 'is_negotiable', 'price_per_unit',
+    'size_acres', 'plot_dimensions', 'num_plots_available', 'total_plots',
+    'topography', 'soil_type', 'zoning', 'title_deed_status',
+    'road_access_type', 'water_supply_types', 'electricity_availability',
+    'featured', 'created_at', 'updated_at', 'published_at',
+]
+
+CONTACT_FIELDS = ['agent_name', 'agent_phone', 'agent_email', 'whatsapp_number', 'office_address']
+
+CSV_COLUMNS = PROPERTY_FIELDS + ['primary_image', 'amenities'] + [f'contact_{field}' for field in CONTACT_FIELDS]
+
+
+def get_feed_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'PROPERTY_FEED', {})}
+
+
+def parse_updated_since(value):
+    """Accept an ISO datetime or date; returns an aware datetime or None"""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        parsed_date = parse_date(value)
+        if parsed_date is None:
+            raise ValueError(f'Invalid updated_since: {value}')
+        parsed = datetime.combine(parsed_date, datetime.min.time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def feed_queryset(updated_since=None):
+    queryset = Property.objects.filter(status='published')
+    if updated_since is not None:
+        queryset = queryset.filter(updated_at__gte=updated_since)
+    return queryset.order_by('updated_at', 'id').values(*PROPERTY_FIELDS)
+
+
+# === BATCH LOOKUPS ===
+
+def _primary_images(property_ids):
+    """{property_id: url}; a primary image-type PropertyMedia wins over PropertyImage"""
+    images = {}
+    image_storage = PropertyImage._meta.get_field('image').storage
+    for property_id, name in PropertyImage.objects.filter(
+        property_id__in=property_ids, is_primary=True
+    ).values_list('property_id', 'image'):
+        if name:
+            images[property_id] = image_storage.url(name)
+
+    media_storage = PropertyMedia._meta.get_field('file').storage
+    for property_id, name in PropertyMedia.objects.filter(
+        property_id__in=property_ids, is_primary=True, media_type='image'
+    ).values_list('property_id', 'file'):
+        if name:
+            images[property_id] = media_storage.url(name)
+    return images
+
+
+def amenities_by_property(property_ids):
+    """{property_id: [{name, availability}, ...]} sorted by amenity name"""
+    amenities = {}
+    for property_id, name, availability in PropertyAmenity.objects.filter(
+        property_id__in=property_ids
+    ).order_by('amenity__name').values_list('property_id', 'amenity__name', 'availability'):
+        amenities.setdefault(property_id, []).append({'name': name, 'availability': availability})
+    return amenities
+
+
+def _contacts(property_ids):
+    return {
+        row.pop('property_id'): row
+        for row in PropertyContact.objects.filter(
+            property_id__in=property_ids
+        ).values('property_id', *CONTACT_FIELDS)
+    }
+
+
+def _enrich(batch):
+    property_ids = [row['id'] for row in batch]
+    images = _primary_images(property_ids)
+    amenities = amenities_by_property(property_ids)
+    contacts = _contacts(property_ids)
+    for row in batch:
+        row['primary_image'] = images.get(row['id'])
+        row['amenities'] = amenities.get(row['id'], [])
+        row['contact'] = contacts.get(row['id'])
+        yield row
+
+
+def iter_feed_records(updated_since=None, batch_size=None):
+    """Yield one dict per published property, oldest update first"""
+    batch_size = batch_size or get_feed_settings()['BATCH_SIZE']
+    batch = []
+    for row in feed_queryset(updated_since).iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield from _enrich(batch)
+            batch = []
+    if batch:
+        yield from _enrich(batch)
+
+
+# === ENCODING ===
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+class _EchoBuffer:
+    """File-like object whose write() returns the value, for csv.writer streaming"""
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_json_default)
+    return value
+
+
+def encode_ndjson(records):
+    for record in records:
+        yield json.dumps(record, default=_json_default) + '\n'
+
+
+def encode_csv(records):
+    writer = csv.writer(_EchoBuffer())
+    yield writer.writerow(CSV_COLUMNS)
+    for record in records:
+        contact = record.get('contact') or {}
+        row = [_csv_value(record[field]) for field in PROPERTY_FIELDS]
+        row.append(record['primary_image'] or '')
+        row.append('|'.join(amenity['name'] for amenity in record['amenities']))
+        row.extend(contact.get(field, '') for field in CONTACT_FIELDS)
+        yield writer.writerow(row)
+
+
+def gzip_stream(chunks, level=None, flush_size=64 * 1024):
+    """Gzip-compress an iterable of str chunks, yielding compressed bytes as they fill"""
+    compressor = zlib.compressobj(level or get_feed_settings()['GZIP_LEVEL'], zlib.DEFLATED, 31)
+    pending, pending_size = [], 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        pending.append(data)
+        pending_size += len(data)
+        if pending_size >= flush_size:
+            compressed = compressor.compress(b''.join(pending))
+            pending, pending_size = [], 0
+            if compressed:
+                yield compressed
+    if pending:
+        yield compressor.compress(b''.join(pending))
+    yield compressor.flush()
+
+
+def stream_feed(export_format, updated_since=None, compress=False):
+    records = iter_feed_records(updated_since)
+    chunks = encode_csv(records) if export_format == 'csv' else encode_ndjson(records)
+    if compress:
+        return gzip_stream(chunks)
+    return (chunk.encode('utf-8') for chunk in chunks)
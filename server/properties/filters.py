@@ -44,6 +44,9 @@ class PropertyFilter(django_filters.FilterSet):
     internet_availability = django_filters.BooleanFilter(field_name='internet_availability')
     
     # Water supply specific filters
+    water_supply_type = django_filters.MultipleChoiceFilter(
+        choices=Property.WATER_SOURCES, method='filter_water_supply_type'
+    )
     has_borehole = django_filters.BooleanFilter(field_name='has_borehole')
     has_piped_water = django_filters.BooleanFilter(field_name='has_piped_water')
     
@@ -60,12 +63,16 @@ class PropertyFilter(django_filters.FilterSet):
     
     # Road access filters
     road_access_type = django_filters.MultipleChoiceFilter(
-        method='filter_road_access_type'
+        choices=Property.ROAD_ACCESS_TYPES, method='filter_road_access_type'
     )
     
     # Topography and soil filters
-    topography = django_filters.MultipleChoiceFilter(method='filter_topography')
-    soil_type = django_filters.MultipleChoiceFilter(method='filter_soil_type')
+    topography = django_filters.MultipleChoiceFilter(
+        choices=Property.TOPOGRAPHY_TYPES, method='filter_topography'
+    )
+    soil_type = django_filters.MultipleChoiceFilter(
+        choices=Property.SOIL_TYPES, method='filter_soil_type'
+    )
     
     # Zoning filters
     zoning = django_filters.CharFilter(field_name='zoning', lookup_expr='icontains')
@@ -121,7 +128,7 @@ class PropertyFilter(django_filters.FilterSet):
             return queryset.filter(
                 Q(has_borehole=True) | 
                 Q(has_piped_water=True) | 
-                Q(water_supply_types__len__gt=0)
+                (Q(water_supply_types__isnull=False) & ~Q(water_supply_types=[]))
             )
         return queryset
 
@@ -140,57 +147,42 @@ class PropertyFilter(django_filters.FilterSet):
         Filter properties with road access (any type)
         """
         if value:
-            return queryset.filter(
-                Q(road_access_type__isnull=False) & 
-                ~Q(road_access_type='')
-            )
+            return queryset.exclude(road_access_type__in=['', 'none'])
         return queryset
 
-    def filter_road_access_type(self, queryset, name, value):
-        """
-        Filter by specific road access types
-        """
+    def _filter_in(self, queryset, field, value):
+        """Single indexed IN lookup on a categorical column"""
         if value:
-            # Handle both single values and lists
             if not isinstance(value, (list, tuple)):
                 value = [value]
-            
-            # Build Q objects for each road type
-            q_objects = Q()
-            for road_type in value:
-                q_objects |= Q(road_access_type__icontains=road_type)
-            
-            return queryset.filter(q_objects)
+            return queryset.filter(**{f'{field}__in': list(value)})
         return queryset
 
+    def filter_road_access_type(self, queryset, name, value):
+        """
+        Filter by specific road access types
+        """
+        return self._filter_in(queryset, 'road_access_type', value)
+
     def filter_topography(self, queryset, name, value):
         """
         Filter by topography types
         """
-        if value:
-            if not isinstance(value, (list, tuple)):
-                value = [value]
-            
-            q_objects = Q()
-            for topography_type in value:
-                q_objects |= Q(topography__icontains=topography_type)
-            
-            return queryset.filter(q_objects)
-        return queryset
+        return self._filter_in(queryset, 'topography', value)
 
     def filter_soil_type(self, queryset, name, value):
         """
         Filter by soil types
         """
+        return self._filter_in(queryset, 'soil_type', value)
+
+    def filter_water_supply_type(self, queryset, name, value):
+        """
+        Filter by water sources (any of). On PostgreSQL has_any_keys is the
+        jsonb ?| operator, which matches array elements and uses the GIN index.
+        """
         if value:
-            if not isinstance(value, (list, tuple)):
-                value = [value]
-            
-            q_objects = Q()
-            for soil in value:
-                q_objects |= Q(soil_type__icontains=soil)
-            
-            return queryset.filter(q_objects)
+            return queryset.filter(water_supply_types__has_any_keys=list(value))
         return queryset
 
     def filter_has_payment_plan(self, queryset, name, value):
@@ -0,0 +1,278 @@
+# properties/imports.py
+"""
+Bulk property import from CSV or NDJSON.
+
+Rows are read one at a time from the stream, validated in batches with the
+same field rules and ``validate()`` as PropertyCreateSerializer, and every
+valid row in a batch is inserted with a single ``bulk_create`` for Property
+and one for PropertyAmenity. Rows that fail are collected in a per-row error
+report instead of aborting the import.
+
+Amenities are given in an ``amenities`` column/key: in CSV as
+``Borehole|Tarmac road=nearby`` (names or IDs, optional ``=availability``),
+in NDJSON as a list of IDs, names or
+``{"amenity_id"|"name", "availability", "details"}`` objects.
+"""
+import csv
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+
+from .changes import record_bulk_created
+from .models import Amenity, Property, PropertyAmenity
+from .serializers import PropertyCreateSerializer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'BATCH_SIZE': 1000,
+    'MAX_REPORTED_ERRORS': 1000,  # errors returned by the API endpoint
+}
+
+FORMATS = ('csv', 'ndjson')
+
+AVAILABILITY_VALUES = {value for value, _ in PropertyAmenity.AVAILABILITY_CHOICES}
+
+
+def get_import_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'PROPERTY_IMPORT', {})}
+
+
+def detect_format(filename, default='csv'):
+    ext = os.path.splitext(filename or '')[1].lower().lstrip('.')
+    if ext in ('ndjson', 'jsonl', 'json'):
+        return 'ndjson'
+    if ext == 'csv':
+        return 'csv'
+    return default
+
+
+# === PARSING ===
+
+def iter_rows(stream, import_format):
+    """
+    Yield (row_number, row_dict) from a text stream without reading it all
+    into memory. Unparseable NDJSON lines are yielded as (row_number, None),
+    CSV rows with an undecodable cell as (row_number, ValidationError).
+    """
+    if import_format == 'csv':
+        for row_number, row in enumerate(csv.DictReader(stream), start=1):
+            try:
+                yield row_number, _clean_csv_row(row)
+            except serializers.ValidationError as e:
+                yield row_number, e
+        return
+
+    row_number = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row_number, row if isinstance(row, dict) else None
+
+
+def _clean_csv_row(row):
+    """Drop empty cells (so model defaults apply) and decode list columns"""
+    cleaned = {}
+    for key, value in row.items():
+        if key is None or value is None:
+            continue
+        key, value = key.strip(), value.strip()
+        if value == '':
+            continue
+        if key == 'water_supply_types' and value.startswith('['):
+            try:
+                value = json.loads(value)
+            except ValueError as e:
+                raise serializers.ValidationError({key: [f'Invalid JSON list: {e}']})
+        elif key == 'water_supply_types':
+            value = [part.strip() for part in value.split('|') if part.strip()]
+        cleaned[key] = value
+    return cleaned
+
+
+# === AMENITIES ===
+
+def build_amenity_lookup():
+    """Map amenity IDs and lower-cased names to IDs with a single query"""
+    lookup = {}
+    for amenity_id, name in Amenity.objects.filter(is_active=True).values_list('id', 'name'):
+        lookup[str(amenity_id)] = amenity_id
+        lookup.setdefault(name.strip().lower(), amenity_id)
+    return lookup
+
+
+def parse_amenities(value, lookup):
+    """
+    Resolve an amenities cell/value to [{'amenity_id', 'availability', 'details'}].
+    Raises ValueError naming the first unknown amenity or availability.
+    """
+    if not value:
+        return []
+
+    if isinstance(value, str):
+        items = []
+        for part in value.split('|'):
+            reference, _, availability = part.partition('=')
+            if reference.strip():
+                items.append({'name': reference.strip(), 'availability': availability.strip() or 'on_site'})
+    elif isinstance(value, list):
+        items = [item if isinstance(item, dict) else {'name': item} for item in value]
+    else:
+        raise ValueError('Amenities must be a list or a "|"-separated string')
+
+    resolved = {}
+    for item in items:
+        reference = item.get('amenity_id', item.get('name'))
+        amenity_id = lookup.get(str(reference).strip().lower())
+        if amenity_id is None:
+            raise ValueError(f'Unknown amenity: {reference}')
+
+        availability = item.get('availability') or 'on_site'
+        if availability not in AVAILABILITY_VALUES:
+            raise ValueError(f'Invalid availability for {reference}: {availability}')
+
+        resolved[amenity_id] = {
+            'amenity_id': amenity_id,
+            'availability': availability,
+            'details': str(item.get('details') or '')[:200],
+        }
+    return list(resolved.values())
+
+
+# === IMPORT ===
+
+class ImportReport:
+    """Running totals and per-row errors for one import"""
+
+    def __init__(self):
+        self.total = 0
+        self.created = 0
+        self.errors = []
+        self.stopped_at = None
+
+    def stop(self, row_number, error):
+        """The file couldn't be read past ``row_number``; the rows before it stand"""
+        self.stopped_at = row_number
+        self.add_error(row_number, {'non_field_errors': [f'Could not read the file from this row on: {error}']})
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    def add_error(self, row_number, errors):
+        self.errors.append({'row': row_number, 'errors': errors})
+
+    def as_dict(self, max_errors=None):
+        errors = self.errors if max_errors is None else self.errors[:max_errors]
+        return {
+            'total': self.total,
+            'created': self.created,
+            'failed': self.failed,
+            'errors': errors,
+            'errors_truncated': len(errors) < self.failed,
+            'stopped_at': self.stopped_at,
+        }
+
+
+def _validate_batch(validator, batch, amenity_lookup, report):
+    """Return [(validated_data, amenities)] for the valid rows in ``batch``"""
+    valid = []
+    for row_number, row in batch:
+        if row is None:
+            report.add_error(row_number, {'non_field_errors': ['Row is not a JSON object']})
+            continue
+        if isinstance(row, serializers.ValidationError):
+            report.add_error(row_number, serializers.as_serializer_error(row))
+            continue
+
+        row = dict(row)
+        try:
+            amenities = parse_amenities(row.pop('amenities', None), amenity_lookup)
+        except ValueError as e:
+            report.add_error(row_number, {'amenities': [str(e)]})
+            continue
+
+        try:
+            # Same field validation and validate() as the create endpoint
+            validated_data = validator.run_validation(row)
+        except serializers.ValidationError as e:
+            report.add_error(row_number, serializers.as_serializer_error(e))
+            continue
+
+        valid.append((validated_data, amenities))
+    return valid
+
+
+def _insert_batch(valid, seller, status):
+    properties = [
+        Property(seller=seller, status=status, **validated_data)
+        for validated_data, _ in valid
+    ]
+
+    with transaction.atomic():
+        created = Property.objects.bulk_create(properties)
+        PropertyAmenity.objects.bulk_create([
+            PropertyAmenity(property=property_obj, **amenity)
+            for property_obj, (_, amenities) in zip(created, valid)
+            for amenity in amenities
+        ])
+        # bulk_create sends no post_save, so log the changes here
+        record_bulk_created(created)
+    return created
+
+
+def import_properties(rows, seller, status='draft', batch_size=None, dry_run=False):
+    """
+    Validate and insert ``rows`` (an iterable of (row_number, dict)) for
+    ``seller``. Returns an ImportReport; with ``dry_run`` nothing is written.
+
+    Batches commit as they go, so a stream that breaks part way (bad
+    encoding, malformed CSV) doesn't raise: the rows read so far are
+    imported and the report's ``stopped_at`` names the row it stopped at.
+    """
+    batch_size = batch_size or get_import_settings()['BATCH_SIZE']
+    validator = PropertyCreateSerializer()
+    amenity_lookup = build_amenity_lookup()
+    report = ImportReport()
+
+    def flush(batch):
+        valid = _validate_batch(validator, batch, amenity_lookup, report)
+        if valid and not dry_run:
+            report.created += len(_insert_batch(valid, seller, status))
+        elif dry_run:
+            report.created += len(valid)
+
+    batch = []
+    rows, row_number = iter(rows), 0
+    while True:
+        try:
+            row_number, row = next(rows)
+        except StopIteration:
+            break
+        except (UnicodeDecodeError, ValueError, csv.Error) as e:
+            report.stop(row_number + 1, e)
+            break
+        report.total += 1
+        batch.append((row_number, row))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    logger.info(
+        "Property import for %s: %d rows, %d created, %d failed%s%s",
+        seller, report.total, report.created, report.failed, ' (dry run)' if dry_run else '',
+        f', stopped at row {report.stopped_at}' if report.stopped_at else ''
+    )
+    return report
@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from properties import benchmarks
+
+
+class Command(BaseCommand):
+    help = "Benchmark the core API endpoints through the test client and write the results as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            choices=list(benchmarks.SCENARIOS), help="Repeatable; default: all")
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument('--memory-samples', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help="Write results to this JSON file")
+        parser.add_argument('--compare', help="Baseline JSON from an earlier run to diff against")
+
+    def handle(self, *args, **options):
+        try:
+            report = benchmarks.run_benchmarks(
+                scenarios=options['scenarios'],
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                memory_samples=options['memory_samples'],
+                seed=options['seed'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"{'scenario':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>10}{'peak KiB':>10}")
+        for name, result in report['results'].items():
+            latency = result['latency_ms']
+            self.stdout.write(
+                f"{name:<22}{latency['p50']:>10.2f}{latency['p95']:>10.2f}{latency['p99']:>10.2f}"
+                f"{result['queries']['mean'] or 0:>10.1f}{result['peak_memory_kib']['median'] or 0:>10.0f}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            self.stdout.write(f"\nAgainst {baseline['meta'].get('revision') or options['compare']}:")
+            for name, metric, before, after, change in benchmarks.compare(baseline, report):
+                style = self.style.ERROR if change > 10 else self.style.SUCCESS if change < -10 else str
+                self.stdout.write(style(f"  {name:<22}{metric:<24}{before:>10}{after:>10}{change:>+8.1f}%"))
@@ -0,0 +1,215 @@
+import asyncio
+import io
+import json
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from django.urls import path
+from django.utils.crypto import get_random_string
+
+from newsletter import outbox, views as newsletter_views
+from newsletter.models import NewsletterSubscriber
+from properties import views as property_views
+from properties.benchmarks import percentile
+from properties.models import Property
+from users import views as user_views
+from users.models import UserActivity
+
+# Both versions of each endpoint, mounted side by side for the run
+urlpatterns = [
+    path('wsgi/map_data/', property_views.PropertyViewSet.as_view({'get': 'map_data'})),
+    path('asgi/map_data/', property_views.map_data_async),
+    path('wsgi/popup_status/', newsletter_views.check_popup_status),
+    path('asgi/popup_status/', newsletter_views.check_popup_status_async),
+    path('wsgi/track_activity/', user_views.track_user_activity),
+    path('asgi/track_activity/', user_views.track_user_activity_async),
+    path('wsgi/subscribe/', newsletter_views.subscribe_newsletter),
+    path('asgi/subscribe/', newsletter_views.subscribe_newsletter_async),
+]
+
+HOST = 'localhost'
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the async views under Django's ASGI handler against the sync "
+        "views under its WSGI handler with a fixed thread pool, in process"
+    )
+
+    ENDPOINTS = ['map_data', 'popup_status', 'track_activity', 'subscribe']
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', action='append', dest='endpoints', choices=self.ENDPOINTS,
+                            help="Repeatable; default: all")
+        parser.add_argument('--requests', type=int, default=400, help="Requests per endpoint and server")
+        parser.add_argument('--concurrency', type=int, default=32, help="Concurrent clients")
+        parser.add_argument('--threads', type=int, default=8, help="WSGI worker threads")
+        parser.add_argument('--db-latency', type=float, default=0.0,
+                            help="Milliseconds added to every SQL query, to stand in for a database across a network")
+
+    def request_for(self, endpoint):
+        """(method, path suffix, query string, body) for one request to ``endpoint``"""
+        if endpoint == 'map_data':
+            return 'GET', 'map_data/', '', b''
+        if endpoint == 'popup_status':
+            return 'GET', 'popup_status/', f'session_key={get_random_string(16)}', b''
+        if endpoint == 'track_activity':
+            body = {'type': 'search', 'search_query': 'benchmark', 'property_id': self.property_id}
+            return 'POST', 'track_activity/', '', json.dumps(body).encode()
+        body = {'email': f'{self.email_prefix}{uuid.uuid4().hex}@example.com'}
+        return 'POST', 'subscribe/', '', json.dumps(body).encode()
+
+    def headers(self, body):
+        headers = {
+            'host': HOST,
+            'cookie': f'{settings.SESSION_COOKIE_NAME}={self.session_key}; {settings.CSRF_COOKIE_NAME}={self.csrf_token}',
+            'x-csrftoken': self.csrf_token,
+            'accept': 'application/json',
+        }
+        if body:
+            headers['content-type'] = 'application/json'
+            headers['content-length'] = str(len(body))
+        return headers
+
+    # === SERVERS ===
+
+    def call_wsgi(self, endpoint):
+        method, suffix, query, body = self.request_for(endpoint)
+        environ = {
+            'REQUEST_METHOD': method, 'PATH_INFO': f'/wsgi/{suffix}', 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+            'SERVER_NAME': HOST, 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+            'wsgi.input': io.BytesIO(body), 'wsgi.url_scheme': 'http', 'wsgi.errors': io.StringIO(),
+        }
+        for name, value in self.headers(body).items():
+            key = name.upper().replace('-', '_')
+            environ[key if key in ('CONTENT_TYPE', 'CONTENT_LENGTH') else f'HTTP_{key}'] = value
+
+        statuses = []
+        response = self.wsgi_app(environ, lambda status, headers: statuses.append(int(status.split()[0])))
+        try:
+            for _ in response:
+                pass
+        finally:
+            response.close()
+        return statuses[0]
+
+    async def call_asgi(self, endpoint):
+        method, suffix, query, body = self.request_for(endpoint)
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'scheme': 'http',
+            'method': method, 'path': f'/asgi/{suffix}', 'raw_path': f'/asgi/{suffix}'.encode(),
+            'query_string': query.encode(), 'root_path': '',
+            'headers': [(name.encode(), value.encode()) for name, value in self.headers(body).items()],
+            'client': ('127.0.0.1', 50000), 'server': (HOST, 80),
+        }
+        messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+        never = asyncio.Event()
+        statuses = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await never.wait()
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+
+        await self.asgi_app(scope, receive, send)
+        return statuses[0]
+
+    async def load(self, server, endpoint, pool):
+        timings, failures = [], []
+        remaining = iter(range(self.requests))
+        loop = asyncio.get_running_loop()
+
+        async def client():
+            for _ in remaining:
+                started = time.perf_counter()
+                if server == 'wsgi':
+                    status = await loop.run_in_executor(pool, self.call_wsgi, endpoint)
+                else:
+                    status = await self.call_asgi(endpoint)
+                timings.append(time.perf_counter() - started)
+                if status >= 400:
+                    failures.append(status)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(self.concurrency)))
+        return timings, failures, time.perf_counter() - started
+
+    # === RUN ===
+
+    def setup_client(self):
+        user = get_user_model().objects.filter(is_active=True).order_by('id').first()
+        if user is None:
+            raise CommandError("No active user to send authenticated requests as; run generate_synthetic_data first")
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session['_auth_user_id'] = str(user.pk)
+        session['_auth_user_backend'] = 'django.contrib.auth.backends.ModelBackend'
+        session['_auth_user_hash'] = user.get_session_auth_hash()
+        session.create()
+        self.session_key = session.session_key
+        self.csrf_token = get_random_string(32)
+        self.email_prefix = f'benchmark-{uuid.uuid4().hex[:8]}-'
+        self.property_id = Property.objects.values_list('id', flat=True).order_by('id').first()
+        return session
+
+    def handle(self, *args, **options):
+        self.requests, self.concurrency = options['requests'], options['concurrency']
+        endpoints = options['endpoints'] or self.ENDPOINTS
+        latency = options['db_latency'] / 1000
+
+        def add_latency(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def wrap_connection(sender, connection, **kwargs):
+            # Fired on every reconnect of a thread's connection object
+            if add_latency not in connection.execute_wrappers:
+                connection.execute_wrappers.append(add_latency)
+
+        session = self.setup_client()
+        first_activity = (UserActivity.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+        if latency:
+            connection_created.connect(wrap_connection)
+        self.stdout.write(
+            f"{self.requests} requests per run, {self.concurrency} concurrent clients, "
+            f"{options['threads']} WSGI threads, {options['db_latency']} ms added per query"
+        )
+        self.stdout.write(f"{'endpoint':<16}{'server':<8}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'req/s':>10}{'errors':>8}")
+        try:
+            with override_settings(
+                ROOT_URLCONF=__name__, ALLOWED_HOSTS=[HOST],
+                EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+            ):
+                self.wsgi_app = get_wsgi_application()
+                self.asgi_app = get_asgi_application()
+                with ThreadPoolExecutor(max_workers=options['threads'], thread_name_prefix='wsgi') as pool:
+                    for endpoint in endpoints:
+                        for server in ('wsgi', 'asgi'):
+                            timings, failures, elapsed = asyncio.run(self.load(server, endpoint, pool))
+                            timings = sorted(t * 1000 for t in timings)
+                            self.stdout.write(
+                                f"{endpoint:<16}{server:<8}{percentile(timings, 50):>10.2f}{percentile(timings, 95):>10.2f}"
+                                f"{statistics.mean(timings):>10.2f}{len(timings) / elapsed:>10.0f}{len(failures):>8}"
+                            )
+                            if failures:
+                                self.stderr.write(f"  HTTP statuses: {sorted(set(failures))}")
+                # The welcome emails queued by subscribe, while the locmem backend is still on
+                outbox.wait_for_queued()
+        finally:
+            connection_created.disconnect(wrap_connection)
+            session.delete()
+            UserActivity.objects.filter(id__gte=first_activity, search_query='benchmark').delete()
+            NewsletterSubscriber.objects.filter(email__startswith=self.email_prefix).delete()
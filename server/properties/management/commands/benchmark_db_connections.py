@@ -0,0 +1,92 @@
+import copy
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import load_backend
+
+from pristineprimer.postgresql_pool.base import get_pool
+from properties.benchmarks import percentile
+from properties.models import Property
+
+# Database settings overrides for each connection mode
+MODES = {
+    'per-request': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False},
+    'persistent': {'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True},
+    'pool': {'ENGINE': 'pristineprimer.postgresql_pool', 'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Time simulated requests (connect, list-page query, request-end cleanup) "
+        "under each database connection mode"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', action='append', dest='modes', choices=list(MODES),
+                            help="Repeatable; default: every mode the database supports")
+        parser.add_argument('--requests', type=int, default=500, help="Requests per thread")
+        parser.add_argument('--threads', type=int, default=4, help="Concurrent worker threads")
+
+    def wrapper(self, mode):
+        settings_dict = {**copy.deepcopy(connections.settings[DEFAULT_DB_ALIAS]), **MODES[mode]}
+        if mode == 'pool':
+            settings_dict['POOL'] = {**settings_dict.get('POOL', {}), 'MAX_SIZE': self.threads}
+        backend = load_backend(settings_dict['ENGINE'])
+        # One alias per mode, so the pool mode's threads share a pool
+        return backend.DatabaseWrapper(settings_dict, alias=f'benchmark-{mode}')
+
+    def run_thread(self, mode, sql, params, timings):
+        database = self.wrapper(mode)
+        for _ in range(self.requests):
+            started = time.perf_counter()
+            # What close_old_connections() does on request_started / request_finished
+            database.close_if_unusable_or_obsolete()
+            with database.cursor() as cursor:
+                cursor.execute(sql, params)
+                cursor.fetchall()
+            database.close_if_unusable_or_obsolete()
+            timings.append(time.perf_counter() - started)
+        database.close()
+
+    def handle(self, *args, **options):
+        self.requests, self.threads = options['requests'], options['threads']
+        vendor = connections[DEFAULT_DB_ALIAS].vendor
+        modes = options['modes'] or [mode for mode in MODES if mode != 'pool' or vendor == 'postgresql']
+        if 'pool' in modes and vendor != 'postgresql':
+            raise CommandError("The pool mode needs PostgreSQL")
+        if vendor != 'postgresql':
+            self.stdout.write(f"Note: {vendor} has no network or TLS handshake, so connecting costs far less than on RDS")
+
+        queryset = Property.objects.filter(status='published').order_by('-created_at').values('id', 'title', 'price')[:20]
+        sql, params = queryset.query.sql_with_params()
+
+        self.stdout.write(f"{'mode':<14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'req/s':>10}")
+        for mode in modes:
+            timings = []
+            threads = [
+                threading.Thread(target=self.run_thread, args=(mode, sql, params, timings))
+                for _ in range(self.threads)
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+            if len(timings) < self.requests * self.threads:
+                raise CommandError(f"{mode}: some threads failed; see the traceback above")
+            timings = sorted(t * 1000 for t in timings)
+            self.stdout.write(
+                f"{mode:<14}{percentile(timings, 50):>10.3f}{percentile(timings, 95):>10.3f}"
+                f"{percentile(timings, 99):>10.3f}{statistics.mean(timings):>10.3f}{len(timings) / elapsed:>10.0f}"
+            )
+
+            if mode == 'pool':
+                pool = get_pool(self.wrapper(mode))
+                self.stdout.write(f"{'':<14}{pool.opened} connections opened for {len(timings)} requests")
+                pool.close_idle()
@@ -0,0 +1,79 @@
+import io
+import random
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from pristineprimer.parsers import ORJSONParser
+from pristineprimer.renderers import ORJSONRenderer, orjson
+from properties import fast_serializers
+from properties.models import Property
+
+
+class Command(BaseCommand):
+    help = "Time DRF's JSONRenderer/JSONParser against the orjson-backed ones on API payloads"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=30)
+        parser.add_argument('--page-size', type=int, default=100)
+
+    def payloads(self, page_size):
+        published = Property.objects.filter(status='published').order_by('-created_at')
+
+        fast = fast_serializers.FastPropertyMapSerializer()
+        yield 'map_data', fast.serialize(fast.values(published.exclude(latitude=None)))
+
+        fast = fast_serializers.FastPropertyListSerializer()
+        yield 'list page', {
+            'count': published.count(),
+            'next': 'http://testserver/api/properties/?page=2',
+            'previous': None,
+            'results': fast.serialize(fast.values(published)[:page_size]),
+        }
+
+        # Unserialized values: Decimal, datetime and UUID go through the fallback encoder
+        rng = random.Random(1)
+        yield 'raw values()', [
+            {**row, 'token': uuid.UUID(int=rng.getrandbits(128))}
+            for row in published.values('id', 'title', 'price', 'size_acres', 'latitude', 'longitude', 'created_at')[:1000]
+        ]
+
+    def median_ms(self, function, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = function()
+            timings.append(time.perf_counter() - started)
+        return result, statistics.median(timings) * 1000
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson is not installed; the renderer would fall back to DRF's")
+        if not Property.objects.filter(status='published').exists():
+            raise CommandError("No published properties; run generate_synthetic_data first")
+
+        repeat = options['repeat']
+        mismatches = 0
+        for name, data in self.payloads(options['page_size']):
+            drf_body, drf_render = self.median_ms(lambda: JSONRenderer().render(data), repeat)
+            fast_body, fast_render = self.median_ms(lambda: ORJSONRenderer().render(data), repeat)
+
+            drf_data, drf_parse = self.median_ms(lambda: JSONParser().parse(io.BytesIO(drf_body)), repeat)
+            fast_data, fast_parse = self.median_ms(lambda: ORJSONParser().parse(io.BytesIO(drf_body)), repeat)
+
+            identical = drf_body == fast_body and drf_data == fast_data
+            mismatches += not identical
+            self.stdout.write(
+                f"{name:<14} {len(drf_body):>9} bytes | "
+                f"render {drf_render:7.2f} -> {fast_render:6.2f} ms ({drf_render / max(fast_render, 1e-6):4.1f}x) | "
+                f"parse {drf_parse:7.2f} -> {fast_parse:6.2f} ms ({drf_parse / max(fast_parse, 1e-6):4.1f}x) | "
+                f"{'identical' if identical else 'DIFFERENT'}"
+            )
+
+        if mismatches:
+            raise CommandError(f"{mismatches} payload(s) rendered or parsed differently")
+        self.stdout.write(self.style.SUCCESS("orjson output is byte-identical to DRF's"))
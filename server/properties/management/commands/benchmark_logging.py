@@ -0,0 +1,62 @@
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from pristineprimer.log import SamplingFilter, queue_handler
+from properties.benchmarks import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Time one log call on the request thread: a plain FileHandler against "
+        "the queued JSON handler, with and without sampling"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records', type=int, default=5000,
+                            help="Beyond the queue size (10000) a burst outruns the writer and records are dropped")
+        parser.add_argument('--sample-rate', type=float, default=0.1)
+
+    def setups(self, directory, sample_rate):
+        """(name, handler, logger filter, file written)"""
+        path = os.path.join(directory, 'plain.log')
+        file_handler = logging.FileHandler(path)
+        # The format LOGGING used to write to logs/django.log
+        file_handler.setFormatter(logging.Formatter('{levelname} {asctime} {module} {process:d} {thread:d} {message}', style='{'))
+        yield 'FileHandler', file_handler, None, path
+
+        path = os.path.join(directory, 'queued.log')
+        yield 'queue + JSON', queue_handler(path, console=False), None, path
+
+        path = os.path.join(directory, 'sampled.log')
+        yield f'queue, {sample_rate:.0%} kept', queue_handler(path, console=False), SamplingFilter(sample_rate), path
+
+    def handle(self, *args, **options):
+        records = options['records']
+        self.stdout.write(f"{'handler':<20}{'p50 us':>10}{'p99 us':>10}{'mean us':>10}{'lines':>10}")
+        with tempfile.TemporaryDirectory() as directory:
+            for index, (name, handler, sampling, path) in enumerate(self.setups(directory, options['sample_rate'])):
+                logger = logging.getLogger(f'benchmark_logging.{index}')
+                logger.propagate = False
+                logger.setLevel(logging.INFO)
+                logger.handlers = [handler]
+                logger.filters = [sampling] if sampling else []
+
+                timings = []
+                for number in range(records):
+                    started = time.perf_counter()
+                    logger.info("query_profile %s %d", 'GET property-list', number, extra={'queries': 4})
+                    timings.append(time.perf_counter() - started)
+                handler.close()  # the queued handlers finish writing first
+
+                with open(path) as log_file:
+                    lines = sum(1 for _ in log_file)
+                timings = sorted(t * 1e6 for t in timings)
+                self.stdout.write(
+                    f"{name:<20}{percentile(timings, 50):>10.2f}{percentile(timings, 99):>10.2f}"
+                    f"{statistics.mean(timings):>10.2f}{lines:>10}"
+                )
@@ -0,0 +1,95 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from properties import facets, search_index
+from properties.models import Property
+
+
+class Command(BaseCommand):
+    help = "Compare the bitmap search index with the ORM for random filter combinations"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def random_filters(self, rng, amenities, prices):
+        filters = {}
+        for column in search_index.BOOLEAN_COLUMNS:
+            if rng.random() < 0.15:
+                filters[column] = rng.random() < 0.5
+        for column, choices in facets.CHOICE_FACETS.items():
+            if rng.random() < 0.2:
+                filters[column] = rng.sample([value for value, _ in choices], rng.randint(1, 2))
+        if amenities and rng.random() < 0.3:
+            filters['amenities'] = rng.sample(amenities, min(len(amenities), rng.randint(1, 2)))
+        if prices and rng.random() < 0.5:
+            low, high = sorted(rng.sample(prices, 2))
+            filters['min_price'], filters['max_price'] = low, high
+        return filters
+
+    def orm_queryset(self, filters):
+        queryset = Property.objects.filter(status='published')
+        for column in search_index.BOOLEAN_COLUMNS:
+            if column in filters:
+                queryset = queryset.filter(**{column: filters[column]})
+        for column in facets.CHOICE_FACETS:
+            if column in filters:
+                queryset = queryset.filter(**{f'{column}__in': filters[column]})
+        if 'amenities' in filters:
+            queryset = queryset.filter(amenities__amenity_id__in=filters['amenities'])
+        if 'min_price' in filters:
+            queryset = queryset.filter(Q(price__gte=filters['min_price']) & Q(price__lte=filters['max_price']))
+        return queryset.distinct()
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        page_size = options['page_size']
+
+        started = time.perf_counter()
+        index = search_index.PropertyIndex().build()
+        build_ms = (time.perf_counter() - started) * 1000
+
+        amenities = list(index.amenities)
+        prices = [value for value in index.ranges['price'].values.values() if value is not None]
+        prices = rng.sample(prices, min(len(prices), 1000))
+        amenity_choices = search_index.amenity_choices()
+        workload = [self.random_filters(rng, amenities, prices) for _ in range(options['queries'])]
+
+        timings = {'orm': [], 'index': []}
+        mismatches = 0
+        for filters in workload:
+            started = time.perf_counter()
+            queryset = self.orm_queryset(filters)
+            orm_count = queryset.count()
+            orm_ids = list(queryset.order_by('-created_at', '-id').values_list('id', flat=True)[:page_size])
+            orm_facets = facets.compute_facets(queryset, amenity_choices)
+            timings['orm'].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            bits = index.query(filters)
+            index_count = bits.bit_count()
+            index_ids = index.page_ids(bits, 0, page_size)
+            index_facets = index.facets(bits, amenity_choices)
+            timings['index'].append(time.perf_counter() - started)
+
+            if (orm_count, orm_ids, orm_facets) != (index_count, index_ids, index_facets):
+                mismatches += 1
+
+        self.stdout.write(f"Index build: {len(index.ids)} published properties in {build_ms:.1f} ms")
+        for path, samples in timings.items():
+            samples_us = sorted(sample * 1e6 for sample in samples)
+            self.stdout.write(
+                f"{path:>5}: p50 {statistics.median(samples_us):10.0f} us  "
+                f"p95 {samples_us[int(len(samples_us) * 0.95) - 1]:10.0f} us  "
+                f"mean {statistics.mean(samples_us):10.0f} us"
+            )
+        speedup = statistics.median(timings['orm']) / max(statistics.median(timings['index']), 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"count + page ids + facets: index is {speedup:.0f}x faster (median); "
+            f"{mismatches} of {len(workload)} results differed"
+        ))
@@ -0,0 +1,95 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from properties import fast_serializers
+from properties.models import Favorite, Property
+from properties.serializers import FavoriteSerializer, PropertyListSerializer, PropertyMapSerializer
+
+
+class Command(BaseCommand):
+    help = "Time DRF serializers against properties.fast_serializers and check the JSON is identical"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help="Rows per page")
+        parser.add_argument('--repeat', type=int, default=30)
+
+    def cases(self, rows):
+        published = Property.objects.filter(status='published').order_by('-created_at')
+        favorites_user = (
+            get_user_model().objects.annotate(favorites=Count('favorite_properties'))
+            .order_by('-favorites').first()
+        )
+        favorites = Favorite.objects.filter(user=favorites_user).order_by('-created_at')
+
+        yield (
+            'list page',
+            lambda: PropertyListSerializer(
+                published.select_related('seller').prefetch_related('media', 'images', 'amenities__amenity')[:rows],
+                many=True,
+            ).data,
+            lambda fast: fast.serialize(fast.values(published)[:rows]),
+            fast_serializers.FastPropertyListSerializer(),
+        )
+        card = set(PropertyListSerializer.FIELD_PRESETS['card'])
+        yield (
+            'list page ?fields=card',
+            lambda: PropertyListSerializer(
+                published.only(*PropertyListSerializer.columns(card))[:rows], many=True, context={'fields': card}
+            ).data,
+            lambda fast: fast.serialize(fast.values(published)[:rows]),
+            fast_serializers.FastPropertyListSerializer(card),
+        )
+        yield (
+            'map data',
+            lambda: PropertyMapSerializer(published.only(*PropertyMapSerializer.columns())[:rows * 10], many=True).data,
+            lambda fast: fast.serialize(fast.values(published)[:rows * 10]),
+            fast_serializers.FastPropertyMapSerializer(),
+        )
+        yield (
+            'favorites',
+            lambda: FavoriteSerializer(
+                favorites.select_related('property').prefetch_related('property__media', 'property__images'),
+                many=True,
+            ).data,
+            lambda fast: fast.serialize(fast.values(favorites)),
+            fast_serializers.FastFavoriteSerializer(),
+        )
+
+    def measure(self, produce, repeat):
+        renderer = JSONRenderer()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = renderer.render(produce())
+            timings.append(time.perf_counter() - started)
+        with CaptureQueriesContext(connection) as queries:
+            produce()
+        return body, statistics.median(timings) * 1000, len(queries)
+
+    def handle(self, *args, **options):
+        if not Property.objects.filter(status='published').exists():
+            raise CommandError("No published properties; run generate_synthetic_data first")
+
+        mismatches = 0
+        for name, drf, fast_path, fast in self.cases(options['rows']):
+            drf_body, drf_ms, drf_queries = self.measure(drf, options['repeat'])
+            fast_body, fast_ms, fast_queries = self.measure(lambda: fast_path(fast), options['repeat'])
+            identical = drf_body == fast_body
+            mismatches += not identical
+            self.stdout.write(
+                f"{name:<24} DRF {drf_ms:8.2f} ms {drf_queries:4} queries | "
+                f"fast {fast_ms:8.2f} ms {fast_queries:4} queries | "
+                f"{drf_ms / max(fast_ms, 1e-6):5.1f}x | {len(fast_body):>8} bytes "
+                f"{'identical' if identical else 'DIFFERENT'}"
+            )
+
+        if mismatches:
+            raise CommandError(f"{mismatches} case(s) rendered different JSON")
+        self.stdout.write(self.style.SUCCESS("All fast-path output is byte-identical to DRF"))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from properties import similarity
+
+
+class Command(BaseCommand):
+    help = "Recompute the precomputed similar-property lists (see properties/similarity.py)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', type=int, nargs='+',
+                            help="Only refresh the lists affected by these property ids")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        if options['ids']:
+            refreshed = similarity.refresh(options['ids'])
+            message = f"Refreshed neighbours of {refreshed} properties"
+        else:
+            listings, rows = similarity.rebuild()
+            message = f"Stored {rows} neighbours for {listings} published properties"
+        self.stdout.write(self.style.SUCCESS(f"{message} in {time.perf_counter() - start:.1f}s"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from properties.storage import collect_garbage
+
+
+class Command(BaseCommand):
+    help = "Recount references to deduplicated media blobs and delete orphaned ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=int, default=None,
+                            help="Keep unreferenced blobs younger than this (default: MEDIA_BLOB_STORAGE['GC_GRACE_HOURS'])")
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be deleted without deleting")
+
+    def handle(self, *args, **options):
+        stats = collect_garbage(grace_hours=options['grace_hours'], dry_run=options['dry_run'])
+        prefix = "Would delete" if options['dry_run'] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {stats['deleted']} orphaned blobs and {stats['untracked_deleted']} untracked files "
+            f"({stats['bytes_freed']} bytes); {stats['recounted']} reference counts corrected"
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from properties.changes import compact_changes
+
+
+class Command(BaseCommand):
+    help = "Drop old property change-log entries that are superseded by newer ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=None,
+                            help="Only compact entries older than this (default: PROPERTY_CHANGE_FEED['COMPACT_AFTER_DAYS'])")
+
+    def handle(self, *args, **options):
+        deleted = compact_changes(older_than_days=options['older_than_days'])
+        self.stdout.write(self.style.SUCCESS(f"{deleted} superseded change entries removed"))
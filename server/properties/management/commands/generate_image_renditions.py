@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from properties.models import PropertyImage, PropertyMedia
+from properties.renditions import IMAGE_MEDIA_TYPES, generate_for_instance
+
+
+class Command(BaseCommand):
+    help = "Backfill responsive image renditions for existing PropertyImage and PropertyMedia rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Regenerate renditions even if they are already up to date"
+        )
+
+    def handle(self, *args, **options):
+        querysets = [
+            PropertyImage.objects.exclude(image=''),
+            PropertyMedia.objects.filter(media_type__in=IMAGE_MEDIA_TYPES).exclude(file=''),
+        ]
+
+        generated = 0
+        for queryset in querysets:
+            for instance in queryset.iterator(chunk_size=200):
+                if generate_for_instance(instance, force=options['force']):
+                    generated += 1
+                    if generated % 100 == 0:
+                        self.stdout.write(f"{generated} images processed...")
+
+        self.stdout.write(self.style.SUCCESS(f"Renditions generated for {generated} images"))
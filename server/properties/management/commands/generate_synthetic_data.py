@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from properties import similarity, synthetic
+
+
+class Command(BaseCommand):
+    help = "Create a reproducible synthetic dataset for benchmarks (see properties/synthetic.py)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--properties', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--flush', action='store_true',
+                            help="Delete the previous synthetic dataset first")
+
+    def handle(self, *args, **options):
+        if options['flush']:
+            deleted = synthetic.flush()
+            self.stdout.write(f"Removed {deleted} synthetic rows")
+
+        counts = synthetic.generate(
+            properties=options['properties'], users=options['users'], seed=options['seed']
+        )
+        summary = ', '.join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Created {summary}"))
+
+        # bulk_create sends no signals, so neighbour lists are built in one pass
+        listings, rows = similarity.rebuild()
+        self.stdout.write(f"Stored {rows} similar-property rows for {listings} published properties")
@@ -0,0 +1,53 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.imports import FORMATS, detect_format, import_properties, iter_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import properties for a seller from a CSV or NDJSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or NDJSON file to import")
+        parser.add_argument('--seller', required=True, help="Username or email of the listing owner")
+        parser.add_argument('--format', choices=FORMATS, help="Defaults to the file extension")
+        parser.add_argument('--status', choices=['draft', 'pending'], default='draft')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--dry-run', action='store_true', help="Validate only, insert nothing")
+        parser.add_argument('--report', help="Write per-row errors to this file as NDJSON")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        seller = User.objects.filter(username=options['seller']).first() or \
+            User.objects.filter(email=options['seller']).first()
+        if seller is None:
+            raise CommandError(f"No user matches {options['seller']}")
+
+        import_format = options['format'] or detect_format(options['path'])
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                report = import_properties(
+                    iter_rows(stream, import_format),
+                    seller=seller,
+                    status=options['status'],
+                    batch_size=options['batch_size'],
+                    dry_run=options['dry_run'],
+                )
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as report_file:
+                for error in report.errors:
+                    report_file.write(json.dumps(error) + '\n')
+
+        verb = "Would create" if options['dry_run'] else "Created"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report.created} of {report.total} properties ({report.failed} rows failed)"
+        ))
+        if report.stopped_at is not None:
+            self.stderr.write(f"Stopped at row {report.stopped_at}: the rest of the file could not be read")
+        for error in report.errors[:20]:
+            self.stdout.write(f"  row {error['row']}: {json.dumps(error['errors'])}")
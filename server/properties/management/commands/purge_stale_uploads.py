@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from properties.uploads import purge_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete chunked uploads (and their temp files) that were never attached to a property"
+
+    def handle(self, *args, **options):
+        purged = purge_stale_uploads()
+        self.stdout.write(self.style.SUCCESS(f"{purged} stale uploads purged"))
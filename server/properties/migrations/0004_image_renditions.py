@@ -0,0 +1,23 @@
+# Generated by Django 4.2.16 on 2026-10-19 04:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0003_amenity_legaldocument_propertyamenity_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertyimage',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized copies, see properties.renditions'),
+        ),
+        migrations.AddField(
+            model_name='propertymedia',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized copies, see properties.renditions'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.16 on 2026-10-19 04:56
+
+from django.db import migrations, models
+import properties.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0005_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('size', models.BigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='propertyimage',
+            name='image',
+            field=models.ImageField(storage=properties.storage.get_media_storage, upload_to='property_images/%Y/%m/%d/'),
+        ),
+        migrations.AlterField(
+            model_name='propertymedia',
+            name='file',
+            field=models.FileField(storage=properties.storage.get_media_storage, upload_to='property_media/%Y/%m/%d/'),
+        ),
+    ]
@@ -0,0 +1,170 @@
+# Generated by Django 4.2.16 on 2026-10-19 05:12
+
+import re
+
+from django.db import migrations, models
+
+CATEGORICAL_FIELDS = ['road_access_type', 'topography', 'soil_type']
+
+# Frozen copy of properties.categories as of this migration, so later edits
+# to the live rules don't change what replaying it does.
+RULES = {
+    'road_access_type': [
+        ('no road', 'none'), ('none', 'none'), ('no access', 'none'),
+        ('cabro', 'cabro'), ('cobble', 'cabro'), ('paver', 'cabro'),
+        ('tarmac', 'tarmac'), ('tarmack', 'tarmac'), ('asphalt', 'tarmac'),
+        ('bitumen', 'tarmac'), ('paved', 'tarmac'), ('highway', 'tarmac'),
+        ('murram', 'murram'), ('marram', 'murram'),
+        ('gravel', 'gravel'),
+        ('earth', 'earth'), ('dirt', 'earth'), ('soil', 'earth'), ('footpath', 'earth'),
+    ],
+    'topography': [
+        ('gentle', 'gentle_slope'), ('gently', 'gentle_slope'),
+        ('flat', 'flat'), ('level', 'flat'), ('plain', 'flat'),
+        ('valley', 'valley'),
+        ('hill', 'hilly'), ('steep', 'hilly'), ('mountain', 'hilly'), ('ridge', 'hilly'),
+        ('slop', 'sloping'), ('incline', 'sloping'), ('undulating', 'sloping'),
+    ],
+    'soil_type': [
+        ('black cotton', 'black_cotton'), ('cotton', 'black_cotton'),
+        ('red', 'red_soil'),
+        ('loam', 'loam'),
+        ('sand', 'sandy'),
+        ('clay', 'clay'),
+        ('volcanic', 'volcanic'),
+        ('rock', 'rocky'), ('stone', 'rocky'), ('murram', 'rocky'),
+    ],
+    'water_supply_types': [
+        ('borehole', 'borehole'), ('bore hole', 'borehole'),
+        ('pipe', 'piped'), ('tap', 'piped'), ('mains', 'piped'), ('county', 'piped'),
+        ('well', 'well'),
+        ('river', 'river'), ('stream', 'river'),
+        ('rain', 'rainwater'), ('harvest', 'rainwater'),
+        ('dam', 'dam'), ('pan', 'dam'),
+    ],
+}
+
+SEPARATORS = re.compile(r'[\s_\-/,.]+')
+
+
+def normalize(field, text):
+    if text is None or not str(text).strip():
+        return ''
+    cleaned = SEPARATORS.sub(' ', str(text).strip().lower()).strip()
+    for keyword, value in RULES[field]:
+        if re.search(r'\b' + re.escape(keyword), cleaned):
+            return value
+    return None
+
+
+def normalize_list(field, values, default):
+    if isinstance(values, str):
+        values = re.split(r'[|,;/]', values)
+    normalized = []
+    for value in values or []:
+        value = normalize(field, value)
+        if value is None:
+            value = default
+        if value and value not in normalized:
+            normalized.append(value)
+    return normalized
+
+
+def normalize_land_fields(apps, schema_editor):
+    """Map existing free text onto the canonical values ('other' if unrecognized)"""
+    Property = apps.get_model('properties', 'Property')
+    PropertyChange = apps.get_model('properties', 'PropertyChange')
+
+    fields = CATEGORICAL_FIELDS + ['water_supply_types']
+    changed, entries = [], []
+
+    def flush():
+        Property.objects.bulk_update(changed, fields)
+        PropertyChange.objects.bulk_create(entries)
+        changed.clear()
+        entries.clear()
+
+    for property_obj in Property.objects.only('id', 'status', *fields).iterator(chunk_size=2000):
+        changed_fields = []
+        for field in CATEGORICAL_FIELDS:
+            current = getattr(property_obj, field)
+            value = normalize(field, current)
+            value = 'other' if value is None else value
+            if value != current:
+                setattr(property_obj, field, value)
+                changed_fields.append(field)
+
+        current = property_obj.water_supply_types
+        sources = normalize_list('water_supply_types', current if isinstance(current, (list, str)) else [], 'other')
+        if sources != current:
+            property_obj.water_supply_types = sources
+            changed_fields.append('water_supply_types')
+
+        if changed_fields:
+            changed.append(property_obj)
+            # Keep incremental sync clients in step with the rewritten values
+            entries.append(PropertyChange(
+                property_id=property_obj.id, action='updated',
+                status=property_obj.status, changed_fields=changed_fields,
+            ))
+        if len(changed) >= 1000:
+            flush()
+    flush()
+
+
+def create_water_sources_gin_index(apps, schema_editor):
+    # jsonb_ops GIN serves ?| (has_any_keys), which matches array elements
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS properties_water_sources_gin '
+            'ON properties_property USING gin (water_supply_types)'
+        )
+
+
+def drop_water_sources_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS properties_water_sources_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0007_property_change_log'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_land_fields, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='property',
+            name='road_access_type',
+            field=models.CharField(blank=True, choices=[('tarmac', 'Tarmac'), ('cabro', 'Cabro / Paved'), ('murram', 'Murram'), ('gravel', 'Gravel'), ('earth', 'Earth Road'), ('none', 'No Road Access'), ('other', 'Other')], max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='soil_type',
+            field=models.CharField(blank=True, choices=[('red_soil', 'Red Soil'), ('black_cotton', 'Black Cotton'), ('loam', 'Loam'), ('sandy', 'Sandy'), ('clay', 'Clay'), ('volcanic', 'Volcanic'), ('rocky', 'Rocky'), ('other', 'Other')], max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='topography',
+            field=models.CharField(blank=True, choices=[('flat', 'Flat'), ('gentle_slope', 'Gentle Slope'), ('sloping', 'Sloping'), ('hilly', 'Hilly'), ('valley', 'Valley'), ('other', 'Other')], max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='water_supply_types',
+            field=models.JSONField(blank=True, default=list, help_text="List of WATER_SOURCES values, e.g. ['borehole', 'piped']"),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['road_access_type', 'status'], name='properties__road_ac_768cb9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['topography', 'status'], name='properties__topogra_0394f8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['soil_type', 'status'], name='properties__soil_ty_08be80_idx'),
+        ),
+        migrations.RunPython(create_water_sources_gin_index, drop_water_sources_gin_index),
+    ]
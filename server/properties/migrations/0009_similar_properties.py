@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-19 05:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0008_categorical_land_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarProperty',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('distance', models.FloatField()),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_links', to='properties.property')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='properties.property')),
+            ],
+            options={
+                'ordering': ['property', 'rank'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='similarproperty',
+            constraint=models.UniqueConstraint(fields=('property', 'rank'), name='unique_similar_property_rank'),
+        ),
+    ]
@@ -2,8 +2,13 @@
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator
+from django.utils import timezone
 from decimal import Decimal
 import json
+import os
+import uuid
+
+from .storage import get_media_storage
 
 class Property(models.Model):
     PROPERTY_TYPES = [
@@ -30,6 +35,48 @@ class Property(models.Model):
         ('community_land', 'Community Land'),
     ]
     
+    # Canonical values for the categorical land fields; free text is mapped
+    # onto these by properties.categories
+    ROAD_ACCESS_TYPES = [
+        ('tarmac', 'Tarmac'),
+        ('cabro', 'Cabro / Paved'),
+        ('murram', 'Murram'),
+        ('gravel', 'Gravel'),
+        ('earth', 'Earth Road'),
+        ('none', 'No Road Access'),
+        ('other', 'Other'),
+    ]
+    
+    TOPOGRAPHY_TYPES = [
+        ('flat', 'Flat'),
+        ('gentle_slope', 'Gentle Slope'),
+        ('sloping', 'Sloping'),
+        ('hilly', 'Hilly'),
+        ('valley', 'Valley'),
+        ('other', 'Other'),
+    ]
+    
+    SOIL_TYPES = [
+        ('red_soil', 'Red Soil'),
+        ('black_cotton', 'Black Cotton'),
+        ('loam', 'Loam'),
+        ('sandy', 'Sandy'),
+        ('clay', 'Clay'),
+        ('volcanic', 'Volcanic'),
+        ('rocky', 'Rocky'),
+        ('other', 'Other'),
+    ]
+    
+    WATER_SOURCES = [
+        ('borehole', 'Borehole'),
+        ('piped', 'Piped'),
+        ('well', 'Well'),
+        ('river', 'River'),
+        ('rainwater', 'Rainwater Harvesting'),
+        ('dam', 'Dam / Water Pan'),
+        ('other', 'Other'),
+    ]
+    
     STATUS_CHOICES = [
         ('draft', 'Draft'),
         ('pending', 'Pending Review'),
@@ -75,8 +122,8 @@ class Property(models.Model):
     total_plots = models.IntegerField(default=1, help_text="Total plots in the development")
     
     # Land Characteristics
-    topography = models.CharField(max_length=100, blank=True, help_text="e.g., 'flat', 'gentle slope', 'hilly'")
-    soil_type = models.CharField(max_length=50, blank=True, help_text="e.g., 'red soil', 'black cotton', 'sandy'")
+    topography = models.CharField(max_length=100, choices=TOPOGRAPHY_TYPES, blank=True)
+    soil_type = models.CharField(max_length=50, choices=SOIL_TYPES, blank=True)
     zoning = models.CharField(max_length=100, blank=True, help_text="Zoning classification")
     title_deed_status = models.CharField(max_length=20, choices=TITLE_DEED_TYPES, null=True, blank=True)
     
@@ -88,11 +135,12 @@ class Property(models.Model):
     
     # === INFRASTRUCTURE & UTILITIES ===
     # Road Access
-    road_access_type = models.CharField(max_length=50, blank=True, help_text="e.g., 'tarmac', 'murram', 'gravel'")
+    road_access_type = models.CharField(max_length=50, choices=ROAD_ACCESS_TYPES, blank=True)
     distance_to_main_road = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, help_text="Distance in km")
     
     # Water Supply
-    water_supply_types = models.JSONField(default=list, blank=True, help_text="List of water sources: ['borehole', 'piped', 'river', 'well']")
+    # GIN-indexed on PostgreSQL (migration 0008), so overlap filters use the index
+    water_supply_types = models.JSONField(default=list, blank=True, help_text="List of WATER_SOURCES values, e.g. ['borehole', 'piped']")
     has_borehole = models.BooleanField(default=False)
     has_piped_water = models.BooleanField(default=False)
     
@@ -151,6 +199,9 @@ class Property(models.Model):
             models.Index(fields=['city', 'status']),
             models.Index(fields=['latitude', 'longitude']),
             models.Index(fields=['created_at', 'status']),
+            models.Index(fields=['road_access_type', 'status']),
+            models.Index(fields=['topography', 'status']),
+            models.Index(fields=['soil_type', 'status']),
         ]
     
     def __str__(self):
@@ -172,9 +223,18 @@ class Property(models.Model):
     @property
     def price_display(self):
         """Formatted price display"""
-        if self.price_per_unit:
-            return f"Ksh {self.price:,.0f} {self.price_per_unit}"
-        return f"Ksh {self.price:,.0f}"
+        return self.format_price(self.price, self.price_per_unit)
+    
+    @staticmethod
+    def format_price(price, price_per_unit=''):
+        if price_per_unit:
+            return f"Ksh {price:,.0f} {price_per_unit}"
+        return f"Ksh {price:,.0f}"
+    
+    @classmethod
+    def touch(cls, property_ids):
+        """Bump updated_at without save() and its signals (see pristineprimer/conditional.py)"""
+        cls.objects.filter(pk__in=property_ids).update(updated_at=timezone.now())
 
 class PropertyMedia(models.Model):
     MEDIA_TYPES = [
@@ -188,11 +248,12 @@ class PropertyMedia(models.Model):
     
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='media')
     media_type = models.CharField(max_length=20, choices=MEDIA_TYPES)
-    file = models.FileField(upload_to='property_media/%Y/%m/%d/')
+    file = models.FileField(upload_to='property_media/%Y/%m/%d/', storage=get_media_storage)
     video_url = models.URLField(blank=True, help_text="For embedded videos (YouTube, TikTok, Instagram)")
     caption = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
     display_order = models.IntegerField(default=0)
+    renditions = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized copies, see properties.renditions")
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -374,10 +435,11 @@ class Favorite(models.Model):
 
 class PropertyImage(models.Model):
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='images')
-    image = models.ImageField(upload_to='property_images/%Y/%m/%d/')
+    image = models.ImageField(upload_to='property_images/%Y/%m/%d/', storage=get_media_storage)
     caption = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
     order = models.IntegerField(default=0)
+    renditions = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized copies, see properties.renditions")
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -386,8 +448,95 @@ class PropertyImage(models.Model):
     def __str__(self):
         return f"Image for {self.property.title}"
 
+class ChunkedUpload(models.Model):
+    """A resumable upload assembled from chunks in a temp file before it is attached to a property"""
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='chunked_uploads')
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    total_size = models.BigIntegerField()
+    received_bytes = models.BigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True, help_text="Expected SHA-256 hex digest of the assembled file")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.filename} ({self.received_bytes}/{self.total_size})"
+    
+    @property
+    def temp_path(self):
+        from .uploads import get_upload_settings
+        return os.path.join(get_upload_settings()['TEMP_DIR'], f"{self.id}.part")
+
+class MediaBlob(models.Model):
+    """A deduplicated file in ContentAddressedStorage and how many rows reference it"""
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+class PropertyChange(models.Model):
+    """Append-only change log; the id is the sequence number for incremental sync"""
+    ACTION_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('status_changed', 'Status Changed'),
+        ('deleted', 'Deleted'),
+    ]
+    
+    id = models.BigAutoField(primary_key=True)
+    # Not a ForeignKey: tombstones must outlive the property
+    property_id = models.IntegerField(db_index=True)
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES)
+    status = models.CharField(max_length=20, blank=True)
+    changed_fields = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        ordering = ['id']
+    
+    def __str__(self):
+        return f"#{self.id} {self.action} property {self.property_id}"
+
+class SimilarProperty(models.Model):
+    """Precomputed nearest neighbours of a published property (see properties/similarity.py)"""
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='similar_links')
+    similar = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='similar_to')
+    rank = models.PositiveSmallIntegerField()
+    distance = models.FloatField()
+    
+    class Meta:
+        ordering = ['property', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['property', 'rank'], name='unique_similar_property_rank'),
+        ]
+    
+    def __str__(self):
+        return f"{self.property_id} ~ {self.similar_id} (#{self.rank})"
+
 # Signal handlers for data integrity
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 
 @receiver(pre_save, sender=PropertyMedia)
@@ -402,12 +551,85 @@ def set_primary_image(sender, instance, **kwargs):
     if instance.is_primary:
         PropertyImage.objects.filter(property=instance.property, is_primary=True).update(is_primary=False)
 
+@receiver(post_save, sender=PropertyMedia)
+@receiver(post_save, sender=PropertyImage)
+def generate_image_renditions(sender, instance, **kwargs):
+    """Queue thumbnail/responsive renditions when an image is uploaded or replaced"""
+    from .renditions import schedule_renditions
+    schedule_renditions(instance)
+
+@receiver(pre_save, sender=Property)
+def capture_property_changes(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Remember stored values so post_save can tell what changed"""
+    if not raw:
+        from .changes import capture_previous
+        capture_previous(instance, update_fields)
+
+@receiver(post_save, sender=Property)
+def log_property_save(sender, instance, created, raw=False, **kwargs):
+    """Append created/updated/status_changed entries to the change log"""
+    if not raw:
+        from .changes import record_save
+        record_save(instance, created)
+
+@receiver(post_delete, sender=Property)
+def log_property_delete(sender, instance, **kwargs):
+    """Leave a tombstone in the change log"""
+    from .changes import record_delete
+    record_delete(instance)
+
+@receiver(post_save, sender=Property)
+def refresh_similar_properties(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Recompute the neighbour lists this listing belongs to"""
+    from .similarity import affects_features, schedule_refresh
+    if not raw and affects_features(update_fields):
+        schedule_refresh([instance.pk])
+
+@receiver(pre_delete, sender=Property)
+def refresh_similar_before_delete(sender, instance, **kwargs):
+    """The cascade drops the rows pointing at this listing; refresh their owners"""
+    from .similarity import schedule_refresh
+    schedule_refresh(SimilarProperty.objects.filter(similar=instance).values_list('property_id', flat=True))
+
+@receiver(post_delete, sender=PropertyMedia)
+@receiver(post_delete, sender=PropertyImage)
+def release_media_blobs(sender, instance, **kwargs):
+    """Drop the deleted row's references to deduplicated blobs once committed"""
+    from .storage import release_names, rendition_names
+    field_file = instance.image if sender is PropertyImage else instance.file
+    names = [field_file.name, *rendition_names(instance.renditions)]
+    transaction.on_commit(lambda: release_names(field_file.storage, names))
+
+@receiver(post_save, sender=PropertyMedia)
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyMedia)
+@receiver(post_delete, sender=PropertyImage)
+def touch_property_for_listing_etags(sender, instance, raw=False, **kwargs):
+    """
+    List ETags are versioned by updated_at, and list payloads show the
+    primary image. (Amenities are written by PropertySerializer, after a
+    save of the listing itself, and by the admin, which touches explicitly.)
+    """
+    if not raw and instance.property_id:
+        Property.touch([instance.property_id])
+
+@receiver(post_save, sender=LegalDocument)
+@receiver(post_delete, sender=LegalDocument)
+@receiver(post_save, sender=Inquiry)
+@receiver(post_delete, sender=Inquiry)
+def invalidate_detail_sub_resources(sender, instance, **kwargs):
+    """Drop the cached documents / inquiry-stats sub-resource of the property"""
+    from .detail import invalidate
+    if instance.property_id:
+        kind = 'documents' if sender is LegalDocument else 'inquiry_stats'
+        transaction.on_commit(lambda: invalidate(kind, [instance.property_id]))
+
 @receiver(post_save, sender=Inquiry)
 def update_property_inquiry_count(sender, instance, created, **kwargs):
     """Update inquiry count on property when new inquiry is created"""
     if created and instance.property:
         instance.property.inquiry_count = instance.property.inquiries.count()
-        instance.property.save()
+        instance.property.save(update_fields=['inquiry_count', 'updated_at'])
 
 # REMOVED: SavedSearch model - it already exists in users app
 # class SavedSearch(models.Model):
@@ -0,0 +1,231 @@
+# properties/renditions.py
+"""
+Responsive image renditions for PropertyImage and PropertyMedia.
+
+Each uploaded image gets resized copies at fixed widths (WebP and JPEG by
+default), saved next to the original as ``<name>__w<width>.<ext>``. The
+generated names are recorded in the row's ``renditions`` JSON field so
+serializers can build a ``srcset`` without touching storage or the DB.
+
+With content-addressed storage (properties.storage) identical uploads share
+a source name, so renditions already generated for that blob are reused
+instead of being decoded and resized again.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .storage import release_names, rendition_names
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'WIDTHS': [320, 640, 1280],
+    'FORMATS': ['webp', 'jpeg'],
+    'QUALITY': 80,
+    'ASYNC': True,
+    'WORKERS': 2,
+}
+
+# PropertyMedia types that are (usually) raster images
+IMAGE_MEDIA_TYPES = ('image', 'aerial', 'site_plan')
+
+FORMAT_EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+_executor = None
+
+
+def get_rendition_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'PROPERTY_IMAGE_RENDITIONS', {})}
+
+
+def get_source_field(instance):
+    """Return the image FieldFile for a PropertyImage/PropertyMedia, or None"""
+    if hasattr(instance, 'image'):
+        return instance.image or None
+    if getattr(instance, 'media_type', None) in IMAGE_MEDIA_TYPES:
+        return instance.file or None
+    return None
+
+
+def needs_renditions(instance):
+    source = get_source_field(instance)
+    return bool(source) and (instance.renditions or {}).get('source') != source.name
+
+
+# === GENERATION ===
+
+def _rendition_name(source_name, width, image_format):
+    root, _ = os.path.splitext(source_name)
+    return f"{root}__w{width}.{FORMAT_EXTENSIONS[image_format]}"
+
+
+def build_renditions(source):
+    """
+    Resize ``source`` (a FieldFile) to each configured width and save the
+    results alongside it. Returns the dict stored in ``renditions``.
+    """
+    config = get_rendition_settings()
+    storage = source.storage
+
+    with source.open('rb'):
+        image = Image.open(source)
+        # Let the JPEG decoder downscale while decoding when it can
+        largest = max(config['WIDTHS'])
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    original_width, original_height = image.size
+    widths = [w for w in sorted(config['WIDTHS']) if w < original_width] or [original_width]
+
+    renditions = {'source': source.name}
+
+    try:
+        for width in widths:
+            height = max(round(original_height * width / original_width), 1)
+            resized = image if width == original_width else image.resize((width, height), Image.LANCZOS)
+
+            for image_format in config['FORMATS']:
+                output = resized
+                if image_format == 'jpeg' and output.mode not in ('RGB', 'L'):
+                    output = output.convert('RGB')
+                elif output.mode not in ('RGB', 'RGBA', 'L'):
+                    output = output.convert('RGBA')
+
+                buffer = BytesIO()
+                output.save(buffer, format=image_format.upper(), quality=config['QUALITY'], optimize=True)
+
+                name = _rendition_name(source.name, width, image_format)
+                if not getattr(storage, 'reference_counted', False) and storage.exists(name):
+                    storage.delete(name)
+                saved_name = storage.save(name, ContentFile(buffer.getvalue()))
+                renditions.setdefault(image_format, {})[str(width)] = saved_name
+    except Exception:
+        # Drop references to blobs saved before the failure
+        release_names(storage, list(rendition_names(renditions)))
+        raise
+
+    return renditions
+
+
+def find_existing_renditions(source_name, exclude=None):
+    """Renditions already generated for the same (deduplicated) source blob"""
+    from .models import PropertyImage, PropertyMedia
+
+    for model, field_name in ((PropertyImage, 'image'), (PropertyMedia, 'file')):
+        queryset = model.objects.filter(**{field_name: source_name}).exclude(renditions={})
+        if exclude is not None and isinstance(exclude, model):
+            queryset = queryset.exclude(pk=exclude.pk)
+        for renditions in queryset.values_list('renditions', flat=True)[:5]:
+            if renditions.get('source') == source_name:
+                return renditions
+    return None
+
+
+def generate_for_instance(instance, force=False):
+    """Generate and persist renditions for one row; returns True if written"""
+    from .models import Property
+
+    source = get_source_field(instance)
+    if not source or (not force and not needs_renditions(instance)):
+        return False
+
+    storage = source.storage
+    reused = None
+    if not force and getattr(storage, 'reference_counted', False):
+        reused = find_existing_renditions(source.name, exclude=instance)
+
+    try:
+        if reused is not None:
+            renditions = reused
+            for name in rendition_names(renditions):
+                storage.retain(name)
+        else:
+            renditions = build_renditions(source)
+    except UnidentifiedImageError:
+        # e.g. a PDF site plan; remember the source so it is not retried
+        renditions = {'source': source.name}
+    except (OSError, ValueError) as e:
+        logger.warning("Could not create renditions for %s: %s", source.name, e)
+        return False
+
+    previous = list(rendition_names(instance.renditions))
+
+    # .update() skips save() signals (and the primary-image toggling)
+    type(instance).objects.filter(pk=instance.pk).update(renditions=renditions)
+    # ... so bump the listing by hand: its list srcset changed (see pristineprimer/conditional.py)
+    Property.touch([instance.property_id])
+    instance.renditions = renditions
+    release_names(storage, previous)
+    return True
+
+
+# === BACKGROUND WORKER ===
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=get_rendition_settings()['WORKERS'],
+            thread_name_prefix='renditions'
+        )
+    return _executor
+
+
+def _run_job(model, pk):
+    try:
+        instance = model.objects.filter(pk=pk).first()
+        if instance is not None:
+            generate_for_instance(instance)
+    except Exception:
+        logger.exception("Rendition job failed for %s %s", model.__name__, pk)
+    finally:
+        close_old_connections()
+
+
+def schedule_renditions(instance):
+    """Queue rendition generation once the current transaction commits"""
+    if not needs_renditions(instance):
+        return
+
+    model, pk = type(instance), instance.pk
+    if get_rendition_settings()['ASYNC']:
+        transaction.on_commit(lambda: _get_executor().submit(_run_job, model, pk))
+    else:
+        transaction.on_commit(lambda: _run_job(model, pk))
+
+
+# === SERIALIZATION HELPERS ===
+
+def build_srcset(renditions, storage):
+    """
+    Map each format to a srcset string, e.g.
+    {'webp': '/media/a__w320.webp 320w, /media/a__w640.webp 640w', ...}
+    """
+    if not renditions:
+        return None
+
+    srcset = {}
+    for image_format in FORMAT_EXTENSIONS:
+        names = renditions.get(image_format)
+        if names:
+            srcset[image_format] = ', '.join(
+                f"{storage.url(name)} {width}w"
+                for width, name in sorted(names.items(), key=lambda item: int(item[0]))
+            )
+    return srcset or None
+
+
+def smallest_rendition_url(renditions, storage, image_format='jpeg'):
+    names = (renditions or {}).get(image_format)
+    if not names:
+        return None
+    width = min(names, key=int)
+    return storage.url(names[width])
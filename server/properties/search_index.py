@@ -0,0 +1,461 @@
+# properties/search_index.py
+"""
+Optional in-process bitmap index over published properties.
+
+Each published property gets a slot (slots are assigned in created_at
+order, so the highest slot is the newest listing). Every low-cardinality
+predicate is stored as a bitset, a Python int with bit ``slot`` set for
+matching properties:
+
+- boolean columns (has_borehole, is_fenced, ...): one bitset each
+- enum columns (land_type, property_type, ...): one bitset per value
+- amenities: one bitset per amenity id
+- price / size_acres: binned bitmaps (quantile buckets); a range is the OR
+  of fully covered buckets plus an exact check of the two edge buckets
+
+Filters are ANDs/ORs of bitsets and counts are ``int.bit_count()``, both
+done in C over machine words. That stands in for NumPy, which this project
+does not depend on. Only the requested page of ids is then hydrated from
+the database.
+
+The index keeps itself current from the PropertyChange log (written by the
+Property signals and by amenity writes): before each query it applies
+entries newer than the last one it has seen, re-reading just those
+properties. Updates go to a copy that replaces the shared index under the
+lock, so a published index is never modified and readers need no lock.
+"""
+import bisect
+import math
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from .changes import get_change_settings
+from .facets import CHOICE_FACETS, price_bands
+from .models import Amenity, Property, PropertyAmenity, PropertyChange
+
+DEFAULT_SETTINGS = {
+    'ENABLED': False,
+    'RANGE_BUCKETS': 64,
+    'REBUILD_RATIO': 0.2,  # full rebuild when a refresh touches more than this share of slots
+}
+
+BOOLEAN_COLUMNS = [
+    'has_borehole', 'has_piped_water', 'is_fenced', 'has_beacons',
+    'has_subdivision_approval', 'is_gated_community', 'featured',
+]
+ENUM_COLUMNS = list(CHOICE_FACETS)
+RANGE_COLUMNS = ['price', 'size_acres']
+
+LOAD_FIELDS = ['id', 'created_at', 'title_deed_status', 'water_supply_types'] + \
+    BOOLEAN_COLUMNS + ENUM_COLUMNS + RANGE_COLUMNS
+
+# Search parameters the index can answer; anything else (free-text search,
+# location) falls back to the ORM
+SUPPORTED_FILTERS = set(BOOLEAN_COLUMNS) | set(ENUM_COLUMNS) | {
+    'min_price', 'max_price', 'min_size', 'max_size', 'amenities',
+    'has_title_deed', 'has_water', 'has_electricity',
+}
+
+RANGE_PARAMS = {'price': ('min_price', 'max_price'), 'size_acres': ('min_size', 'max_size')}
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'PROPERTY_SEARCH_INDEX', {})}
+
+
+def _bits_from_slots(slots, size):
+    """Build a bitset from an iterable of slot numbers via a bytearray"""
+    buffer = bytearray((size + 7) // 8)
+    for slot in slots:
+        buffer[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def iter_slots_desc(bits):
+    """Yield set bit positions from highest to lowest"""
+    while bits:
+        slot = bits.bit_length() - 1
+        yield slot
+        bits ^= 1 << slot
+
+
+class RangeColumn:
+    """Quantile-binned bitmap for a nullable numeric column"""
+
+    def __init__(self, values, size, buckets):
+        present = sorted(value for value in values.values() if value is not None)
+        if present:
+            step = max(len(present) // buckets, 1)
+            self.edges = sorted(set(present[::step]))
+        else:
+            self.edges = [0.0]
+        self.values = dict(values)
+        members = [[] for _ in self.edges]
+        for slot, value in values.items():
+            if value is not None:
+                members[self._bucket(value)].append(slot)
+        self.members = [set(slots) for slots in members]
+        self.bitmaps = [_bits_from_slots(slots, size) for slots in members]
+        # Memoized between() results (price-band facets repeat every query); cleared on writes
+        self._ranges = {}
+
+    def copy(self):
+        column = object.__new__(RangeColumn)
+        column.edges = self.edges
+        column.values = dict(self.values)
+        column.members = [set(slots) for slots in self.members]
+        column.bitmaps = list(self.bitmaps)
+        column._ranges = {}
+        return column
+
+    def _bucket(self, value):
+        return max(bisect.bisect_right(self.edges, value) - 1, 0)
+
+    def set(self, slot, value):
+        self.clear(slot)
+        self._ranges.clear()
+        self.values[slot] = value
+        if value is not None:
+            bucket = self._bucket(value)
+            self.members[bucket].add(slot)
+            self.bitmaps[bucket] |= 1 << slot
+
+    def clear(self, slot):
+        self._ranges.clear()
+        value = self.values.pop(slot, None)
+        if value is not None:
+            bucket = self._bucket(value)
+            self.members[bucket].discard(slot)
+            self.bitmaps[bucket] &= ~(1 << slot)
+
+    def between(self, low=None, high=None):
+        """Bitset of slots with low <= value <= high (None = unbounded)"""
+        low = -math.inf if low is None else float(low)
+        high = math.inf if high is None else float(high)
+        cached = self._ranges.get((low, high))
+        if cached is not None:
+            return cached
+
+        first, last = self._bucket(low), self._bucket(high)
+        bits = 0
+        for bucket in range(first, last + 1):
+            # The outer buckets are open-ended: later updates may fall outside the build-time edges
+            bucket_low = self.edges[bucket] if bucket > 0 else -math.inf
+            bucket_high = self.edges[bucket + 1] if bucket + 1 < len(self.edges) else math.inf
+            if bucket_low >= low and bucket_high <= high:
+                bits |= self.bitmaps[bucket]
+            else:
+                slots = [slot for slot in self.members[bucket] if low <= self.values[slot] <= high]
+                if slots:
+                    bits |= _bits_from_slots(slots, max(slots) + 1)
+
+        if len(self._ranges) >= 256:
+            self._ranges.clear()
+        self._ranges[(low, high)] = bits
+        return bits
+
+
+class PropertyIndex:
+    def __init__(self):
+        self.slot_of = {}
+        self.ids = []
+        self.alive = 0
+        self.booleans = {}
+        self.enums = {}
+        self.amenities = {}
+        self.ranges = {}
+        self.has_water_types = 0
+        self.last_seq = 0
+
+    # === BUILD / REFRESH ===
+
+    def build(self):
+        config = get_index_settings()
+        self.last_seq = PropertyChange.objects.aggregate(last=Max('id'))['last'] or 0
+
+        rows = list(
+            Property.objects.filter(status='published')
+            .order_by('created_at', 'id').values(*LOAD_FIELDS)
+        )
+        self.ids = [row['id'] for row in rows]
+        self.slot_of = {property_id: slot for slot, property_id in enumerate(self.ids)}
+        size = len(rows)
+
+        self.alive = (1 << size) - 1
+        self.booleans = {
+            column: _bits_from_slots((slot for slot, row in enumerate(rows) if row[column]), size)
+            for column in BOOLEAN_COLUMNS
+        }
+        self.enums = {}
+        for column in ENUM_COLUMNS:
+            by_value = {}
+            for slot, row in enumerate(rows):
+                if row[column] is not None:
+                    by_value.setdefault(row[column], []).append(slot)
+            self.enums[column] = {value: _bits_from_slots(slots, size) for value, slots in by_value.items()}
+
+        self.has_water_types = _bits_from_slots(
+            (slot for slot, row in enumerate(rows) if row['water_supply_types']), size
+        )
+
+        by_amenity = {}
+        for property_id, amenity_id in PropertyAmenity.objects.filter(
+            property__status='published'
+        ).values_list('property_id', 'amenity_id'):
+            slot = self.slot_of.get(property_id)
+            if slot is not None:
+                by_amenity.setdefault(amenity_id, []).append(slot)
+        self.amenities = {amenity_id: _bits_from_slots(slots, size) for amenity_id, slots in by_amenity.items()}
+
+        self.ranges = {
+            column: RangeColumn(
+                {slot: (float(row[column]) if row[column] is not None else None) for slot, row in enumerate(rows)},
+                size, config['RANGE_BUCKETS']
+            )
+            for column in RANGE_COLUMNS
+        }
+        return self
+
+    def copy(self):
+        """A copy that _apply/_remove can change while readers use this one"""
+        index = object.__new__(PropertyIndex)
+        index.slot_of = dict(self.slot_of)
+        index.ids = list(self.ids)
+        index.alive = self.alive
+        index.booleans = dict(self.booleans)
+        index.enums = {column: dict(by_value) for column, by_value in self.enums.items()}
+        index.amenities = dict(self.amenities)
+        index.ranges = {column: range_column.copy() for column, range_column in self.ranges.items()}
+        index.has_water_types = self.has_water_types
+        index.last_seq = self.last_seq
+        return index
+
+    def _remove(self, slot):
+        mask = ~(1 << slot)
+        self.alive &= mask
+        self.has_water_types &= mask
+        for column in BOOLEAN_COLUMNS:
+            self.booleans[column] &= mask
+        for by_value in self.enums.values():
+            for value in by_value:
+                by_value[value] &= mask
+        for amenity_id in self.amenities:
+            self.amenities[amenity_id] &= mask
+        for column in self.ranges.values():
+            column.clear(slot)
+
+    def _apply(self, row, amenity_ids):
+        slot = self.slot_of.get(row['id'])
+        if slot is None:
+            slot = len(self.ids)
+            self.ids.append(row['id'])
+            self.slot_of[row['id']] = slot
+        else:
+            self._remove(slot)
+
+        bit = 1 << slot
+        self.alive |= bit
+        if row['water_supply_types']:
+            self.has_water_types |= bit
+        for column in BOOLEAN_COLUMNS:
+            if row[column]:
+                self.booleans[column] |= bit
+        for column in ENUM_COLUMNS:
+            if row[column] is not None:
+                by_value = self.enums[column]
+                by_value[row[column]] = by_value.get(row[column], 0) | bit
+        for amenity_id in amenity_ids:
+            self.amenities[amenity_id] = self.amenities.get(amenity_id, 0) | bit
+        for column, range_column in self.ranges.items():
+            range_column.set(slot, float(row[column]) if row[column] is not None else None)
+
+    def refresh(self):
+        """
+        The index with change-log entries since the last refresh applied:
+        self if there are none, a new index otherwise, None if a rebuild is needed
+        """
+        config = get_change_settings()
+        entries = list(
+            PropertyChange.objects.filter(id__gt=self.last_seq)
+            .values_list('id', 'property_id', 'created_at')
+        )
+        if not entries:
+            return self
+
+        changed = {property_id for _, property_id, _ in entries}
+        if len(changed) > max(len(self.ids), 1) * get_index_settings()['REBUILD_RATIO']:
+            return None
+
+        rows = {
+            row['id']: row
+            for row in Property.objects.filter(id__in=changed, status='published').values(*LOAD_FIELDS)
+        }
+        amenities = {}
+        for property_id, amenity_id in PropertyAmenity.objects.filter(
+            property_id__in=list(rows)
+        ).values_list('property_id', 'amenity_id'):
+            amenities.setdefault(property_id, []).append(amenity_id)
+
+        index = self.copy()
+        for property_id in changed:
+            if property_id in rows:
+                index._apply(rows[property_id], amenities.get(property_id, []))
+            elif property_id in index.slot_of:
+                index._remove(index.slot_of[property_id])
+
+        # Re-read unsettled entries next time in case a lower sequence
+        # number commits late; re-applying a property is idempotent
+        settled = timezone.now() - timedelta(seconds=config['SETTLE_SECONDS'])
+        settled_ids = [seq for seq, _, created_at in entries if created_at <= settled]
+        unsettled_ids = [seq for seq, _, created_at in entries if created_at > settled]
+        if unsettled_ids:
+            index.last_seq = min(unsettled_ids) - 1
+        elif settled_ids:
+            index.last_seq = max(settled_ids)
+        return index
+
+    # === QUERIES ===
+
+    def query(self, filters):
+        """Bitset of published properties matching ``filters`` (search parameters)"""
+        bits = self.alive
+
+        for column in BOOLEAN_COLUMNS:
+            value = filters.get(column)
+            if value is True:
+                bits &= self.booleans[column]
+            elif value is False:
+                bits &= ~self.booleans[column]
+
+        for column in ENUM_COLUMNS:
+            values = filters.get(column)
+            if values:
+                by_value = self.enums[column]
+                matches = 0
+                for value in values:
+                    matches |= by_value.get(value, 0)
+                bits &= matches
+
+        if filters.get('has_title_deed'):
+            deeds = 0
+            for value_bits in self.enums['title_deed_status'].values():
+                deeds |= value_bits
+            bits &= deeds
+        if filters.get('has_water'):
+            bits &= self.booleans['has_borehole'] | self.booleans['has_piped_water'] | self.has_water_types
+        if filters.get('has_electricity'):
+            electricity = self.enums['electricity_availability']
+            bits &= electricity.get('on_site', 0) | electricity.get('nearby', 0)
+
+        if filters.get('amenities'):
+            matches = 0
+            for amenity_id in filters['amenities']:
+                matches |= self.amenities.get(amenity_id, 0)
+            bits &= matches
+
+        for column, (low_param, high_param) in RANGE_PARAMS.items():
+            low, high = filters.get(low_param), filters.get(high_param)
+            if low or high:
+                bits &= self.ranges[column].between(low or None, high or None)
+
+        return bits
+
+    def page_ids(self, bits, offset, limit):
+        """Property ids for one page, newest first"""
+        ids = []
+        for position, slot in enumerate(iter_slots_desc(bits)):
+            if position >= offset + limit:
+                break
+            if position >= offset:
+                ids.append(self.ids[slot])
+        return ids
+
+    def facets(self, bits, amenities):
+        facets = {
+            column: [
+                {'value': value, 'label': str(label), 'count': (bits & self.enums[column].get(value, 0)).bit_count()}
+                for value, label in choices
+            ]
+            for column, choices in CHOICE_FACETS.items()
+        }
+        facets['price_band'] = [
+            {
+                'value': key, 'min': low, 'max': high,
+                'count': (bits & self.ranges['price'].between(
+                    low, None if high is None else math.nextafter(high, -math.inf)
+                )).bit_count(),
+            }
+            for key, low, high in price_bands()
+        ]
+        facets['amenity'] = [
+            {'value': amenity_id, 'label': name, 'count': (bits & self.amenities.get(amenity_id, 0)).bit_count()}
+            for amenity_id, name in amenities
+        ]
+        facets['total'] = bits.bit_count()
+        return facets
+
+
+def get_index():
+    """The process-wide index, built on first use and refreshed from the change log"""
+    global _index
+    with _index_lock:
+        index = _index.refresh() if _index is not None else None
+        _index = index or PropertyIndex().build()
+        return _index
+
+
+def reset_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def is_enabled():
+    return get_index_settings()['ENABLED']
+
+
+def supports(filters):
+    return all(key in SUPPORTED_FILTERS for key, value in filters.items() if value not in (None, '', []))
+
+
+class IndexedResults:
+    """
+    Sequence over index matches for DRF pagination: len() is a popcount and
+    slicing hydrates only that page of ids, newest first.
+    """
+
+    def __init__(self, index, bits, queryset):
+        self.index = index
+        self.bits = bits
+        self.queryset = queryset
+        self._count = bits.bit_count()
+
+    def __len__(self):
+        return self._count
+
+    def count(self):
+        return self._count
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        start = item.start or 0
+        stop = self._count if item.stop is None else item.stop
+        ids = self.index.page_ids(self.bits, start, max(stop - start, 0))
+        # The queryset may be a values() queryset (see properties.fast_serializers)
+        objects = {
+            obj['id'] if isinstance(obj, dict) else obj.pk: obj
+            for obj in self.queryset.filter(pk__in=ids)
+        }
+        return [objects[pk] for pk in ids if pk in objects]
+
+
+def amenity_choices():
+    return list(Amenity.objects.filter(is_active=True).order_by('name').values_list('id', 'name'))
@@ -3,9 +3,100 @@ from rest_framework import serializers
 from .models import (
     Property, PropertyImage, Favorite, Inquiry, 
     PropertyMedia, Amenity, PropertyAmenity, 
-    LegalDocument, PropertyContact
+    LegalDocument, PropertyContact, ChunkedUpload
 )
+from .renditions import build_srcset, smallest_rendition_url
+from .similarity import similar_properties
+from . import categories, changes, detail
 from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import Count, Q
+
+CATEGORY_CHOICES = {
+    'road_access_type': Property.ROAD_ACCESS_TYPES,
+    'topography': Property.TOPOGRAPHY_TYPES,
+    'soil_type': Property.SOIL_TYPES,
+    'water_supply_types': Property.WATER_SOURCES,
+}
+
+class CategoryChoiceField(serializers.ChoiceField):
+    """ChoiceField that maps free-text synonyms ('Tarmac road') onto the canonical value"""
+
+    def __init__(self, category, **kwargs):
+        self.category = category
+        super().__init__(CATEGORY_CHOICES[category], **kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) and data.strip():
+            data = categories.normalize(self.category, data, self.choices.items()) or data
+        return super().to_internal_value(data)
+
+class SparseFieldsMixin:
+    """
+    ``?fields=`` support for list-style serializers.
+    
+    ``context['fields']`` (a set of field names, None for all) trims the
+    output, and ``columns()`` names the model fields those serializer fields
+    read, for QuerySet.only(). ``?fields=`` takes field names and/or
+    FIELD_PRESETS names, comma separated.
+    """
+    # Named field sets, e.g. ?fields=card
+    FIELD_PRESETS = {}
+    # Model fields read by serializer fields whose source isn't a model field
+    FIELD_COLUMNS = {}
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        if fields is not None:
+            for name in list(self.fields):
+                if name not in fields:
+                    self.fields.pop(name)
+    
+    @classmethod
+    def _field_sources(cls):
+        # Built once per class: instantiating a ModelSerializer's fields is not free
+        if '_sources' not in cls.__dict__:
+            cls._sources = {name: field.source for name, field in cls().fields.items() if not field.write_only}
+        return cls._sources
+    
+    @classmethod
+    def parse_fields(cls, query_params):
+        """Field names requested with ?fields=, or None for all"""
+        value = query_params.get('fields')
+        if not value:
+            return None
+        names = set()
+        for name in (part.strip() for part in value.split(',')):
+            if name:
+                names.update(cls.FIELD_PRESETS.get(name, [name]))
+        unknown = names - set(cls._field_sources())
+        if unknown:
+            raise serializers.ValidationError({
+                'fields': f"Unknown field(s): {', '.join(sorted(unknown))}. "
+                          f"Presets: {', '.join(cls.FIELD_PRESETS) or 'none'}"
+            })
+        return names
+    
+    @classmethod
+    def columns(cls, names=None):
+        """Model fields to load for ``names`` (None = every field), or None if that can't be told"""
+        model_meta = cls.Meta.model._meta
+        sources = cls._field_sources()
+        columns = {model_meta.pk.name}
+        for name in (sources if names is None else names):
+            if name in cls.FIELD_COLUMNS:
+                columns.update(cls.FIELD_COLUMNS[name])
+                continue
+            try:
+                model_field = model_meta.get_field(sources[name].split('.')[0])
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete:
+                return None
+            columns.add(model_field.name)
+        return sorted(columns)
 
 class AmenitySerializer(serializers.ModelSerializer):
     class Meta:
@@ -27,11 +118,12 @@ class PropertyAmenitySerializer(serializers.ModelSerializer):
 class PropertyMediaSerializer(serializers.ModelSerializer):
     file_url = serializers.SerializerMethodField()
     thumbnail_url = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = PropertyMedia
         fields = [
-            'id', 'media_type', 'file', 'file_url', 'thumbnail_url', 
+            'id', 'media_type', 'file', 'file_url', 'thumbnail_url', 'srcset',
             'video_url', 'caption', 'is_primary', 'display_order', 'created_at'
         ]
         read_only_fields = ['created_at']
@@ -42,10 +134,14 @@ class PropertyMediaSerializer(serializers.ModelSerializer):
         return None
     
     def get_thumbnail_url(self, obj):
-        # For images, you might want to generate thumbnails
-        # This is a placeholder for thumbnail logic
+        # Smallest rendition, falling back to the original until renditions exist
         if obj.file and obj.media_type == 'image':
-            return obj.file.url
+            return smallest_rendition_url(obj.renditions, obj.file.storage) or obj.file.url
+        return None
+    
+    def get_srcset(self, obj):
+        if obj.file:
+            return build_srcset(obj.renditions, obj.file.storage)
         return None
 
 class LegalDocumentSerializer(serializers.ModelSerializer):
@@ -81,21 +177,34 @@ class PropertyContactSerializer(serializers.ModelSerializer):
 
 class PropertyImageSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = PropertyImage
-        fields = ['id', 'image', 'image_url', 'caption', 'is_primary', 'order']
+        fields = ['id', 'image', 'image_url', 'thumbnail_url', 'srcset', 'caption', 'is_primary', 'order']
     
     def get_image_url(self, obj):
         if obj.image:
             return obj.image.url
         return None
+    
+    def get_thumbnail_url(self, obj):
+        if obj.image:
+            return smallest_rendition_url(obj.renditions, obj.image.storage) or obj.image.url
+        return None
+    
+    def get_srcset(self, obj):
+        if obj.image:
+            return build_srcset(obj.renditions, obj.image.storage)
+        return None
 
-class PropertyListSerializer(serializers.ModelSerializer):
+class PropertyListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     primary_image = serializers.SerializerMethodField()
+    primary_image_srcset = serializers.SerializerMethodField()
     seller_name = serializers.CharField(source='seller.get_full_name', read_only=True)
     amenities_preview = serializers.SerializerMethodField()
-    price_display = serializers.CharField(source='get_price_display', read_only=True)
+    price_display = serializers.CharField(read_only=True)
     location_display = serializers.SerializerMethodField()
     #is_favorited = serializers.SerializerMethodField()
     
@@ -112,10 +221,43 @@ class PropertyListSerializer(serializers.ModelSerializer):
             'road_access_type', 'distance_to_main_road',
             'water_supply_types', 'has_borehole', 'has_piped_water',
             'electricity_availability', 'has_sewer_system', 'has_drainage', 'internet_availability',
-            'primary_image', 'seller_name', 'amenities_preview', 
+            'latitude', 'longitude',
+            'primary_image', 'primary_image_srcset', 'seller_name', 'amenities_preview', 
             'created_at', 'featured', 'views_count', #'is_favorited'
         ]
     
+    FIELD_PRESETS = {
+        # Search result / listing card
+        'card': [
+            'id', 'title', 'property_type', 'land_type', 'price', 'price_display', 'price_unit',
+            'is_negotiable', 'size_acres', 'location_display', 'title_deed_status',
+            'primary_image', 'primary_image_srcset', 'featured', 'created_at',
+        ],
+        # Map pins and their popups
+        'map': [
+            'id', 'title', 'property_type', 'land_type', 'price', 'price_display', 'size_acres',
+            'latitude', 'longitude', 'location_display', 'primary_image',
+        ],
+        # Side-by-side comparison table
+        'compare': [
+            'id', 'title', 'property_type', 'land_type', 'status', 'price', 'price_display', 'price_unit',
+            'is_negotiable', 'deposit_percentage', 'size_acres', 'plot_dimensions', 'num_plots_available',
+            'city', 'state', 'topography', 'soil_type', 'zoning', 'title_deed_status',
+            'has_subdivision_approval', 'has_beacons', 'is_fenced', 'is_gated_community',
+            'road_access_type', 'distance_to_main_road', 'water_supply_types', 'has_borehole',
+            'has_piped_water', 'electricity_availability', 'has_sewer_system', 'has_drainage',
+            'internet_availability', 'primary_image',
+        ],
+    }
+    FIELD_COLUMNS = {
+        'price_display': ['price', 'price_per_unit'],
+        'location_display': ['city', 'state'],
+        # Looked up through the media / images / amenities relations
+        'primary_image': [],
+        'primary_image_srcset': [],
+        'amenities_preview': [],
+    }
+    
     #def get_is_favorited(self, obj):
         #"""Check if the current user has favorited this property"""
        # request = self.context.get('request')
@@ -123,28 +265,39 @@ class PropertyListSerializer(serializers.ModelSerializer):
         #    return obj.favorites.filter(user=request.user).exists()
         #return False
     
+    def _get_primary_file(self, obj):
+        """Return (file, renditions) for the card image, looked up once per property"""
+        if not hasattr(obj, '_primary_file'):
+            obj._primary_file = (None, None)
+            # First try PropertyMedia, then fall back to PropertyImage for backward compatibility
+            primary_media = obj.media.filter(is_primary=True, media_type='image').first()
+            if primary_media:
+                obj._primary_file = (primary_media.file, primary_media.renditions)
+            else:
+                primary_image = obj.images.filter(is_primary=True).first()
+                if primary_image:
+                    obj._primary_file = (primary_image.image, primary_image.renditions)
+        return obj._primary_file
+    
     def get_primary_image(self, obj):
-        # First try PropertyMedia, then fall back to PropertyImage for backward compatibility
-        primary_media = obj.media.filter(is_primary=True, media_type='image').first()
-        if primary_media:
-            return primary_media.file.url
-        
-        primary_image = obj.images.filter(is_primary=True).first()
-        if primary_image:
-            return primary_image.image.url
-        return None
+        primary_file, _ = self._get_primary_file(obj)
+        return primary_file.url if primary_file else None
+    
+    def get_primary_image_srcset(self, obj):
+        primary_file, renditions = self._get_primary_file(obj)
+        return build_srcset(renditions, primary_file.storage) if primary_file else None
     
     def get_amenities_preview(self, obj):
         """Return first 3 amenities for card preview"""
-        amenities = obj.amenities.select_related('amenity')[:3]
+        amenities = obj.amenities.select_related('amenity').order_by('id')[:3]
         return PropertyAmenitySerializer(amenities, many=True).data
     
     def get_location_display(self, obj):
         return f"{obj.city}, {obj.state}"
 
-class PropertyMapSerializer(serializers.ModelSerializer):
+class PropertyMapSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for map view - optimized for performance"""
-    price_display = serializers.CharField(source='get_price_display', read_only=True)
+    price_display = serializers.CharField(read_only=True)
     
     class Meta:
         model = Property
@@ -153,6 +306,8 @@ class PropertyMapSerializer(serializers.ModelSerializer):
             'latitude', 'longitude', 'city', 'state', 'property_type',
             'has_borehole', 'has_piped_water', 'electricity_availability', 'road_access_type'
         ]
+    
+    FIELD_COLUMNS = {'price_display': ['price', 'price_per_unit']}
 
 class PropertySerializer(serializers.ModelSerializer):
     images = PropertyImageSerializer(many=True, read_only=True)
@@ -165,10 +320,16 @@ class PropertySerializer(serializers.ModelSerializer):
     agent_name = serializers.CharField(source='agent.get_full_name', read_only=True)
     
     # Computed fields
-    price_display = serializers.CharField(source='get_price_display', read_only=True)
+    price_display = serializers.CharField(read_only=True)
     landmarks_list = serializers.ListField(source='get_landmarks_list', read_only=True)
     water_supply_types = serializers.ListField(source='get_water_supply_types', read_only=True)
     is_land_property = serializers.BooleanField(read_only=True)
+    is_favorited = serializers.SerializerMethodField()
+    
+    # Categorical land fields accept synonyms and store the canonical value
+    road_access_type = CategoryChoiceField('road_access_type', required=False, allow_blank=True)
+    topography = CategoryChoiceField('topography', required=False, allow_blank=True)
+    soil_type = CategoryChoiceField('soil_type', required=False, allow_blank=True)
     
     # Write-only fields for creation/updates
     amenity_ids = serializers.ListField(
@@ -227,6 +388,29 @@ class PropertySerializer(serializers.ModelSerializer):
             'views_count', 'inquiry_count'
         ]
     
+    def get_is_favorited(self, obj):
+        """Check if the current user has favorited this property"""
+        request = self.context.get('request')
+        if request and request.user.is_authenticated:
+            return obj.favorited_by.filter(user=request.user).exists()
+        return False
+    
+    def validate_amenity_ids(self, value):
+        """Normalize amenity_id to int and reject duplicates/unknown availability"""
+        availability_values = {choice for choice, _ in PropertyAmenity.AVAILABILITY_CHOICES}
+        seen = set()
+        for item in value:
+            try:
+                item['amenity_id'] = int(item['amenity_id'])
+            except (KeyError, TypeError, ValueError):
+                raise serializers.ValidationError("Each amenity needs a numeric 'amenity_id'")
+            if item['amenity_id'] in seen:
+                raise serializers.ValidationError(f"Amenity {item['amenity_id']} is listed more than once")
+            if item.get('availability', 'on_site') not in availability_values:
+                raise serializers.ValidationError(f"Invalid availability: {item['availability']}")
+            seen.add(item['amenity_id'])
+        return value
+    
     def create(self, validated_data):
         amenity_data = validated_data.pop('amenity_ids', [])
         
@@ -234,40 +418,72 @@ class PropertySerializer(serializers.ModelSerializer):
         property_instance = Property.objects.create(**validated_data)
         
         # Create amenities
-        self._create_or_update_amenities(property_instance, amenity_data)
+        self._create_or_update_amenities(property_instance, amenity_data, created=True)
         
         return property_instance
     
     def update(self, instance, validated_data):
-        amenity_data = validated_data.pop('amenity_ids', [])
+        amenity_data = validated_data.pop('amenity_ids', None)
         
         # Update property instance
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
         
-        # Update amenities if provided
+        # Update amenities if provided (an empty list removes them all)
         if amenity_data is not None:
             self._create_or_update_amenities(instance, amenity_data)
         
         return instance
     
-    def _create_or_update_amenities(self, property_instance, amenity_data):
-        """Helper method to handle amenity creation/updates"""
-        if amenity_data:
-            # Clear existing amenities and create new ones
-            PropertyAmenity.objects.filter(property=property_instance).delete()
-            
-            for amenity_item in amenity_data:
-                PropertyAmenity.objects.create(
+    def _create_or_update_amenities(self, property_instance, amenity_data, created=False):
+        """
+        Sync the property's amenities with ``amenity_data`` as a set diff:
+        one bulk INSERT for additions, one bulk UPDATE for changed
+        availability/details and one DELETE for removals.
+        """
+        desired = {
+            item['amenity_id']: (item.get('availability', 'on_site'), item.get('details', ''))
+            for item in amenity_data
+        }
+        existing = {} if created else {
+            row.amenity_id: row
+            for row in PropertyAmenity.objects.filter(property=property_instance)
+        }
+        
+        to_create, to_update = [], []
+        for amenity_id, (availability, details) in desired.items():
+            row = existing.get(amenity_id)
+            if row is None:
+                to_create.append(PropertyAmenity(
                     property=property_instance,
-                    amenity_id=amenity_item['amenity_id'],
-                    availability=amenity_item.get('availability', 'on_site'),
-                    details=amenity_item.get('details', '')
-                )
+                    amenity_id=amenity_id,
+                    availability=availability,
+                    details=details
+                ))
+            elif (row.availability, row.details) != (availability, details):
+                row.availability, row.details = availability, details
+                to_update.append(row)
+        to_delete = [row.pk for amenity_id, row in existing.items() if amenity_id not in desired]
+        
+        with transaction.atomic():
+            if to_create:
+                PropertyAmenity.objects.bulk_create(to_create)
+            if to_update:
+                PropertyAmenity.objects.bulk_update(to_update, ['availability', 'details'])
+            if to_delete:
+                PropertyAmenity.objects.filter(pk__in=to_delete).delete()
+        if not created and (to_create or to_update or to_delete):
+            # A new listing's 'created' entry covers its amenities
+            changes.record_amenities_changed([property_instance.pk])
 
 class PropertyDetailSerializer(PropertySerializer):
-    """Extended serializer for detailed property view with optimized queries"""
+    """
+    Extended serializer for detailed property view with optimized queries.
+    
+    Pass ``context['include']`` (a set of detail.SECTIONS names) to drop the
+    heavy sections not listed; None keeps them all.
+    """
     
     # Additional computed fields for detail view
     similar_properties = serializers.SerializerMethodField()
@@ -277,27 +493,49 @@ class PropertyDetailSerializer(PropertySerializer):
         model = Property
         fields = '__all__'
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        include = self.context.get('include')
+        if include is not None:
+            for name in detail.SECTIONS:
+                if name not in include:
+                    self.fields.pop(name, None)
+    
     def get_similar_properties(self, obj):
-        """Get similar properties based on location and type"""
-        similar = Property.objects.filter(
-            city=obj.city,
-            property_type=obj.property_type,
-            status='published'
-        ).exclude(id=obj.id)[:4]
-        
-        return PropertyListSerializer(similar, many=True).data
+        """Precomputed nearest listings (see properties/similarity.py)"""
+        return similar_properties_data(obj)[:detail.DETAIL_SIMILAR]
     
     def get_inquiry_stats(self, obj):
         """Get inquiry statistics for the property"""
-        inquiries = obj.inquiries.all()
-        return {
-            'total_inquiries': inquiries.count(),
-            'new_inquiries': inquiries.filter(status='new').count(),
-            'scheduled_tours': inquiries.filter(status='scheduled').count()
-        }
+        return inquiry_stats_data(obj)
+
+# Sub-resources, cached per property (see properties/detail.py)
+
+def similar_properties_data(property_obj):
+    return detail.cached('similar', property_obj.pk, lambda: list(
+        PropertyListSerializer(similar_properties(property_obj, limit=detail.SIMILAR_LIMIT), many=True).data
+    ))
+
+def documents_data(property_obj):
+    return detail.cached('documents', property_obj.pk, lambda: list(
+        LegalDocumentSerializer(property_obj.documents.all(), many=True).data
+    ))
+
+def inquiry_stats_data(property_obj):
+    return detail.cached('inquiry_stats', property_obj.pk, lambda: property_obj.inquiries.aggregate(
+        total_inquiries=Count('id'),
+        new_inquiries=Count('id', filter=Q(status='new')),
+        scheduled_tours=Count('id', filter=Q(status='scheduled')),
+    ))
 
 class PropertyCreateSerializer(serializers.ModelSerializer):
     """Serializer specifically for property creation with validation"""
+    road_access_type = CategoryChoiceField('road_access_type', required=False, allow_blank=True)
+    topography = CategoryChoiceField('topography', required=False, allow_blank=True)
+    soil_type = CategoryChoiceField('soil_type', required=False, allow_blank=True)
+    water_supply_types = serializers.ListField(
+        child=CategoryChoiceField('water_supply_types'), required=False
+    )
     
     class Meta:
         model = Property
@@ -330,6 +568,9 @@ class PropertyCreateSerializer(serializers.ModelSerializer):
             'featured'
         ]
     
+    def validate_water_supply_types(self, value):
+        return list(dict.fromkeys(value))
+    
     def validate(self, data):
         """Custom validation for property data"""
         if data.get('property_type') == 'land' and not data.get('land_type'):
@@ -355,7 +596,7 @@ class FavoriteSerializer(serializers.ModelSerializer):
     property_city = serializers.CharField(source='property.city', read_only=True)
     property_type = serializers.CharField(source='property.property_type', read_only=True)
     property_image = serializers.SerializerMethodField()
-    price_display = serializers.CharField(source='property.get_price_display', read_only=True)
+    price_display = serializers.CharField(source='property.price_display', read_only=True)
     
     class Meta:
         model = Favorite
@@ -467,6 +708,19 @@ class PropertySearchSerializer(serializers.Serializer):
     has_title_deed = serializers.BooleanField(required=False)
     has_water = serializers.BooleanField(required=False)
     has_electricity = serializers.BooleanField(required=False)
+    title_deed_status = serializers.ListField(child=serializers.CharField(), required=False)
+    electricity_availability = serializers.ListField(child=serializers.CharField(), required=False)
+    road_access_type = serializers.ListField(child=CategoryChoiceField('road_access_type'), required=False)
+    topography = serializers.ListField(child=CategoryChoiceField('topography'), required=False)
+    soil_type = serializers.ListField(child=CategoryChoiceField('soil_type'), required=False)
+    
+    # Tri-state: omitted means "don't filter" rather than False
+    has_borehole = serializers.BooleanField(required=False, allow_null=True)
+    has_piped_water = serializers.BooleanField(required=False, allow_null=True)
+    is_fenced = serializers.BooleanField(required=False, allow_null=True)
+    has_beacons = serializers.BooleanField(required=False, allow_null=True)
+    has_subdivision_approval = serializers.BooleanField(required=False, allow_null=True)
+    is_gated_community = serializers.BooleanField(required=False, allow_null=True)
     
     def validate(self, data):
         """Validate search parameters"""
@@ -492,4 +746,31 @@ class PropertyStatsSerializer(serializers.Serializer):
     total_views = serializers.IntegerField()
     total_inquiries = serializers.IntegerField()
     average_price = serializers.DecimalField(max_digits=12, decimal_places=2)
-    price_range = serializers.DictField()
\ No newline at end of file
+    price_range = serializers.DictField()
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    """Serializer for starting and inspecting resumable uploads"""
+    offset = serializers.IntegerField(source='received_bytes', read_only=True)
+    
+    class Meta:
+        model = ChunkedUpload
+        fields = [
+            'id', 'filename', 'content_type', 'total_size', 'sha256',
+            'offset', 'status', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'status', 'created_at', 'updated_at']
+    
+    def validate_sha256(self, value):
+        if value and (len(value) != 64 or any(c not in '0123456789abcdefABCDEF' for c in value)):
+            raise serializers.ValidationError("Must be a SHA-256 hex digest")
+        return value
+
+
+class UploadAttachmentSerializer(serializers.Serializer):
+    """One completed upload to attach to a property"""
+    upload_id = serializers.UUIDField()
+    kind = serializers.ChoiceField(choices=['image', 'media'], default='media')
+    media_type = serializers.ChoiceField(choices=PropertyMedia.MEDIA_TYPES, default='image')
+    caption = serializers.CharField(max_length=200, required=False, allow_blank=True, default='')
+    is_primary = serializers.BooleanField(default=False)
+    order = serializers.IntegerField(required=False)
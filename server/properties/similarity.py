@@ -0,0 +1,281 @@
+# properties/similarity.py
+"""
+Precomputed "similar properties" for the detail page.
+
+Each published property is reduced to a small feature vector:
+
+- property_type (a hard partition: only listings of the same type are compared)
+- land_type
+- price and size on a log scale, so 1M vs 2M is as far apart as 10M vs 20M
+- latitude/longitude, projected to kilometres
+- a bitmask of utilities (water, electricity, paved road, fence, ...)
+
+The distance between two listings is a weighted sum of the per-feature
+differences (weights in PROPERTY_SIMILARITY). The NEIGHBORS closest
+listings are stored as SimilarProperty rows, so serving "similar" is a
+single indexed join ordered by rank instead of a query per detail view.
+
+Neighbours are kept current incrementally: when listings change, their own
+lists are recomputed, and so are the lists of listings that pointed at
+them or that the changed listing now beats. A full rebuild
+(``build_similar_properties``) is only needed after bulk loads that bypass
+signals. Recomputed lists drop their cached "similar" sub-resource (see
+properties/detail.py). The distance loop is plain Python over tuples; this
+project does not depend on NumPy.
+"""
+import heapq
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Max
+
+from .detail import invalidate
+from .models import Property, SimilarProperty
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'NEIGHBORS': 8,
+    'WEIGHTS': {
+        'land_type': 1.0,
+        'price': 2.0,  # per factor of 10 in price
+        'size': 1.0,  # per factor of 10 in size
+        'location': 1.0,  # per LOCATION_KM
+        'utilities': 1.0,  # all utility flags differing
+    },
+    'LOCATION_KM': 25,
+    'MISSING_PENALTY': 0.5,  # feature distance when either side lacks the value
+    'REBUILD_RATIO': 0.2,  # full rebuild when a refresh touches more than this share of listings
+    'ASYNC': True,
+}
+
+# Fields the feature vector reads; saves touching none of them are ignored
+FEATURE_FIELDS = [
+    'id', 'status', 'property_type', 'land_type', 'price', 'size_acres', 'square_feet',
+    'latitude', 'longitude', 'has_borehole', 'has_piped_water', 'water_supply_types',
+    'electricity_availability', 'road_access_type', 'is_fenced', 'is_gated_community',
+    'has_beacons', 'title_deed_status',
+]
+
+UTILITY_FLAGS = [
+    lambda row: row['has_borehole'] or 'borehole' in (row['water_supply_types'] or []),
+    lambda row: row['has_piped_water'] or 'piped' in (row['water_supply_types'] or []),
+    lambda row: row['electricity_availability'] in ('on_site', 'nearby'),
+    lambda row: row['road_access_type'] in ('tarmac', 'cabro'),
+    lambda row: row['is_fenced'],
+    lambda row: row['is_gated_community'],
+    lambda row: row['has_beacons'],
+    lambda row: bool(row['title_deed_status']),
+]
+
+SQUARE_FEET_PER_ACRE = 43560
+KM_PER_DEGREE_LAT = 110.57
+KM_PER_DEGREE_LON = 111.32
+
+_executor = None
+
+
+def get_similarity_settings():
+    config = {**DEFAULT_SETTINGS, **getattr(settings, 'PROPERTY_SIMILARITY', {})}
+    config['WEIGHTS'] = {**DEFAULT_SETTINGS['WEIGHTS'], **config['WEIGHTS']}
+    return config
+
+
+# === FEATURES ===
+
+def _log10(value):
+    return math.log10(float(value)) if value and value > 0 else None
+
+
+def features(row):
+    """(land_type, log price, log size, x km, y km, utility bits) for a values() row"""
+    size = row['size_acres']
+    if size is None and row['square_feet']:
+        size = row['square_feet'] / SQUARE_FEET_PER_ACRE
+
+    x = y = None
+    if row['latitude'] is not None and row['longitude'] is not None:
+        lat, lon = float(row['latitude']), float(row['longitude'])
+        x = lon * KM_PER_DEGREE_LON * math.cos(math.radians(lat))
+        y = lat * KM_PER_DEGREE_LAT
+
+    bits = 0
+    for position, flag in enumerate(UTILITY_FLAGS):
+        if flag(row):
+            bits |= 1 << position
+
+    return (row['land_type'], _log10(row['price']), _log10(size), x, y, bits)
+
+
+def _distance_function(config):
+    weights = config['WEIGHTS']
+    w_land, w_price, w_size = weights['land_type'], weights['price'], weights['size']
+    w_location = weights['location'] / config['LOCATION_KM']
+    w_utility = weights['utilities'] / len(UTILITY_FLAGS)
+    missing = config['MISSING_PENALTY']
+
+    def distance(a, b):
+        total = w_land if a[0] != b[0] else 0.0
+        total += w_price * (abs(a[1] - b[1]) if a[1] is not None and b[1] is not None else missing)
+        total += w_size * (abs(a[2] - b[2]) if a[2] is not None and b[2] is not None else missing)
+        if a[3] is not None and b[3] is not None:
+            total += w_location * math.hypot(a[3] - b[3], a[4] - b[4])
+        else:
+            total += weights['location'] * missing
+        return total + w_utility * (a[5] ^ b[5]).bit_count()
+
+    return distance
+
+
+class FeatureSet:
+    """Feature vectors of published listings, grouped by property_type (all types, or only ``property_types``)"""
+
+    def __init__(self, property_types=None):
+        self.config = get_similarity_settings()
+        self.distance = _distance_function(self.config)
+        self.groups = {}
+        self.group_of = {}
+        queryset = Property.objects.filter(status='published')
+        if property_types is not None:
+            queryset = queryset.filter(property_type__in=property_types)
+        for row in queryset.values(*FEATURE_FIELDS).iterator(chunk_size=2000):
+            self.groups.setdefault(row['property_type'], {})[row['id']] = features(row)
+            self.group_of[row['id']] = row['property_type']
+
+    def __len__(self):
+        return len(self.group_of)
+
+    def neighbors(self, property_id):
+        """[(distance, id)] of the closest listings, nearest first"""
+        group = self.groups[self.group_of[property_id]]
+        vector, distance = group[property_id], self.distance
+        return heapq.nsmallest(
+            self.config['NEIGHBORS'],
+            ((distance(vector, other), other_id) for other_id, other in group.items() if other_id != property_id),
+        )
+
+
+# === STORAGE ===
+
+def _rows(property_id, neighbors):
+    return [
+        SimilarProperty(property_id=property_id, similar_id=similar_id, rank=rank, distance=round(distance, 6))
+        for rank, (distance, similar_id) in enumerate(neighbors)
+    ]
+
+
+def _compute(feature_set, property_ids):
+    rows = []
+    for property_id in property_ids:
+        rows.extend(_rows(property_id, feature_set.neighbors(property_id)))
+    return rows
+
+
+def rebuild():
+    """Recompute every published listing's neighbours; returns (listings, rows)"""
+    feature_set = FeatureSet()
+    rows = _compute(feature_set, feature_set.group_of)
+    with transaction.atomic():
+        previous = set(SimilarProperty.objects.values_list('property_id', flat=True).distinct())
+        SimilarProperty.objects.all().delete()
+        SimilarProperty.objects.bulk_create(rows, batch_size=2000)
+    invalidate('similar', previous | set(feature_set.group_of))
+    return len(feature_set), len(rows)
+
+
+def refresh(property_ids):
+    """Update the neighbour lists affected by changes to ``property_ids``; returns listings recomputed"""
+    changed = set(property_ids)
+    if not changed:
+        return 0
+    config = get_similarity_settings()
+    if len(changed) > max(Property.objects.filter(status='published').count(), 1) * config['REBUILD_RATIO']:
+        return rebuild()[0]
+
+    # Lists that contain a changed listing: it may have moved away or been unpublished
+    pointing = set(SimilarProperty.objects.filter(similar_id__in=changed).values_list('property_id', flat=True))
+
+    # Only the property_type groups those listings are in can be affected
+    property_types = set(
+        Property.objects.filter(id__in=changed | pointing).values_list('property_type', flat=True).distinct()
+    )
+    feature_set = FeatureSet(property_types)
+    published = {property_id for property_id in changed if property_id in feature_set.group_of}
+    recompute = published | pointing
+
+    # Lists the changed listings may now belong to: closer than the current last neighbour
+    limit = config['NEIGHBORS']
+    farthest = {
+        row['property_id']: (row['farthest'], row['count'])
+        for row in SimilarProperty.objects.filter(property__property_type__in=property_types)
+        .values('property_id').annotate(farthest=Max('distance'), count=Count('id'))
+    }
+    for property_id in published:
+        group = feature_set.groups[feature_set.group_of[property_id]]
+        vector = group[property_id]
+        for other_id, other in group.items():
+            if other_id == property_id or other_id in recompute:
+                continue
+            worst, count = farthest.get(other_id, (None, 0))
+            if count < limit or feature_set.distance(vector, other) < worst:
+                recompute.add(other_id)
+
+    recompute &= set(feature_set.group_of)
+    rows = _compute(feature_set, recompute)
+    with transaction.atomic():
+        SimilarProperty.objects.filter(property_id__in=recompute | changed).delete()
+        SimilarProperty.objects.bulk_create(rows, batch_size=2000)
+    invalidate('similar', recompute | changed)
+    return len(recompute)
+
+
+def _run_refresh(property_ids):
+    try:
+        refresh(property_ids)
+    except Exception:
+        logger.exception("Similar-property refresh failed for %s", property_ids)
+    finally:
+        close_old_connections()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # One worker, so refreshes never race each other's writes
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='similarity')
+    return _executor
+
+
+def schedule_refresh(property_ids):
+    """Refresh neighbours for ``property_ids`` once the current transaction commits"""
+    property_ids = list(property_ids)
+    if not property_ids:
+        return
+    if get_similarity_settings()['ASYNC']:
+        transaction.on_commit(lambda: _get_executor().submit(_run_refresh, property_ids))
+    else:
+        transaction.on_commit(lambda: _run_refresh(property_ids))
+
+
+def affects_features(update_fields):
+    return update_fields is None or bool(set(update_fields) & set(FEATURE_FIELDS))
+
+
+# === READING ===
+
+def similar_properties(property_obj, limit):
+    """Published neighbours of ``property_obj``, nearest first"""
+    queryset = Property.objects.filter(status='published').select_related('seller')
+    similar = list(
+        queryset.filter(similar_to__property=property_obj).order_by('similar_to__rank')[:limit]
+    )
+    if similar or SimilarProperty.objects.exists():
+        return similar
+    # Neighbours have never been built: fall back to same city and type
+    return list(
+        queryset.filter(city=property_obj.city, property_type=property_obj.property_type)
+        .exclude(id=property_obj.id)[:limit]
+    )
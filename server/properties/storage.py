@@ -0,0 +1,227 @@
+# properties/storage.py
+"""
+Content-addressed, reference-counted storage for property media.
+
+Uploads are hashed (SHA-256) while they are streamed to disk and stored once
+under ``<PREFIX>/ab/cd/<sha256><ext>``. Uploading the same photo again, for
+another listing in the same development, just adds a reference to the
+existing blob. Resized renditions go through the same storage, so identical
+derivatives are deduplicated too.
+
+``MediaBlob`` rows keep a reference count per blob: ``save()`` adds a
+reference, ``delete()`` drops one and removes the file when none are left.
+The ``collect_media_blobs`` command recomputes counts from the database and
+removes orphaned blobs.
+"""
+import hashlib
+import os
+import tempfile
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'PREFIX': 'blobs',
+    'GC_GRACE_HOURS': 24,
+}
+
+
+def get_blob_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'MEDIA_BLOB_STORAGE', {})}
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    reference_counted = True
+
+    def __init__(self, *args, prefix=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prefix = prefix or get_blob_settings()['PREFIX']
+
+    def is_blob(self, name):
+        return bool(name) and name.startswith(self.prefix + '/')
+
+    def blob_name(self, digest, original_name):
+        ext = os.path.splitext(original_name)[1].lower()
+        return f"{self.prefix}/{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is derived from the content hash in _save()
+        return name
+
+    def _save(self, name, content):
+        from .models import MediaBlob
+
+        if hasattr(content, 'temporary_file_path'):
+            # Already on disk (large upload / assembled chunks): hash in place
+            temp_path, owns_temp = content.temporary_file_path(), False
+            digest = hashlib.sha256()
+            with open(temp_path, 'rb') as source:
+                for block in iter(lambda: source.read(1024 * 1024), b''):
+                    digest.update(block)
+            size = os.path.getsize(temp_path)
+        else:
+            # Hash while streaming the upload into a temp file next to the blobs
+            temp_dir = self.path(os.path.join(self.prefix, 'tmp'))
+            os.makedirs(temp_dir, exist_ok=True)
+            digest, size = hashlib.sha256(), 0
+            with tempfile.NamedTemporaryFile(dir=temp_dir, delete=False) as temp_file:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+                    size += len(chunk)
+            temp_path, owns_temp = temp_file.name, True
+
+        hexdigest = digest.hexdigest()
+        name = self.blob_name(hexdigest, name)
+        full_path = self.path(name)
+
+        try:
+            # Under the row lock, so delete() can't remove the file between the
+            # exists() check and the reference being counted
+            with transaction.atomic():
+                blob, created = MediaBlob.objects.select_for_update().get_or_create(
+                    name=name,
+                    defaults={'sha256': hexdigest, 'size': size, 'ref_count': 1}
+                )
+                if not created:
+                    MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+                if not os.path.exists(full_path):
+                    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                    if owns_temp:
+                        os.replace(temp_path, full_path)
+                    else:
+                        file_move_safe(temp_path, full_path)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(full_path, self.file_permissions_mode)
+        finally:
+            if owns_temp and os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name
+
+    def retain(self, name):
+        """Add a reference to an existing blob (e.g. reused renditions)"""
+        from .models import MediaBlob
+
+        if self.is_blob(name):
+            MediaBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+    def delete(self, name):
+        """Drop one reference; the file is removed when no references remain"""
+        from .models import MediaBlob
+
+        if not self.is_blob(name):
+            return super().delete(name)
+
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is None:
+                return
+            if blob.ref_count > 1:
+                MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+                return
+            blob.delete()
+            # Still holding the lock: a concurrent save() of the same content
+            # waits, then finds no row and writes the file again
+            super().delete(name)
+
+
+def get_media_storage():
+    """Storage for PropertyImage.image and PropertyMedia.file"""
+    if get_blob_settings()['ENABLED']:
+        return ContentAddressedStorage()
+    return default_storage
+
+
+def release_names(storage, names):
+    """Drop references held by deleted/replaced rows (no-op for plain storage)"""
+    if not getattr(storage, 'reference_counted', False):
+        return
+    for name in names:
+        if name:
+            storage.delete(name)
+
+
+def rendition_names(renditions):
+    for key, names in (renditions or {}).items():
+        if isinstance(names, dict):
+            yield from names.values()
+
+
+# === GARBAGE COLLECTION ===
+
+def count_references():
+    """Count how many rows reference each blob name (files and renditions)"""
+    from .models import PropertyImage, PropertyMedia
+
+    counts = Counter()
+    for model, field_name in ((PropertyImage, 'image'), (PropertyMedia, 'file')):
+        rows = model.objects.values_list(field_name, 'renditions').iterator(chunk_size=2000)
+        for name, renditions in rows:
+            if name:
+                counts[name] += 1
+            counts.update(rendition_names(renditions))
+    return counts
+
+
+def collect_garbage(storage=None, grace_hours=None, dry_run=False):
+    """
+    Reconcile MediaBlob.ref_count with the database and delete orphaned blobs.
+
+    Blobs younger than GC_GRACE_HOURS are left alone so an upload whose row
+    has not been committed yet is never collected. Returns a dict of counts.
+    """
+    from .models import MediaBlob
+
+    storage = storage or get_media_storage()
+    if not getattr(storage, 'reference_counted', False):
+        return {'recounted': 0, 'deleted': 0, 'untracked_deleted': 0, 'bytes_freed': 0}
+
+    if grace_hours is None:
+        grace_hours = get_blob_settings()['GC_GRACE_HOURS']
+    cutoff = timezone.now() - timedelta(hours=grace_hours)
+    counts = count_references()
+    stats = {'recounted': 0, 'deleted': 0, 'untracked_deleted': 0, 'bytes_freed': 0}
+
+    known = set()
+    for blob in MediaBlob.objects.iterator(chunk_size=2000):
+        known.add(blob.name)
+        references = counts.get(blob.name, 0)
+        if references == 0 and blob.created_at < cutoff:
+            if not dry_run:
+                with transaction.atomic():
+                    # Skip blobs that gained a reference since they were counted
+                    if not MediaBlob.objects.select_for_update().filter(pk=blob.pk, ref_count=blob.ref_count).exists():
+                        continue
+                    MediaBlob.objects.filter(pk=blob.pk).delete()
+                    FileSystemStorage.delete(storage, blob.name)
+            stats['deleted'] += 1
+            stats['bytes_freed'] += blob.size
+        elif references != blob.ref_count:
+            stats['recounted'] += 1
+            if not dry_run:
+                MediaBlob.objects.filter(pk=blob.pk).update(ref_count=references)
+
+    # Files on disk with no MediaBlob row (e.g. interrupted saves)
+    root = storage.path(storage.prefix)
+    cutoff_ts = cutoff.timestamp()
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            full_path = os.path.join(directory, filename)
+            name = os.path.relpath(full_path, storage.location).replace(os.sep, '/')
+            if name in known or counts.get(name) or os.path.getmtime(full_path) >= cutoff_ts:
+                continue
+            stats['untracked_deleted'] += 1
+            stats['bytes_freed'] += os.path.getsize(full_path)
+            if not dry_run:
+                os.remove(full_path)
+
+    return stats
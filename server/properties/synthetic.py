@@ -0,0 +1,244 @@
+# properties/synthetic.py
+"""
+Reproducible synthetic dataset for benchmarks.
+
+``generate()`` creates users (buyers, sellers, agents), properties with a
+realistic land / residential / commercial mix around Kenyan towns, media and
+image rows, amenities, contacts, inquiries, favorites and user activity,
+all with bulk_create. The same seed always produces the same data. Every
+synthetic user's username starts with SYNTHETIC_PREFIX, so ``flush()`` can
+remove the whole dataset through the seller cascade.
+
+Media rows only carry file names; no files are written.
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import UserActivity, UserProfile
+
+from .changes import record_bulk_created
+from .models import (
+    Amenity, Favorite, Inquiry, Property, PropertyAmenity, PropertyContact,
+    PropertyImage, PropertyMedia,
+)
+
+SYNTHETIC_PREFIX = 'synthetic_'
+SYNTHETIC_PASSWORD = 'synthetic-password'
+
+# (city, county, latitude, longitude)
+TOWNS = [
+    ('Nairobi', 'Nairobi', -1.286, 36.817), ('Kitengela', 'Kajiado', -1.473, 36.962),
+    ('Kiambu', 'Kiambu', -1.171, 36.835), ('Ruiru', 'Kiambu', -1.146, 36.961),
+    ('Machakos', 'Machakos', -1.517, 37.263), ('Nakuru', 'Nakuru', -0.303, 36.080),
+    ('Naivasha', 'Nakuru', -0.717, 36.431), ('Mombasa', 'Mombasa', -4.043, 39.668),
+    ('Kilifi', 'Kilifi', -3.631, 39.849), ('Eldoret', 'Uasin Gishu', 0.514, 35.270),
+    ('Kisumu', 'Kisumu', -0.092, 34.768), ('Nyeri', 'Nyeri', -0.420, 36.947),
+    ('Nanyuki', 'Laikipia', 0.006, 37.074), ('Thika', 'Kiambu', -1.033, 37.069),
+]
+
+PROPERTY_TYPE_WEIGHTS = [('land', 55), ('apartment', 15), ('sale', 12), ('rental', 10), ('commercial', 8)]
+LAND_TYPE_WEIGHTS = [('residential', 45), ('agricultural', 30), ('commercial', 10), ('mixed_use', 10), ('industrial', 5)]
+STATUS_WEIGHTS = [('published', 85), ('draft', 6), ('pending', 5), ('sold', 4)]
+
+AMENITIES = [
+    ('Borehole', 'utilities'), ('Piped water', 'utilities'), ('Electricity', 'utilities'),
+    ('Tarmac road', 'accessibility'), ('Murram road', 'accessibility'), ('Public transport', 'accessibility'),
+    ('School nearby', 'surroundings'), ('Hospital nearby', 'surroundings'), ('Shopping centre', 'surroundings'),
+    ('Fertile soil', 'characteristics'), ('River frontage', 'characteristics'),
+    ('Perimeter wall', 'security'), ('24/7 security', 'security'), ('Gated community', 'community'),
+]
+
+
+def _weighted(rng, weights):
+    values, counts = zip(*weights)
+    return rng.choices(values, counts)[0]
+
+
+def _choice_values(choices):
+    return [value for value, _ in choices]
+
+
+def flush():
+    """Delete all synthetic users and, by cascade, their properties and activity"""
+    User = get_user_model()
+    return User.objects.filter(username__startswith=SYNTHETIC_PREFIX).delete()[0]
+
+
+def _ensure_amenities():
+    existing = {name for name in Amenity.objects.values_list('name', flat=True)}
+    Amenity.objects.bulk_create([
+        Amenity(name=name, category=category)
+        for name, category in AMENITIES if name not in existing
+    ])
+    return list(Amenity.objects.filter(is_active=True).values_list('id', flat=True))
+
+
+def _users(rng, count):
+    User = get_user_model()
+    password = make_password(SYNTHETIC_PASSWORD)
+    users = []
+    for index in range(count):
+        # Roughly one seller/agent per ten users
+        user_type = 'buyer' if index % 10 else rng.choice(['seller', 'agent'])
+        users.append(User(
+            username=f'{SYNTHETIC_PREFIX}{user_type}_{index}',
+            email=f'{SYNTHETIC_PREFIX}{index}@example.com',
+            first_name=f'User{index}',
+            user_type=user_type,
+            password=password,
+        ))
+    users = User.objects.bulk_create(users)
+    # bulk_create skips the post_save signal that creates profiles
+    UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+    return users
+
+
+def _property(rng, seller, agent, now):
+    property_type = _weighted(rng, PROPERTY_TYPE_WEIGHTS)
+    city, state, lat, lng = rng.choice(TOWNS)
+    is_land = property_type == 'land'
+    size_acres = Decimal(rng.choice(['0.05', '0.1', '0.125', '0.25', '0.5', '1', '2', '5', '10', '50'])) if is_land else None
+    if is_land:
+        price = Decimal(rng.randint(300, 12000)) * 1000 * max(size_acres, Decimal('0.1'))
+    elif property_type == 'rental':
+        price = Decimal(rng.randint(15, 250)) * 1000
+    else:
+        price = Decimal(rng.randint(3, 60)) * 1000000
+    has_borehole = rng.random() < 0.3
+    has_piped_water = rng.random() < 0.5
+
+    return Property(
+        title=f'{size_acres} acre plot in {city}' if is_land else f'{property_type.title()} in {city}',
+        short_description=f'Listing in {city}, {state}',
+        description=f'Synthetic {property_type} listing in {city}. ' * rng.randint(3, 12),
+        property_type=property_type,
+        land_type=_weighted(rng, LAND_TYPE_WEIGHTS) if is_land else None,
+        status=_weighted(rng, STATUS_WEIGHTS),
+        address=f'{rng.randint(1, 999)} {city} Road',
+        city=city,
+        state=state,
+        zip_code=f'{rng.randint(100, 999)}00',
+        latitude=Decimal(str(round(lat + rng.uniform(-0.15, 0.15), 6))),
+        longitude=Decimal(str(round(lng + rng.uniform(-0.15, 0.15), 6))),
+        landmarks=', '.join(rng.sample(['Market', 'Church', 'School', 'Highway', 'Stage'], 2)),
+        price=price.quantize(Decimal('1.00')),
+        price_unit='per_month' if property_type == 'rental' else 'total',
+        is_negotiable=rng.random() < 0.4,
+        size_acres=size_acres,
+        num_plots_available=rng.randint(1, 20) if is_land else 1,
+        total_plots=20 if is_land else 1,
+        topography=rng.choice(_choice_values(Property.TOPOGRAPHY_TYPES)) if is_land else '',
+        soil_type=rng.choice(_choice_values(Property.SOIL_TYPES)) if is_land else '',
+        title_deed_status=rng.choice(_choice_values(Property.TITLE_DEED_TYPES) + [None]),
+        has_subdivision_approval=rng.random() < 0.3,
+        has_beacons=is_land and rng.random() < 0.6,
+        is_fenced=rng.random() < 0.4,
+        is_gated_community=rng.random() < 0.15,
+        road_access_type=rng.choice(_choice_values(Property.ROAD_ACCESS_TYPES)),
+        distance_to_main_road=Decimal(str(round(rng.uniform(0, 15), 2))),
+        water_supply_types=(['borehole'] if has_borehole else []) + (['piped'] if has_piped_water else []),
+        has_borehole=has_borehole,
+        has_piped_water=has_piped_water,
+        electricity_availability=rng.choice(['on_site', 'nearby', 'planned', 'none']),
+        bedrooms=None if is_land else rng.randint(1, 5),
+        bathrooms=None if is_land else Decimal(rng.randint(1, 4)),
+        square_feet=None if is_land else rng.randint(400, 4000),
+        featured=rng.random() < 0.05,
+        views_count=rng.randint(0, 2000),
+        seller=seller,
+        agent=agent,
+        published_at=now - timedelta(days=rng.randint(0, 365)),
+    )
+
+
+@transaction.atomic
+def generate(properties=1000, users=200, seed=1, batch_size=1000):
+    """Create the dataset; returns a dict of row counts"""
+    rng = random.Random(seed)
+    now = timezone.now()
+    amenity_ids = _ensure_amenities()
+    all_users = _users(rng, max(users, 10))
+    sellers = [user for user in all_users if user.user_type in ('seller', 'agent')]
+    agents = [user for user in sellers if user.user_type == 'agent'] or sellers
+    buyers = [user for user in all_users if user.user_type == 'buyer']
+
+    counts = {'users': len(all_users), 'properties': 0, 'media': 0, 'images': 0, 'amenities': 0,
+              'contacts': 0, 'inquiries': 0, 'favorites': 0, 'activities': 0}
+    published_ids = []
+
+    for start in range(0, properties, batch_size):
+        created = Property.objects.bulk_create([
+            _property(rng, rng.choice(sellers), rng.choice(agents + [None]), now)
+            for _ in range(min(batch_size, properties - start))
+        ])
+        record_bulk_created(created)
+        counts['properties'] += len(created)
+
+        media, images, amenities, contacts, inquiries = [], [], [], [], []
+        for property_obj in created:
+            if property_obj.status == 'published':
+                published_ids.append(property_obj.pk)
+            for order in range(rng.randint(1, 4)):
+                media.append(PropertyMedia(
+                    property=property_obj, media_type='image', is_primary=order == 0, display_order=order,
+                    file=f'synthetic/property_{property_obj.pk}_{order}.jpg',
+                ))
+            for order in range(rng.randint(0, 3)):
+                images.append(PropertyImage(
+                    property=property_obj, is_primary=order == 0, order=order,
+                    image=f'synthetic/image_{property_obj.pk}_{order}.jpg',
+                ))
+            for amenity_id in rng.sample(amenity_ids, rng.randint(0, min(6, len(amenity_ids)))):
+                amenities.append(PropertyAmenity(
+                    property=property_obj, amenity_id=amenity_id,
+                    availability=rng.choice(_choice_values(PropertyAmenity.AVAILABILITY_CHOICES)),
+                ))
+            if rng.random() < 0.5:
+                contacts.append(PropertyContact(
+                    property=property_obj, agent_name='Synthetic Agent',
+                    agent_phone=f'+2547{rng.randint(10000000, 99999999)}',
+                ))
+            for _ in range(rng.choice([0, 0, 0, 1, 1, 2, 3])):
+                buyer = rng.choice(buyers)
+                inquiries.append(Inquiry(
+                    user=buyer, property=property_obj, name=buyer.first_name, email=buyer.email,
+                    phone='+254700000000', message='Is this still available?',
+                    inquiry_type=rng.choice(_choice_values(Inquiry.INQUIRY_TYPES)),
+                ))
+
+        PropertyMedia.objects.bulk_create(media)
+        PropertyImage.objects.bulk_create(images)
+        PropertyAmenity.objects.bulk_create(amenities)
+        PropertyContact.objects.bulk_create(contacts)
+        Inquiry.objects.bulk_create(inquiries)
+        counts['media'] += len(media)
+        counts['images'] += len(images)
+        counts['amenities'] += len(amenities)
+        counts['contacts'] += len(contacts)
+        counts['inquiries'] += len(inquiries)
+
+    favorites, activities = [], []
+    for buyer in buyers:
+        if not published_ids:
+            break
+        for property_id in rng.sample(published_ids, min(len(published_ids), rng.randint(0, 8))):
+            favorites.append(Favorite(user=buyer, property_id=property_id))
+        for _ in range(rng.randint(0, 25)):
+            activity_type = rng.choice(_choice_values(UserActivity.ACTIVITY_TYPES))
+            activities.append(UserActivity(
+                user=buyer,
+                activity_type=activity_type,
+                property_id=rng.choice(published_ids) if activity_type != 'search' else None,
+                search_query={'city': rng.choice(TOWNS)[0]} if activity_type == 'search' else None,
+            ))
+    Favorite.objects.bulk_create(favorites, batch_size=batch_size)
+    UserActivity.objects.bulk_create(activities, batch_size=batch_size)
+    counts['favorites'] = len(favorites)
+    counts['activities'] = len(activities)
+    return counts
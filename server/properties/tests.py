@@ -1,3 +1,545 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import admin
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, router
+from django.http import HttpResponse, QueryDict
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import ResolverMatch
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import force_authenticate
+
+from pristineprimer.routers import ReplicaRoutingMiddleware, replica_reads
+
+from . import changes, detail, fast_serializers, search_index, uploads
+from .admin import PropertyAdmin
+from .imports import import_properties, iter_rows
+from .models import (
+    Amenity, Favorite, MediaBlob, Property, PropertyAmenity, PropertyChange, PropertyImage, PropertyMedia,
+)
+from .serializers import (
+    FavoriteSerializer, PropertyListSerializer, PropertyMapSerializer, PropertySerializer,
+)
+from .storage import collect_garbage
+from .views import AdminPropertyViewSet, PropertyViewSet, map_data_async
+
+
+def create_listings(seller, amenities, count=12):
+    """A small spread of listings over the search/serializer fields; the last one is a draft"""
+    started = timezone.now() - timedelta(days=1)
+    listings = []
+    for i in range(count):
+        property_obj = Property.objects.create(
+            title=f'Plot {i}', description='d', property_type=['land', 'land', 'commercial'][i % 3],
+            land_type=['residential', 'agricultural', 'commercial', 'industrial'][i % 4],
+            address='a', city=['Nairobi', 'Nakuru'][i % 2], state='Kenya', zip_code='00100',
+            status='draft' if i == count - 1 else 'published',
+            price=Decimal(1000000 * (i + 1)), price_per_unit='per plot' if i % 2 else '',
+            size_acres=Decimal(i) / 2 if i % 5 else None,
+            title_deed_status=['freehold', 'leasehold', None][i % 3],
+            electricity_availability=['on_site', 'nearby', 'planned', 'none'][i % 4],
+            has_borehole=i % 2 == 0, has_piped_water=i % 3 == 0, water_supply_types=['well'] if i % 4 == 1 else [],
+            is_fenced=i % 3 == 1, featured=i % 4 == 0, seller=seller,
+            latitude=Decimal('-1.28') + i, longitude=Decimal('36.82'),
+        )
+        # Distinct, known creation order: the index and the ORM both sort newest first
+        Property.objects.filter(pk=property_obj.pk).update(created_at=started + timedelta(minutes=i))
+        PropertyAmenity.objects.create(property=property_obj, amenity=amenities[i % 3])
+        if i % 2:
+            PropertyAmenity.objects.create(property=property_obj, amenity=amenities[(i + 1) % 3])
+        listings.append(property_obj)
+    return listings
+
+
+class AmenityDiffTests(TestCase):
+    """PropertySerializer writes amenities as a set diff with a fixed number of queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = get_user_model().objects.create_user('seller', 'seller@example.com', 'pw', user_type='seller')
+        cls.amenities = [
+            Amenity.objects.create(name=f'Amenity {i}', category='utilities')
+            for i in range(30)
+        ]
+
+    def setUp(self):
+        self.property = Property.objects.create(
+            title='Plot', description='d', property_type='land', land_type='residential',
+            address='a', city='Nairobi', state='Nairobi', zip_code='00100',
+            price=Decimal('1000000'), seller=self.seller,
+        )
+
+    def sync(self, amenity_data):
+        serializer = PropertySerializer(self.property, data={'amenity_ids': amenity_data}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+    def current(self):
+        return dict(
+            PropertyAmenity.objects.filter(property=self.property)
+            .values_list('amenity_id', 'availability')
+        )
+
+    def count_sync_queries(self, initial, amenity_data):
+        PropertyAmenity.objects.filter(property=self.property).delete()
+        PropertyAmenity.objects.bulk_create([
+            PropertyAmenity(property=self.property, amenity=amenity) for amenity in initial
+        ])
+        with CaptureQueriesContext(connection) as queries:
+            self.sync(amenity_data)
+        return len(queries)
+
+    def test_diff_applies_additions_changes_and_removals(self):
+        first, second, third = self.amenities[:3]
+        self.sync([
+            {'amenity_id': first.id},
+            {'amenity_id': second.id, 'availability': 'nearby'},
+        ])
+        untouched_pk = PropertyAmenity.objects.get(property=self.property, amenity=first).pk
+
+        self.sync([
+            {'amenity_id': first.id},
+            {'amenity_id': third.id, 'availability': 'planned', 'details': '2027'},
+        ])
+
+        self.assertEqual(self.current(), {first.id: 'on_site', third.id: 'planned'})
+        # Unchanged rows are kept, not deleted and recreated
+        self.assertEqual(PropertyAmenity.objects.get(property=self.property, amenity=first).pk, untouched_pk)
+
+    def test_query_count_is_constant(self):
+        def diff(size):
+            initial = self.amenities[:size]
+            data = (
+                [{'amenity_id': a.id, 'availability': 'nearby'} for a in initial[:size // 2]] +
+                [{'amenity_id': a.id} for a in self.amenities[size:size * 2]]
+            )
+            return self.count_sync_queries(initial, data)
+
+        self.assertEqual(diff(2), diff(14))
+
+    def test_mixed_diff_query_budget(self):
+        initial = self.amenities[:6]
+        data = (
+            [{'amenity_id': a.id} for a in initial[:2]] +
+            [{'amenity_id': a.id, 'details': 'changed'} for a in initial[2:4]] +
+            [{'amenity_id': a.id} for a in self.amenities[10:15]]
+        )
+        # change-log SELECT, property UPDATE, SELECT amenities, SAVEPOINT, INSERT, UPDATE, DELETE, RELEASE
+        self.assertEqual(self.count_sync_queries(initial, data), 8)
+        self.assertEqual(len(self.current()), 9)
+
+    def test_unchanged_amenities_issue_no_writes(self):
+        initial = self.amenities[:5]
+        data = [{'amenity_id': a.id} for a in initial]
+        # change-log SELECT, property UPDATE, SELECT amenities, SAVEPOINT, RELEASE
+        self.assertEqual(self.count_sync_queries(initial, data), 5)
+
+    def test_omitted_amenity_ids_leave_amenities_alone(self):
+        self.sync([{'amenity_id': self.amenities[0].id}])
+        serializer = PropertySerializer(self.property, data={'title': 'Renamed'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.assertEqual(len(self.current()), 1)
+
+    def test_empty_list_removes_all_amenities(self):
+        self.sync([{'amenity_id': self.amenities[0].id}])
+        self.sync([])
+        self.assertEqual(self.current(), {})
+
+    def test_duplicate_amenity_is_rejected(self):
+        amenity_id = self.amenities[0].id
+        serializer = PropertySerializer(
+            self.property,
+            data={'amenity_ids': [{'amenity_id': amenity_id}, {'amenity_id': str(amenity_id)}]},
+            partial=True,
+        )
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('amenity_ids', serializer.errors)
+
+    @override_settings(PROPERTY_CHANGE_FEED={'SETTLE_SECONDS': 0})
+    def test_amenity_change_reaches_change_feed(self):
+        Property.objects.filter(pk=self.property.pk).update(status='published')
+        self.property.refresh_from_db()
+        since = PropertyChange.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sync([{'amenity_id': self.amenities[0].id}])
+
+        [change] = changes.get_changes(since)['changes']
+        self.assertEqual(change['action'], 'update')
+        self.assertEqual(change['data']['amenities'], [{'name': 'Amenity 0', 'availability': 'on_site'}])
+
+        PropertyChange.objects.create(property_id=self.property.pk, action='created')
+        [upsert] = changes.get_changes(since)['changes']
+        self.assertEqual(upsert['action'], 'upsert')
+        self.assertEqual(upsert['data']['amenities'], change['data']['amenities'])
+
+
+@override_settings(DATABASE_REPLICA={'ALIAS': 'replica', 'PIN_COOKIE': 'db_pin', 'PIN_SECONDS': 15})
+class ReplicaRoutingTests(SimpleTestCase):
+    """Safe requests to marked views read from the replica until the client writes"""
+
+    def setUp(self):
+        # Only the alias has to exist: the views below never query
+        patcher = mock.patch.dict(settings.DATABASES, {'replica': settings.DATABASES['default']})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.factory = RequestFactory()
+
+    def route(self, request, view):
+        def get_response(request):
+            request.resolver_match = ResolverMatch(view, (), {})
+            return view(request)
+        return ReplicaRoutingMiddleware(get_response)(request)
+
+    @staticmethod
+    @replica_reads
+    def marked_view(request):
+        return HttpResponse(Property.objects.all().db)
+
+    @staticmethod
+    def unmarked_view(request):
+        return HttpResponse(Property.objects.all().db)
+
+    @staticmethod
+    @replica_reads
+    def write_then_read_view(request):
+        router.db_for_write(Property)
+        return HttpResponse(Property.objects.all().db)
+
+    def test_safe_read_of_marked_view_uses_replica(self):
+        response = self.route(self.factory.get('/'), self.marked_view)
+        self.assertEqual(response.content, b'replica')
+        self.assertNotIn('db_pin', response.cookies)
+
+    def test_unmarked_view_and_unsafe_method_use_primary(self):
+        self.assertEqual(self.route(self.factory.get('/'), self.unmarked_view).content, b'default')
+        self.assertEqual(self.route(self.factory.post('/'), self.marked_view).content, b'default')
+
+    def test_write_pins_the_client_to_primary(self):
+        response = self.route(self.factory.get('/'), self.write_then_read_view)
+        self.assertEqual(response.content, b'default')
+        self.assertEqual(response.cookies['db_pin']['max-age'], 15)
+
+        request = self.factory.get('/')
+        request.COOKIES['db_pin'] = '1'
+        self.assertEqual(self.route(request, self.marked_view).content, b'default')
+
+    def test_writes_and_unlisted_apps_never_use_replica(self):
+        def view(request):
+            replica_instance = Property(pk=1)
+            replica_instance._state.db = 'replica'
+            return HttpResponse(' '.join([
+                get_user_model().objects.all().db,
+                router.db_for_write(Property, instance=replica_instance),
+            ]))
+        self.assertEqual(self.route(self.factory.get('/'), replica_reads(view)).content, b'default default')
+
+    def test_public_views_are_marked(self):
+        view = PropertyViewSet.as_view({'get': 'list'})
+        self.assertTrue(view.cls.replica_reads)
+
+
+class AsyncMapDataTests(TestCase):
+    """map_data_async answers exactly like PropertyViewSet.map_data"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seller = get_user_model().objects.create_user('seller', 'seller@example.com', 'pw', user_type='seller')
+        for i in range(3):
+            Property.objects.create(
+                title=f'Plot {i}', description='d', property_type='land', land_type='residential',
+                address='a', city='Nairobi', state='Nairobi', zip_code='00100', status='published',
+                price=Decimal('1000000'), seller=seller,
+                latitude=Decimal('-1.28') + i, longitude=Decimal('36.82'),
+            )
+
+    async def test_same_body_and_etag_as_sync_view(self):
+        factory = AsyncRequestFactory()
+        sync_view = sync_to_async(PropertyViewSet.as_view({'get': 'map_data'}))
+        expected = await sync_view(factory.get('/api/properties/map_data/'))
+        expected.render()
+
+        response = await map_data_async(factory.get('/api/properties/map_data/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response['ETag'], expected['ETag'])
+
+        response = await map_data_async(factory.get('/api/properties/map_data/', headers={'If-None-Match': expected['ETag']}))
+        self.assertEqual(response.status_code, 304)
+
+        response = await map_data_async(factory.get('/api/properties/map_data/?fields=bogus'))
+        self.assertEqual(response.status_code, 400)
+
+
+class ListETagTests(TestCase):
+    """Writes that skip a full save() still change the list ETag"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = get_user_model().objects.create_user('staff', 'staff@example.com', 'pw', is_staff=True)
+        cls.property = Property.objects.create(
+            title='Plot', description='d', property_type='land', land_type='residential',
+            address='a', city='Nairobi', state='Nairobi', zip_code='00100', status='published',
+            price=Decimal('1000000'), seller=cls.staff, latitude=Decimal('-1.28'), longitude=Decimal('36.82'),
+        )
+
+    def etag(self):
+        response = PropertyViewSet.as_view({'get': 'map_data'})(RequestFactory().get('/api/properties/map_data/'))
+        return response['ETag']
+
+    def test_approve_changes_etag(self):
+        before = self.etag()
+        request = RequestFactory().post(f'/api/admin/properties/{self.property.pk}/approve/')
+        force_authenticate(request, user=self.staff)
+        response = AdminPropertyViewSet.as_view({'post': 'approve'})(request, pk=self.property.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(self.etag(), before)
+
+    def test_attaching_images_changes_etag(self):
+        before = self.etag()
+        image = SimpleUploadedFile('plot.gif', b'GIF89a\x01\x00\x01\x00\x00\x00\x00;', content_type='image/gif')
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            uploads.bulk_attach(self.property, images=[{'file': image, 'is_primary': True}])
+        self.assertNotEqual(self.etag(), before)
+
+    def test_admin_bulk_action_changes_etag(self):
+        before = self.etag()
+        request = RequestFactory().post('/admin/')
+        with mock.patch.object(PropertyAdmin, 'message_user'):
+            PropertyAdmin(Property, admin.site).make_featured(request, Property.objects.filter(pk=self.property.pk))
+        self.assertNotEqual(self.etag(), before)
+
+
+class ContentAddressedStorageTests(TestCase):
+    """Shared blobs are reference counted; only unreferenced ones leave the disk"""
+
+    GIF = b'GIF89a\x01\x00\x01\x00\x00\x00\x00;'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = get_user_model().objects.create_user('blobs', 'blobs@example.com', 'pw', user_type='seller')
+        cls.property = Property.objects.create(
+            title='Plot', description='d', property_type='land', land_type='residential',
+            address='a', city='Nairobi', state='Nairobi', zip_code='00100',
+            price=Decimal('1000000'), seller=cls.seller,
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=directory.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.storage = PropertyImage._meta.get_field('image').storage
+
+    def add_image(self, content=GIF, name='plot.gif'):
+        return PropertyImage.objects.create(
+            property=self.property, image=SimpleUploadedFile(name, content, content_type='image/gif')
+        )
+
+    def delete(self, row):
+        with self.captureOnCommitCallbacks(execute=True):
+            row.delete()
+
+    def test_shared_blob_outlives_first_delete(self):
+        first, second = self.add_image(), self.add_image(name='copy.gif')
+        name = first.image.name
+        self.assertEqual(second.image.name, name)
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 2)
+
+        self.delete(first)
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 1)
+
+        self.delete(second)
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+
+    def test_legacy_name_is_deleted_directly(self):
+        name = 'property_images/2024/01/01/old.gif'
+        os.makedirs(os.path.dirname(self.storage.path(name)))
+        with open(self.storage.path(name), 'wb') as legacy_file:
+            legacy_file.write(self.GIF)
+        row = PropertyImage.objects.create(property=self.property, image=name)
+
+        self.delete(row)
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_garbage_collection_respects_grace_period(self):
+        kept = self.add_image()
+        orphan = self.add_image(self.GIF + b'orphan')
+        fresh = self.add_image(self.GIF + b'fresh')
+        names = {row.pk: row.image.name for row in (kept, orphan, fresh)}
+        # Rows gone without releasing their blobs, as after a crash
+        PropertyImage.objects.filter(pk__in=[orphan.pk, fresh.pk]).delete()
+        MediaBlob.objects.filter(name=names[orphan.pk]).update(created_at=timezone.now() - timedelta(hours=48))
+        MediaBlob.objects.filter(name=names[kept.pk]).update(ref_count=5)
+
+        stats = collect_garbage(self.storage, grace_hours=24)
+        # The fresh orphan is recounted to 0 but keeps its file until the grace period ends
+        self.assertEqual((stats['deleted'], stats['recounted']), (1, 2))
+        self.assertFalse(self.storage.exists(names[orphan.pk]))
+        self.assertTrue(self.storage.exists(names[fresh.pk]))
+        self.assertEqual(MediaBlob.objects.get(name=names[kept.pk]).ref_count, 1)
+
+        stats = collect_garbage(self.storage, grace_hours=0)
+        self.assertEqual(stats['deleted'], 1)
+        self.assertFalse(self.storage.exists(names[fresh.pk]))
+        self.assertTrue(self.storage.exists(names[kept.pk]))
+
+
+class SearchIndexParityTests(TestCase):
+    """The bitmap index answers every supported search exactly as the ORM does"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seller = get_user_model().objects.create_user('parity', 'parity@example.com', 'pw', user_type='seller')
+        cls.amenities = [Amenity.objects.create(name=f'Amenity {i}', category='utilities') for i in range(3)]
+        create_listings(seller, cls.amenities)
+
+    def setUp(self):
+        cache.clear()
+        search_index.reset_index()
+        self.addCleanup(search_index.reset_index)
+
+    def get(self, action, query):
+        view = PropertyViewSet.as_view({'get': action})
+        response = view(RequestFactory().get(f'/api/properties/search/?page_size=100&{query}'))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_index_matches_orm(self):
+        first, second = (amenity.id for amenity in self.amenities[:2])
+        queries = [
+            '',
+            'land_type=agricultural',
+            'property_type=land&property_type=commercial',
+            'featured=true',
+            'min_price=2000000&max_price=6000000',
+            'min_size=1&max_size=4',
+            f'amenities={first}&amenities={second}',
+            'has_title_deed=true',
+            'has_water=true',
+            'has_electricity=true',
+            'title_deed_status=freehold&electricity_availability=nearby&electricity_availability=on_site',
+            'has_borehole=false&is_fenced=true',
+            f'land_type=residential&min_price=1500000&amenities={first}&has_water=true',
+        ]
+        for query in queries:
+            with self.subTest(query=query):
+                with override_settings(PROPERTY_SEARCH_INDEX={'ENABLED': False}):
+                    expected = self.get('facets', query)
+                with override_settings(PROPERTY_SEARCH_INDEX={'ENABLED': True}), \
+                        mock.patch.object(search_index, 'get_index', wraps=search_index.get_index) as get_index:
+                    indexed = self.get('facets', query)
+                get_index.assert_called_once()
+                self.assertEqual(indexed['count'], expected['count'])
+                self.assertEqual(
+                    [row['id'] for row in indexed['results']], [row['id'] for row in expected['results']]
+                )
+                self.assertEqual(indexed['facets'], expected['facets'])
+
+
+class FastSerializerParityTests(TestCase):
+    """The values()-based serializers render byte-identical JSON to the DRF ones"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seller = get_user_model().objects.create_user(
+            'fast', 'fast@example.com', 'pw', user_type='seller', first_name='Wanjiku', last_name='Kamau'
+        )
+        amenities = [Amenity.objects.create(name=f'Amenity {i}', category='utilities') for i in range(3)]
+        listings = create_listings(seller, amenities)
+        renditions = {
+            'webp': {'320': 'blobs/aa/bb/a__w320.webp', '640': 'blobs/aa/bb/a__w640.webp'},
+            'jpeg': {'320': 'blobs/aa/bb/a__w320.jpg'},
+        }
+        for i, property_obj in enumerate(listings[:6]):
+            PropertyImage.objects.create(
+                property=property_obj, image=f'blobs/aa/bb/image{i}.jpg', is_primary=i % 2 == 0,
+                renditions=renditions if i % 4 == 0 else {},
+            )
+        # A primary media image wins over a primary PropertyImage
+        PropertyMedia.objects.create(
+            property=listings[0], media_type='image', file='blobs/cc/dd/media.jpg', is_primary=True
+        )
+        for property_obj in listings[::3]:
+            Favorite.objects.create(user=seller, property=property_obj)
+        cls.seller = seller
+
+    def assertSameJSON(self, drf_data, fast_data):
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(fast_data), renderer.render(drf_data))
+
+    def test_list(self):
+        published = Property.objects.filter(status='published').order_by('-created_at')
+        card = set(PropertyListSerializer.FIELD_PRESETS['card'])
+        for fields in (None, card):
+            with self.subTest(fields=fields):
+                context = {} if fields is None else {'fields': fields}
+                drf = PropertyListSerializer(
+                    published.prefetch_related('media', 'images', 'amenities__amenity'), many=True, context=context
+                ).data
+                fast = fast_serializers.FastPropertyListSerializer(fields)
+                self.assertSameJSON(drf, fast.serialize(fast.values(published)))
+                if fields is None:
+                    # The fixture exercises the computed fields, not just their empty cases
+                    self.assertTrue(any(row['primary_image_srcset'] for row in drf))
+                    self.assertTrue(any(row['amenities_preview'] for row in drf))
+
+    def test_map(self):
+        published = Property.objects.filter(status='published').order_by('-created_at')
+        fast = fast_serializers.FastPropertyMapSerializer()
+        self.assertSameJSON(PropertyMapSerializer(published, many=True).data, fast.serialize(fast.values(published)))
+
+    def test_favorites(self):
+        favorites = Favorite.objects.filter(user=self.seller).order_by('-created_at')
+        fast = fast_serializers.FastFavoriteSerializer()
+        self.assertSameJSON(FavoriteSerializer(favorites, many=True).data, fast.serialize(fast.values(favorites)))
+
+
+class DetailIncludeTests(SimpleTestCase):
+    def test_sub_resource_names_are_aliases(self):
+        include = detail.parse_include(QueryDict('include=similar,inquiry-stats,documents'))
+        self.assertEqual(include, {'similar_properties', 'inquiry_stats', 'documents'})
+
+    def test_unknown_section_lists_aliases(self):
+        with self.assertRaises(ValidationError) as raised:
+            detail.parse_include(QueryDict('include=similar,photos'))
+        message = str(raised.exception.detail['include'])
+        self.assertIn('Unknown section(s): photos.', message)
+        self.assertIn('similar (= similar_properties)', message)
+
+
+class ImportStreamErrorTests(TestCase):
+    """A file that can't be read to the end keeps the rows already imported and says where it stopped"""
+
+    def test_undecodable_tail_returns_partial_report(self):
+        seller = get_user_model().objects.create_user('importer', 'importer@example.com', 'pw', user_type='seller')
+        row = 'Plot {},' + 'x' * 200 + ',land,residential,a,Nairobi,Nairobi,00100,1000000\n'
+        data = (
+            'title,description,property_type,land_type,address,city,state,zip_code,price\n'
+            + ''.join(row.format(i) for i in range(300))
+        ).encode() + b'Bad \xff,d,land,residential,a,N,N,1,1\n'
+        stream = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8-sig', newline='')
+
+        report = import_properties(iter_rows(stream, 'csv'), seller=seller, batch_size=50)
+
+        self.assertEqual(report.created, Property.objects.filter(seller=seller).count())
+        self.assertGreater(report.created, 0)
+        self.assertEqual(report.stopped_at, report.total + 1)
+        self.assertEqual(report.errors[-1]['row'], report.stopped_at)
@@ -0,0 +1,300 @@
+# properties/uploads.py
+"""
+Resumable chunked uploads and bulk media attachment.
+
+Clients open a ChunkedUpload, PUT byte ranges that are streamed straight to a
+temp file (never buffered in memory), and the assembled file is verified
+against its SHA-256 once the last byte arrives. Completed uploads (and plain
+multipart files from create_property_simple) are attached to a property with
+one bulk INSERT per model inside a single transaction.
+"""
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ChunkedUpload, Property, PropertyImage, PropertyMedia
+
+DEFAULT_SETTINGS = {
+    'TEMP_DIR': os.path.join(settings.BASE_DIR, 'tmp', 'uploads'),
+    'MAX_UPLOAD_SIZE': 2 * 1024 * 1024 * 1024,  # 2GB
+    'MAX_CHUNK_SIZE': 8 * 1024 * 1024,
+    'EXPIRY_HOURS': 24,
+}
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """Raised for chunks that cannot be applied; carries the HTTP status to return"""
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def get_upload_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'CHUNKED_UPLOADS', {})}
+
+
+def parse_content_range(header, total_size):
+    """
+    Parse 'bytes <start>-<end>/<total>' into (start, length).
+    """
+    try:
+        unit, byte_range = header.strip().split(' ', 1)
+        span, total = byte_range.split('/', 1)
+        start, end = (int(part) for part in span.split('-', 1))
+    except ValueError:
+        raise UploadError('Malformed Content-Range header')
+
+    if unit != 'bytes' or end < start or (total != '*' and int(total) != total_size):
+        raise UploadError('Content-Range does not match this upload')
+    return start, end - start + 1
+
+
+# === CHUNKED UPLOADS ===
+
+def start_upload(user, filename, total_size, content_type='', sha256=''):
+    config = get_upload_settings()
+    if total_size <= 0 or total_size > config['MAX_UPLOAD_SIZE']:
+        raise UploadError(f"Upload size must be between 1 and {config['MAX_UPLOAD_SIZE']} bytes")
+
+    upload = ChunkedUpload.objects.create(
+        user=user,
+        filename=os.path.basename(filename)[:255],
+        content_type=content_type or '',
+        total_size=total_size,
+        sha256=(sha256 or '').lower(),
+    )
+    os.makedirs(config['TEMP_DIR'], exist_ok=True)
+    open(upload.temp_path, 'wb').close()
+    return upload
+
+
+def append_chunk(upload, stream, start, length, chunk_sha256=None):
+    """
+    Stream ``length`` bytes from ``stream`` into the upload's temp file at
+    ``start``. Chunks must arrive in order; re-sending an already received
+    range is accepted as a no-op so clients can safely retry.
+    """
+    if upload.status != 'uploading':
+        raise UploadError('Upload is not accepting chunks', status_code=409)
+    if length > get_upload_settings()['MAX_CHUNK_SIZE']:
+        raise UploadError('Chunk is too large', status_code=413)
+    if start + length > upload.total_size:
+        raise UploadError('Chunk extends past the declared upload size')
+    if start + length <= upload.received_bytes:
+        return upload
+    if start != upload.received_bytes:
+        raise UploadError(f'Expected chunk at offset {upload.received_bytes}', status_code=409)
+
+    digest = hashlib.sha256()
+    written = 0
+    with open(upload.temp_path, 'r+b') as temp_file:
+        temp_file.seek(start)
+        while written < length:
+            block = stream.read(min(READ_BLOCK_SIZE, length - written))
+            if not block:
+                break
+            temp_file.write(block)
+            digest.update(block)
+            written += len(block)
+        temp_file.truncate(start + written)
+
+    if written != length:
+        raise UploadError('Chunk body is shorter than its Content-Range')
+    if chunk_sha256 and digest.hexdigest() != chunk_sha256.lower():
+        with open(upload.temp_path, 'r+b') as temp_file:
+            temp_file.truncate(start)
+        raise UploadError('Chunk checksum mismatch')
+
+    # Only advance if nobody else advanced the offset in the meantime
+    advanced = ChunkedUpload.objects.filter(
+        pk=upload.pk, received_bytes=start
+    ).update(received_bytes=start + length, updated_at=timezone.now())
+    if not advanced:
+        raise UploadError('Concurrent upload to the same offset', status_code=409)
+
+    upload.received_bytes = start + length
+    if upload.received_bytes == upload.total_size:
+        finish_upload(upload)
+    return upload
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def finish_upload(upload):
+    """Verify the assembled file against the expected checksum"""
+    actual = file_sha256(upload.temp_path)
+    if upload.sha256 and actual != upload.sha256:
+        upload.status = 'failed'
+        discard_upload(upload, delete_row=False)
+    else:
+        upload.status = 'complete'
+        upload.sha256 = actual
+    upload.save(update_fields=['status', 'sha256', 'updated_at'])
+    return upload
+
+
+def discard_upload(upload, delete_row=True):
+    try:
+        os.remove(upload.temp_path)
+    except FileNotFoundError:
+        pass
+    if delete_row:
+        upload.delete()
+
+
+def purge_stale_uploads():
+    """Remove uploads that were abandoned or never attached"""
+    cutoff = timezone.now() - timedelta(hours=get_upload_settings()['EXPIRY_HOURS'])
+    stale = ChunkedUpload.objects.filter(updated_at__lt=cutoff)
+    count = 0
+    for upload in stale.iterator():
+        discard_upload(upload, delete_row=False)
+        count += 1
+    stale.delete()
+    return count
+
+
+class AssembledFile(File):
+    """
+    Wraps an assembled temp file. Exposing temporary_file_path() lets
+    FileSystemStorage move the file into MEDIA_ROOT instead of copying it.
+    """
+    def __init__(self, path, name):
+        super().__init__(open(path, 'rb'), name=name)
+        self._path = path
+
+    def temporary_file_path(self):
+        return self._path
+
+
+# === BULK ATTACH ===
+
+def _store(field, instance, file_obj, filename):
+    """Save ``file_obj`` under the field's upload_to path and return the stored name"""
+    name = field.generate_filename(instance, filename)
+    return field.storage.save(name, file_obj, max_length=field.max_length)
+
+
+def bulk_attach(property_obj, images=(), media=()):
+    """
+    Attach files to ``property_obj`` with one INSERT per model.
+
+    ``images`` items: {'file', 'caption', 'is_primary', 'order'}
+    ``media`` items: {'file', 'media_type', 'caption', 'is_primary', 'display_order'}
+
+    bulk_create bypasses the per-row set_primary_* pre_save UPDATEs, so the
+    previous primary is cleared once here instead (and only the last new
+    primary of each kind is kept).
+    """
+    image_field = PropertyImage._meta.get_field('image')
+    media_field = PropertyMedia._meta.get_field('file')
+
+    new_images = []
+    for item in images:
+        instance = PropertyImage(
+            property=property_obj,
+            caption=item.get('caption', ''),
+            is_primary=item.get('is_primary', False),
+            order=item.get('order', 0),
+        )
+        instance.image.name = _store(image_field, instance, item['file'], item['file'].name)
+        new_images.append(instance)
+
+    new_media = []
+    for item in media:
+        instance = PropertyMedia(
+            property=property_obj,
+            media_type=item.get('media_type') or 'image',
+            caption=item.get('caption', ''),
+            is_primary=item.get('is_primary', False),
+            display_order=item.get('display_order', 0),
+        )
+        instance.file.name = _store(media_field, instance, item['file'], item['file'].name)
+        new_media.append(instance)
+
+    with transaction.atomic():
+        for model, instances in ((PropertyImage, new_images), (PropertyMedia, new_media)):
+            primaries = [instance for instance in instances if instance.is_primary]
+            if primaries:
+                for instance in primaries[:-1]:
+                    instance.is_primary = False
+                model.objects.filter(property=property_obj, is_primary=True).update(is_primary=False)
+
+        created_images = PropertyImage.objects.bulk_create(new_images)
+        created_media = PropertyMedia.objects.bulk_create(new_media)
+        if created_images or created_media:
+            # bulk_create/update() send no signals: bump updated_at for the list ETags ourselves
+            Property.touch([property_obj.pk])
+
+        from .renditions import schedule_renditions
+        for instance in [*created_images, *created_media]:
+            if instance.pk is not None:
+                schedule_renditions(instance)
+
+    return created_images, created_media
+
+
+def attach_uploads(property_obj, user, items):
+    """
+    Attach completed ChunkedUploads to a property.
+
+    ``items``: [{'upload_id', 'kind': 'image'|'media', 'media_type', 'caption',
+    'is_primary', 'order'}]. Raises UploadError if any upload is missing,
+    incomplete or owned by someone else.
+    """
+    upload_ids = [str(item.get('upload_id')) for item in items]
+    uploads = {
+        str(upload.pk): upload
+        for upload in ChunkedUpload.objects.filter(pk__in=upload_ids, user=user, status='complete')
+    }
+    missing = [upload_id for upload_id in upload_ids if upload_id not in uploads]
+    if missing:
+        raise UploadError(f"Uploads not found or not complete: {', '.join(missing)}")
+
+    images, media = [], []
+    opened = []
+    try:
+        for position, item in enumerate(items):
+            upload = uploads[str(item['upload_id'])]
+            file_obj = AssembledFile(upload.temp_path, upload.filename)
+            opened.append(file_obj)
+            spec = {
+                'file': file_obj,
+                'caption': item.get('caption', ''),
+                'is_primary': bool(item.get('is_primary', False)),
+            }
+            if item.get('kind') == 'image':
+                images.append({**spec, 'order': item.get('order', position)})
+            else:
+                media.append({
+                    **spec,
+                    'media_type': item.get('media_type', 'image'),
+                    'display_order': item.get('order', position),
+                })
+
+        with transaction.atomic():
+            created = bulk_attach(property_obj, images=images, media=media)
+            ChunkedUpload.objects.filter(pk__in=list(uploads)).delete()
+    finally:
+        for file_obj in opened:
+            file_obj.close()
+
+    # Storage may have copied rather than moved the temp file
+    for upload in uploads.values():
+        if os.path.exists(upload.temp_path):
+            os.remove(upload.temp_path)
+
+    return created
@@ -1,11 +1,14 @@
 # properties/urls.py
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     PropertyViewSet, InquiryViewSet, AmenityViewSet, 
     PropertyMediaViewSet, LegalDocumentViewSet, AdminPropertyViewSet,
     create_property_simple, my_favorites, my_properties, public_inquiry,
-    property_categories, dashboard_stats
+    property_categories, dashboard_stats, start_chunked_upload,
+    chunked_upload_detail, attach_property_uploads, bulk_import_properties,
+    property_feed, map_data_async
 )
 
 router = DefaultRouter()
@@ -21,13 +24,28 @@ router.register(r'legal-documents', LegalDocumentViewSet, basename='legal-docume
 # Admin routes
 router.register(r'admin/properties', AdminPropertyViewSet, basename='admin-property')
 
-urlpatterns = [
+urlpatterns = []
+if settings.ASYNC_VIEWS:
+    # Ahead of the router's properties/map_data/ route (see pristineprimer/async_views.py)
+    urlpatterns += [
+        path('properties/map_data/', map_data_async, name='property-map-data'),
+        path('properties/map/data/', map_data_async, name='property-map-data'),
+    ]
+
+urlpatterns += [
     path('', include(router.urls)),
     
     # === PROPERTY MANAGEMENT ENDPOINTS ===
     path('create/', create_property_simple, name='create-property'),
     path('my_properties/', my_properties, name='my-properties'),
     path('my_favorites/', my_favorites, name='my-favorites'),
+    path('import/', bulk_import_properties, name='property-bulk-import'),
+    path('feed/<str:export_format>/', property_feed, name='property-feed'),
+    
+    # === CHUNKED MEDIA UPLOADS ===
+    path('uploads/', start_chunked_upload, name='chunked-upload-start'),
+    path('uploads/<uuid:upload_id>/', chunked_upload_detail, name='chunked-upload-detail'),
+    path('properties/<int:pk>/attach-uploads/', attach_property_uploads, name='property-attach-uploads'),
     
     # === PUBLIC ENDPOINTS ===
     path('public-inquiry/', public_inquiry, name='public-inquiry'),
@@ -51,6 +69,12 @@ urlpatterns = [
     path('properties/<int:pk>/similar/', 
          PropertyViewSet.as_view({'get': 'similar'}), 
          name='property-similar'),
+    path('properties/<int:pk>/documents/', 
+         PropertyViewSet.as_view({'get': 'documents'}), 
+         name='property-documents'),
+    path('properties/<int:pk>/inquiry-stats/', 
+         PropertyViewSet.as_view({'get': 'inquiry_stats'}), 
+         name='property-inquiry-stats'),
     path('properties/<int:pk>/favorite/', 
          PropertyViewSet.as_view({'post': 'favorite'}), 
          name='property-favorite'),
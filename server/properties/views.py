@@ -11,29 +11,42 @@ from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.db.models import Sum, Q, Count, Avg, Min, Max
 from rest_framework import viewsets, status, filters
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import serializers
 from django.shortcuts import get_object_or_404
 from rest_framework.decorators import api_view, permission_classes
+import io
+import json
+from django.db import transaction
+from asgiref.sync import sync_to_async
+from pristineprimer import conditional
+from pristineprimer.async_views import async_api_view, streaming_content
+from pristineprimer.profiling import query_budget
+from pristineprimer.routers import replica_reads
 from .models import (
     Property, PropertyImage, Favorite, Inquiry,
-    PropertyMedia, Amenity, PropertyAmenity, LegalDocument, PropertyContact
+    PropertyMedia, Amenity, PropertyAmenity, LegalDocument, PropertyContact,
+    ChunkedUpload
 )
 from .serializers import (
     PropertyListSerializer, PropertyDetailSerializer, PropertySerializer,
     FavoriteSerializer, InquirySerializer, PropertyCreateSerializer,
     PropertyMapSerializer, AmenitySerializer, PropertyAmenitySerializer,
     PropertyMediaSerializer, LegalDocumentSerializer, PropertyContactSerializer,
-    PublicInquirySerializer, PropertySearchSerializer, PropertyStatsSerializer,
-    AmenityCategorySerializer, InquiryCreateSerializer
+    PropertyImageSerializer, PublicInquirySerializer, PropertySearchSerializer, PropertyStatsSerializer,
+    AmenityCategorySerializer, InquiryCreateSerializer, ChunkedUploadSerializer,
+    UploadAttachmentSerializer, similar_properties_data, documents_data, inquiry_stats_data
 )
 from .filters import PropertyFilter
+from . import changes, detail, facets, fast_serializers, feed, imports, search_index, uploads
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
 
+@replica_reads
 class PropertyViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -48,12 +61,14 @@ class PropertyViewSet(viewsets.ModelViewSet):
     ]
     ordering = ['-created_at']
     pagination_class = StandardResultsSetPagination
+    # Actions rendered with a SparseFieldsMixin serializer, which accept ?fields=
+    SPARSE_ACTIONS = ['list', 'search', 'facets', 'map_data']
     
     def get_queryset(self):
         queryset = Property.objects.all()
         
         # For public endpoints, only show published properties
-        if self.action in ['list', 'retrieve', 'map_data', 'similar', 'search']:
+        if self.action in ['list', 'retrieve', 'map_data', 'similar', 'documents', 'inquiry_stats', 'search', 'facets']:
             queryset = queryset.filter(status='published')
         
         # Handle featured filter
@@ -75,7 +90,8 @@ class PropertyViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(property_type=property_type)
         
         # Sellers can see their own draft/pending properties in non-public actions
-        if self.request.user.is_authenticated and self.action not in ['list', 'retrieve', 'map_data', 'similar', 'search']:
+        # (action first: public actions never load the user, see map_data_async)
+        if self.action not in ['list', 'retrieve', 'map_data', 'similar', 'documents', 'inquiry_stats', 'search', 'facets'] and self.request.user.is_authenticated:
             user_properties = Property.objects.filter(seller=self.request.user)
             queryset = queryset | user_properties
         
@@ -85,12 +101,52 @@ class PropertyViewSet(viewsets.ModelViewSet):
                 'media', 'images', 'amenities__amenity'
             )
         elif self.action == 'retrieve':
+            # ?include= limits the prefetches to the sections asked for
             queryset = queryset.select_related('seller', 'agent', 'contact_info').prefetch_related(
-                'media', 'images', 'amenities__amenity', 'documents'
+                *detail.prefetches(detail.parse_include(self.request.query_params))
             )
         
+        if self.action in self.SPARSE_ACTIONS:
+            queryset = self._project(queryset)
+        
         return queryset.distinct()
     
+    def _sparse_fields(self):
+        """Field names asked for with ?fields= (None = all), parsed once per request"""
+        if not hasattr(self, '_requested_fields'):
+            serializer_class = PropertyMapSerializer if self.action == 'map_data' else PropertyListSerializer
+            self._requested_fields = serializer_class.parse_fields(self.request.query_params)
+        return self._requested_fields
+    
+    def _project(self, queryset):
+        """Load only the columns the (possibly trimmed) serializer reads"""
+        serializer_class = PropertyMapSerializer if self.action == 'map_data' else PropertyListSerializer
+        columns = serializer_class.columns(self._sparse_fields())
+        if columns is None:
+            return queryset
+        # A deferred foreign key can't be followed with select_related
+        queryset = queryset.select_related('seller') if 'seller' in columns else queryset.select_related(None)
+        return queryset.only(*columns)
+    
+    def _fast_serializer(self):
+        """values()-based serializer for the list-style actions, or None when disabled"""
+        if not fast_serializers.is_enabled():
+            return None
+        if self.action == 'map_data':
+            return fast_serializers.FastPropertyMapSerializer(self._sparse_fields())
+        return fast_serializers.FastPropertyListSerializer(self._sparse_fields())
+    
+    def _list_rows(self, queryset):
+        """What the list-style actions paginate: values() rows on the fast path, else instances"""
+        fast = self._fast_serializer()
+        return queryset if fast is None else fast.values(queryset)
+    
+    def _list_data(self, items):
+        fast = self._fast_serializer()
+        if fast is not None:
+            return fast.serialize(items)
+        return PropertyListSerializer(items, many=True, context=self.get_serializer_context()).data
+    
     def get_serializer_class(self):
         if self.action == 'list':
             return PropertyListSerializer
@@ -102,35 +158,119 @@ class PropertyViewSet(viewsets.ModelViewSet):
             return PropertyMapSerializer
         return PropertyDetailSerializer
     
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'retrieve':
+            context['include'] = detail.parse_include(self.request.query_params)
+        elif self.action in self.SPARSE_ACTIONS:
+            context['fields'] = self._sparse_fields()
+        return context
+    
     def perform_create(self, serializer):
         serializer.save(seller=self.request.user)
     
-    @action(detail=False, methods=['get'])
-    def map_data(self, request):
-        """Get lightweight property data for map display"""
-        queryset = self.get_queryset().filter(
+    def _conditional_parts(self):
+        """What _conditional hashes besides the queryset, or None when conditional GET is off"""
+        if (
+            not conditional.get_conditional_settings()['ENABLED']
+            or self.request.accepted_renderer.format != 'json'
+        ):
+            return None
+        return (','.join(self.get_serializer_class().Meta.fields),)
+    
+    def _conditional(self, queryset):
+        """
+        (ETag, 304/412 response or None) for a list-style action, from the
+        version of ``queryset`` rather than the body; the ETag is None when
+        conditional GET is off or the response isn't JSON
+        """
+        parts = self._conditional_parts()
+        if parts is None:
+            return None, None
+        etag = conditional.queryset_etag(self.request, queryset, *parts)
+        return etag, conditional.not_modified(self.request, etag)
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, not_modified = self._conditional(queryset)
+        if not_modified is not None:
+            return not_modified
+        
+        queryset = self._list_rows(queryset)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(self._list_data(page))
+        else:
+            response = Response(self._list_data(queryset))
+        return response if etag is None else conditional.tag(response, etag)
+    
+    def _map_queryset(self):
+        # get_queryset() loads only the serializer's columns; a hand-written
+        # only() list that missed any of them cost a query per row and field
+        return self.get_queryset().filter(
             latitude__isnull=False,
             longitude__isnull=False
-        ).only(
-            'id', 'title', 'price', 'size_acres', 'latitude', 
-            'longitude', 'city', 'land_type', 'property_type'
         )
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    @query_budget(4)
+    def map_data(self, request):
+        """Get lightweight property data for map display"""
+        queryset = self._map_queryset()
+        etag, not_modified = self._conditional(queryset)
+        if not_modified is not None:
+            return not_modified
+        
+        fast = self._fast_serializer()
+        if fast is not None:
+            response = Response(fast.serialize(fast.values(queryset)))
+        else:
+            response = Response(self.get_serializer(queryset, many=True).data)
+        return response if etag is None else conditional.tag(response, etag)
+    
+    @action(detail=False, methods=['get'])
+    @query_budget(4)
+    def changes(self, request):
+        """
+        Incremental sync: what changed after sequence number `?since=`.
+        
+        Returns upserts for published listings and tombstones for deleted or
+        unpublished ones; pass `next_since` back on the next call and keep
+        paging while `has_more` is true. `?limit=` caps the entries read.
+        """
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = int(request.query_params['limit']) if 'limit' in request.query_params else None
+        except ValueError:
+            return Response(
+                {'error': 'since and limit must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if since < 0 or (limit is not None and limit < 1):
+            return Response(
+                {'error': 'since must be >= 0 and limit >= 1'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(changes.get_changes(since=since, limit=limit))
     
     @action(detail=True, methods=['get'])
     def similar(self, request, pk=None):
-        """Get similar properties based on location and type"""
+        """Nearest listings by type, price, size, location and utilities"""
         property_obj = self.get_object()
-        
-        similar_properties = Property.objects.filter(
-            city=property_obj.city,
-            property_type=property_obj.property_type,
-            status='published'
-        ).exclude(id=property_obj.id)[:6]
-        
-        serializer = PropertyListSerializer(similar_properties, many=True)
-        return Response(serializer.data)
+        return detail.cacheable(Response(similar_properties_data(property_obj)))
+    
+    @action(detail=True, methods=['get'])
+    def documents(self, request, pk=None):
+        """Legal documents of a property (cacheable sub-resource of the detail view)"""
+        property_obj = self.get_object()
+        return detail.cacheable(Response(documents_data(property_obj)))
+    
+    @action(detail=True, methods=['get'], url_path='inquiry-stats')
+    def inquiry_stats(self, request, pk=None):
+        """Inquiry counts for a property (cacheable sub-resource of the detail view)"""
+        property_obj = self.get_object()
+        return detail.cacheable(Response(inquiry_stats_data(property_obj)))
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def favorite(self, request, pk=None):
@@ -149,7 +289,12 @@ class PropertyViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_favorites(self, request):
         """Get user's favorite properties"""
-        favorites = Favorite.objects.filter(user=request.user).select_related(
+        favorites = Favorite.objects.filter(user=request.user)
+        if fast_serializers.is_enabled():
+            fast = fast_serializers.FastFavoriteSerializer()
+            return Response(fast.serialize(fast.values(favorites)))
+        
+        favorites = favorites.select_related(
             'property'
         ).prefetch_related(
             'property__media', 'property__images'
@@ -160,7 +305,12 @@ class PropertyViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_properties(self, request):
         """Get properties created by the current user"""
-        properties = Property.objects.filter(seller=request.user).prefetch_related(
+        properties = Property.objects.filter(seller=request.user)
+        if fast_serializers.is_enabled():
+            fast = fast_serializers.FastPropertyListSerializer()
+            return Response(fast.serialize(fast.values(properties)))
+        
+        properties = properties.prefetch_related(
             'media', 'images', 'amenities__amenity'
         )
         serializer = PropertyListSerializer(properties, many=True)
@@ -190,13 +340,15 @@ class PropertyViewSet(viewsets.ModelViewSet):
         property_obj.save(update_fields=['views_count'])
         return Response({'views_count': property_obj.views_count})
     
-    @action(detail=False, methods=['get'])
-    def search(self, request):
-        """Advanced property search with filtering"""
+    def _search_queryset(self, request):
+        """
+        Apply PropertySearchSerializer filters to the public queryset.
+        Returns (queryset, validated_data), or (None, errors) if invalid.
+        """
         search_serializer = PropertySearchSerializer(data=request.query_params)
         
         if not search_serializer.is_valid():
-            return Response(search_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            return None, search_serializer.errors
         
         validated_data = search_serializer.validated_data
         queryset = self.get_queryset()
@@ -248,19 +400,91 @@ class PropertyViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(title_deed_status__isnull=False)
         if validated_data.get('has_water'):
             queryset = queryset.filter(
-                Q(has_borehole=True) | Q(has_piped_water=True) | Q(water_supply_types__len__gt=0)
+                Q(has_borehole=True) | Q(has_piped_water=True) |
+                # JSONField has no __len lookup; compare against the empty list instead
+                (Q(water_supply_types__isnull=False) & ~Q(water_supply_types=[]))
             )
         if validated_data.get('has_electricity'):
             queryset = queryset.filter(electricity_availability__in=['on_site', 'nearby'])
+        if validated_data.get('title_deed_status'):
+            queryset = queryset.filter(title_deed_status__in=validated_data['title_deed_status'])
+        if validated_data.get('electricity_availability'):
+            queryset = queryset.filter(electricity_availability__in=validated_data['electricity_availability'])
+        for field in ('road_access_type', 'topography', 'soil_type'):
+            if validated_data.get(field):
+                queryset = queryset.filter(**{f'{field}__in': validated_data[field]})
+        
+        for field in search_index.BOOLEAN_COLUMNS:
+            if validated_data.get(field) is not None:
+                queryset = queryset.filter(**{field: validated_data[field]})
         
-        # Paginate results
+        return queryset, validated_data
+    
+    def _search_filters(self, request, validated_data):
+        """validated_data plus the filters get_queryset() applies from the query string"""
+        filters = dict(validated_data)
+        # Mirror get_queryset(), which narrows these to the last query value
+        for param in ('land_type', 'property_type'):
+            if request.query_params.get(param):
+                filters[param] = [request.query_params.get(param)]
+        featured_param = request.query_params.get('featured', '').lower()
+        if featured_param in ('true', 'false'):
+            filters['featured'] = featured_param == 'true'
+        return filters
+    
+    def _indexed_results(self, request, validated_data):
+        """
+        Answer the search from the in-process bitmap index when it is enabled
+        and every filter is one it supports; None means use the ORM queryset.
+        """
+        if not search_index.is_enabled():
+            return None
+        
+        filters = self._search_filters(request, validated_data)
+        if not search_index.supports(filters):
+            return None
+        
+        index = search_index.get_index()
+        return search_index.IndexedResults(index, index.query(filters), self._list_rows(self.get_queryset()))
+    
+    def _search_response(self, queryset, extra=None):
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = PropertyListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            response = self.get_paginated_response(self._list_data(page))
+        else:
+            response = Response({'results': self._list_data(queryset)})
+        if extra:
+            response.data.update(extra)
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Advanced property search with filtering"""
+        queryset, validated_data = self._search_queryset(request)
+        if queryset is None:
+            return Response(validated_data, status=status.HTTP_400_BAD_REQUEST)
         
-        serializer = PropertyListSerializer(queryset, many=True)
-        return Response(serializer.data)
+        indexed = self._indexed_results(request, validated_data)
+        return self._search_response(indexed if indexed is not None else self._list_rows(queryset))
+    
+    @action(detail=False, methods=['get'], url_path='search/facets')
+    def facets(self, request):
+        """
+        Search results plus facet counts (type, land type, title deed,
+        electricity, price band, amenity) for the same filters.
+        """
+        queryset, validated_data = self._search_queryset(request)
+        if queryset is None:
+            return Response(validated_data, status=status.HTTP_400_BAD_REQUEST)
+        
+        indexed = self._indexed_results(request, validated_data)
+        if indexed is not None:
+            facet_counts = indexed.index.facets(indexed.bits, search_index.amenity_choices())
+            return self._search_response(indexed, extra={'facets': facet_counts})
+        
+        return self._search_response(self._list_rows(queryset), extra={
+            'facets': facets.get_facets(queryset, self._search_filters(request, validated_data))
+        })
     
     @action(detail=False, methods=['get'])
     def stats(self, request):
@@ -348,6 +572,7 @@ class InquiryViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+@replica_reads
 class AmenityViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Amenity.objects.filter(is_active=True)
     serializer_class = AmenitySerializer
@@ -404,6 +629,7 @@ class LegalDocumentViewSet(viewsets.ModelViewSet):
             raise serializers.ValidationError("Property not found or access denied")
 
 # API Views
+@replica_reads
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def property_categories(request):
@@ -415,6 +641,30 @@ def property_categories(request):
     }
     return Response(categories)
 
+@replica_reads
+@query_budget(4)
+@async_api_view(['GET'], permission_classes=[IsAuthenticatedOrReadOnly])
+async def map_data_async(request):
+    """PropertyViewSet.map_data for ASGI: the same response, with its queries awaited"""
+    viewset = PropertyViewSet(action='map_data', request=request, format_kwarg=None, args=(), kwargs={})
+    queryset = viewset._map_queryset()
+    
+    etag = None
+    parts = viewset._conditional_parts()
+    if parts is not None:
+        etag = await conditional.aqueryset_etag(request, queryset, *parts)
+        not_modified = conditional.not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+    
+    fast = viewset._fast_serializer()
+    if fast is not None:
+        data = fast.serialize([row async for row in fast.values(queryset)])
+    else:
+        data = await sync_to_async(lambda: viewset.get_serializer(queryset, many=True).data)()
+    response = Response(data)
+    return response if etag is None else conditional.tag(response, etag)
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def public_inquiry(request):
@@ -485,7 +735,12 @@ def my_properties(request):
 @permission_classes([IsAuthenticated])
 def my_favorites(request):
     """Get user's favorite properties"""
-    favorites = Favorite.objects.filter(user=request.user).select_related(
+    favorites = Favorite.objects.filter(user=request.user)
+    if fast_serializers.is_enabled():
+        fast = fast_serializers.FastFavoriteSerializer()
+        return Response(fast.serialize(fast.values(favorites)))
+    
+    favorites = favorites.select_related(
         'property'
     ).prefetch_related(
         'property__media', 'property__images', 'property__amenities__amenity'
@@ -498,36 +753,56 @@ def my_favorites(request):
 @permission_classes([IsAuthenticated])
 @method_decorator(csrf_exempt, name='dispatch')
 def create_property_simple(request):
-    """Simple property creation endpoint"""
+    """
+    Simple property creation endpoint.
+    
+    Files can be sent inline as multipart `images`/`media`, or uploaded first
+    through the chunked upload API and referenced in `uploads` (a JSON list,
+    see attach_property_uploads). Everything is attached with bulk inserts in
+    the same transaction as the property.
+    """
     try:
         serializer = PropertyCreateSerializer(data=request.data)
         
         if serializer.is_valid():
-            property_obj = serializer.save(seller=request.user)
+            upload_items = request.data.get('uploads') or []
+            if isinstance(upload_items, str):
+                try:
+                    upload_items = json.loads(upload_items)
+                except ValueError:
+                    return Response({'uploads': ['Must be a JSON list']}, status=status.HTTP_400_BAD_REQUEST)
+            attachment_serializer = UploadAttachmentSerializer(data=upload_items, many=True)
+            if not attachment_serializer.is_valid():
+                return Response({'uploads': attachment_serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Handle inline image uploads if any
+            images = [
+                {
+                    'file': image_file,
+                    'caption': request.data.get(f'image_captions[{i}]', ''),
+                    'is_primary': request.data.get(f'image_is_primary[{i}]', 'false').lower() == 'true',
+                    'order': i,
+                }
+                for i, image_file in enumerate(request.FILES.getlist('images'))
+            ]
             
-            # Handle image uploads if any
-            images = request.FILES.getlist('images')
-            for i, image_file in enumerate(images):
-                PropertyImage.objects.create(
-                    property=property_obj,
-                    image=image_file,
-                    caption=request.data.get(f'image_captions[{i}]', ''),
-                    is_primary=request.data.get(f'image_is_primary[{i}]', 'false').lower() == 'true',
-                    order=i
-                )
+            # Handle inline media uploads
+            media = [
+                {
+                    'file': media_file,
+                    'media_type': request.data.get(f'media_types[{i}]', 'image'),
+                    'caption': request.data.get(f'media_captions[{i}]', ''),
+                    'is_primary': request.data.get(f'media_is_primary[{i}]', 'false').lower() == 'true',
+                    'display_order': i,
+                }
+                for i, media_file in enumerate(request.FILES.getlist('media'))
+            ]
             
-            # Handle media uploads
-            media_files = request.FILES.getlist('media')
-            for i, media_file in enumerate(media_files):
-                media_type = request.data.get(f'media_types[{i}]', 'image')
-                PropertyMedia.objects.create(
-                    property=property_obj,
-                    media_type=media_type,
-                    file=media_file,
-                    caption=request.data.get(f'media_captions[{i}]', ''),
-                    is_primary=request.data.get(f'media_is_primary[{i}]', 'false').lower() == 'true',
-                    display_order=i
-                )
+            with transaction.atomic():
+                property_obj = serializer.save(seller=request.user)
+                uploads.bulk_attach(property_obj, images=images, media=media)
+                if attachment_serializer.validated_data:
+                    uploads.attach_uploads(property_obj, request.user, attachment_serializer.validated_data)
             
             return Response(
                 PropertySerializer(property_obj).data, 
@@ -535,13 +810,177 @@ def create_property_simple(request):
             )
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        
+    
+    except uploads.UploadError as e:
+        return Response({'error': str(e)}, status=e.status_code)
     except Exception as e:
         return Response(
             {'error': str(e)}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+# === BULK IMPORT ===
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_import_properties(request):
+    """
+    Import many properties at once from an uploaded CSV or NDJSON `file`.
+    
+    Optional fields: `format` (csv/ndjson, defaults to the file extension) and
+    `dry_run` (validate only). Returns totals and a per-row error report.
+    """
+    if request.user.user_type not in ['seller', 'agent', 'admin']:
+        return Response({'error': 'Only sellers and agents can import properties'}, status=status.HTTP_403_FORBIDDEN)
+    
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'A CSV or NDJSON file is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    import_format = request.data.get('format') or imports.detect_format(upload.name)
+    if import_format not in imports.FORMATS:
+        return Response({'error': f'Unsupported format: {import_format}'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    dry_run = str(request.data.get('dry_run', 'false')).lower() == 'true'
+    stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+    try:
+        # A file that breaks part way still gets its report: earlier batches are committed
+        report = imports.import_properties(
+            imports.iter_rows(stream, import_format),
+            seller=request.user,
+            dry_run=dry_run,
+        )
+    finally:
+        stream.detach()
+    
+    max_errors = imports.get_import_settings()['MAX_REPORTED_ERRORS']
+    if report.stopped_at is not None and not report.total:
+        response_status = status.HTTP_400_BAD_REQUEST
+    elif dry_run or not report.created:
+        response_status = status.HTTP_200_OK
+    else:
+        response_status = status.HTTP_201_CREATED
+    return Response(report.as_dict(max_errors=max_errors), status=response_status)
+
+# === PARTNER FEED ===
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def property_feed(request, export_format):
+    """
+    Stream all published properties as NDJSON or CSV for partner portals.
+    
+    `?updated_since=<ISO date/datetime>` limits the feed to recent changes and
+    `?compress=gzip` gzips the stream. The X-Feed-Cursor response header is the
+    value to pass as updated_since on the next incremental sync.
+    """
+    if export_format not in feed.FORMATS:
+        return Response({'error': 'Unsupported feed format'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        updated_since = feed.parse_updated_since(request.query_params.get('updated_since'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    compress = request.query_params.get('compress') == 'gzip'
+    cursor = timezone.now()
+    
+    content_type = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    filename = f"properties.{export_format}"
+    if compress:
+        content_type, filename = 'application/gzip', filename + '.gz'
+    
+    response = StreamingHttpResponse(
+        streaming_content(feed.stream_feed(export_format, updated_since=updated_since, compress=compress)),
+        content_type=content_type
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Feed-Cursor'] = cursor.isoformat()
+    return response
+
+# === CHUNKED UPLOADS ===
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def start_chunked_upload(request):
+    """
+    Start a resumable upload.
+    
+    Body: {"filename", "total_size", "content_type"?, "sha256"?}. Chunks are
+    then sent with PUT to /uploads/<id>/ as raw bytes with a
+    `Content-Range: bytes <start>-<end>/<total>` header.
+    """
+    serializer = ChunkedUploadSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        upload = uploads.start_upload(user=request.user, **serializer.validated_data)
+    except uploads.UploadError as e:
+        return Response({'error': str(e)}, status=e.status_code)
+    
+    response = ChunkedUploadSerializer(upload).data
+    response['max_chunk_size'] = uploads.get_upload_settings()['MAX_CHUNK_SIZE']
+    return Response(response, status=status.HTTP_201_CREATED)
+
+@api_view(['GET', 'PUT', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def chunked_upload_detail(request, upload_id):
+    """Get upload progress (to resume), append a chunk, or abort the upload"""
+    upload = get_object_or_404(ChunkedUpload, pk=upload_id, user=request.user)
+    
+    if request.method == 'GET':
+        return Response(ChunkedUploadSerializer(upload).data)
+    
+    if request.method == 'DELETE':
+        uploads.discard_upload(upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    try:
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+        content_range = request.META.get('HTTP_CONTENT_RANGE')
+        if content_range:
+            start, range_length = uploads.parse_content_range(content_range, upload.total_size)
+            if range_length != length:
+                raise uploads.UploadError('Content-Range length does not match Content-Length')
+        else:
+            start = upload.received_bytes
+        
+        # Read the raw WSGI stream so the chunk is never buffered in memory
+        uploads.append_chunk(
+            upload, request._request, start, length,
+            chunk_sha256=request.META.get('HTTP_X_CHUNK_SHA256')
+        )
+    except uploads.UploadError as e:
+        return Response(
+            {'error': str(e), 'offset': upload.received_bytes},
+            status=e.status_code
+        )
+    
+    return Response(ChunkedUploadSerializer(upload).data)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def attach_property_uploads(request, pk):
+    """
+    Attach completed uploads to one of the user's properties.
+    
+    Body: {"uploads": [{"upload_id", "kind": "image"|"media", "media_type",
+    "caption", "is_primary", "order"}]}
+    """
+    property_obj = get_object_or_404(Property, pk=pk, seller=request.user)
+    
+    serializer = UploadAttachmentSerializer(data=request.data.get('uploads', []), many=True)
+    if not serializer.is_valid():
+        return Response({'uploads': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        images, media = uploads.attach_uploads(property_obj, request.user, serializer.validated_data)
+    except uploads.UploadError as e:
+        return Response({'error': str(e)}, status=e.status_code)
+    
+    return Response({
+        'images': PropertyImageSerializer(images, many=True).data,
+        'media': PropertyMediaSerializer(media, many=True).data,
+    }, status=status.HTTP_201_CREATED)
+
 # Admin/Management Views
 class AdminPropertyViewSet(viewsets.ModelViewSet):
     """Admin viewset for managing all properties"""
@@ -567,7 +1006,7 @@ class AdminPropertyViewSet(viewsets.ModelViewSet):
         
         property_obj = self.get_object()
         property_obj.status = 'published'
-        property_obj.save(update_fields=['status'])
+        property_obj.save(update_fields=['status', 'updated_at'])
         
         serializer = self.get_serializer(property_obj)
         return Response(serializer.data)
@@ -583,7 +1022,7 @@ class AdminPropertyViewSet(viewsets.ModelViewSet):
         
         property_obj = self.get_object()
         property_obj.status = 'draft'
-        property_obj.save(update_fields=['status'])
+        property_obj.save(update_fields=['status', 'updated_at'])
         
         serializer = self.get_serializer(property_obj)
         return Response(serializer.data)
\ No newline at end of file
@@ -1,4 +1,5 @@
 # users/urls.py
+from django.conf import settings
 from django.urls import path
 from django.http import JsonResponse
 from django.middleware.csrf import get_token
@@ -30,7 +31,9 @@ urlpatterns = [
     # ACTIVITY & TRACKING ENDPOINTS
     # =========================================================================
     path('dashboard/activities/', views.user_activities, name='user-activities'),
-    path('dashboard/track-activity/', views.track_user_activity, name='track-user-activity'),
+    path('dashboard/track-activity/',
+         views.track_user_activity_async if settings.ASYNC_VIEWS else views.track_user_activity,
+         name='track-user-activity'),
     
     # =========================================================================
     # SEARCH MANAGEMENT ENDPOINTS
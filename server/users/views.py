@@ -14,6 +14,7 @@ from rest_framework.views import APIView
 from django.db.models import Count, Q, Sum
 from datetime import datetime, timedelta
 
+from pristineprimer.async_views import async_api_view
 from .models import User, UserProfile, SellerApplication, UserActivity, SavedSearch
 from properties.models import Property
 from .serializers import (
@@ -180,7 +181,7 @@ def dashboard_overview(request):
     application_details = None
     
     if user.user_type in ['seller', 'agent']:
-        my_listings = Property.objects.filter(owner=user)
+        my_listings = Property.objects.filter(seller=user)
         listing_stats = {
             'active': my_listings.filter(status='active').count(),
             'pending': my_listings.filter(status='pending').count(),
@@ -206,7 +207,7 @@ def dashboard_overview(request):
         'total_inquiries': total_inquiries,
         'total_saved_searches': total_saved_searches,
         'total_property_views': total_property_views,
-        'recent_activities': UserActivitySerializer(recent_activities, many=True).data,
+        'recent_activities': recent_activities,  # serialized by DashboardStatsSerializer
         'unread_messages': 0,  # Placeholder for messaging system
         'pending_tours': 0,    # Placeholder for tour scheduling
         'new_matches': 0,      # Placeholder for property matches
@@ -485,6 +486,36 @@ def track_user_activity(request):
         
         return Response({'success': True, 'activity_id': activity.id})
     
+    except Exception as e:
+        return Response(
+            {'success': False, 'error': str(e)}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+@async_api_view(['POST'], permission_classes=[IsAuthenticated])
+async def track_user_activity_async(request):
+    """track_user_activity for ASGI: two awaited queries, no thread held while they run"""
+    try:
+        activity_type = request.data.get('type')
+        property_id = request.data.get('property_id')
+        search_query = request.data.get('search_query')
+        metadata = request.data.get('metadata', {})
+        
+        # Only the id is needed to link the activity; unknown ids are dropped as before
+        if property_id:
+            property_id = await Property.objects.filter(id=property_id).values_list('id', flat=True).afirst()
+        
+        activity = await UserActivity.objects.acreate(
+            user=request.user,
+            activity_type=activity_type,
+            property_id=property_id or None,
+            search_query=search_query,
+            metadata=metadata
+        )
+        
+        return Response({'success': True, 'activity_id': activity.id})
+    
     except Exception as e:
         return Response(
             {'success': False, 'error': str(e)}, 